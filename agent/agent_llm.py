@@ -4,40 +4,47 @@ Feito com base no que aprendi sobre processamento de texto
 """
 
 import os
-import re
 import json
+import time
+import asyncio
 import logging
-from typing import Dict, Any, Optional
-import requests
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
+from typing import Dict, Any, Optional, AsyncIterator, List, Tuple
 from datetime import datetime
 
+from api import metrics
+from api.service import get_cliente, ServicoErro
+from .llm_client import ClienteLLM, ErroLLM, CF_API_BASE, MODELO_PADRAO
+from .llm_cache import LLMCache
+from .query_parser import UFS_BRASIL, parser as _parser
+
 # Log básico
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# UFs do Brasil - lista que peguei na internet
-UFS_BRASIL = {
-    'AC': 'Acre', 'AL': 'Alagoas', 'AP': 'Amapá', 'AM': 'Amazonas',
-    'BA': 'Bahia', 'CE': 'Ceará', 'DF': 'Distrito Federal', 'ES': 'Espírito Santo',
-    'GO': 'Goiás', 'MA': 'Maranhão', 'MT': 'Mato Grosso', 'MS': 'Mato Grosso do Sul',
-    'MG': 'Minas Gerais', 'PA': 'Pará', 'PB': 'Paraíba', 'PR': 'Paraná',
-    'PE': 'Pernambuco', 'PI': 'Piauí', 'RJ': 'Rio de Janeiro', 'RN': 'Rio Grande do Norte',
-    'RS': 'Rio Grande do Sul', 'RO': 'Rondônia', 'RR': 'Roraima', 'SC': 'Santa Catarina',
-    'SP': 'São Paulo', 'SE': 'Sergipe', 'TO': 'Tocantins'
-}
-
 class AgenteLLM:
     """Agente que usa Cloudflare - meio instável mas funciona"""
     
-    def __init__(self):
-        self.token = os.getenv('CF_API_TOKEN')
-        self.account_id = os.getenv('CF_ACCOUNT_ID')
+    def __init__(self, token: Optional[str] = None, account_id: Optional[str] = None,
+                 base_url: Optional[str] = None):
+        self.token = token or os.getenv('CF_API_TOKEN')
+        self.account_id = account_id or os.getenv('CF_ACCOUNT_ID')
+        self.cliente: Optional[ClienteLLM] = None
         
         if not self.token or not self.account_id:
             logger.warning("Sem credenciais Cloudflare - vai usar só o parser")
             self.ativo = False
         else:
             self.ativo = True
+            # Conexões reaproveitadas entre as chamadas (sem handshake TLS a cada consulta)
+            self.cliente = ClienteLLM(
+                self.account_id,
+                self.token,
+                base_url=base_url or os.getenv('CF_API_BASE', CF_API_BASE),
+                modelo=os.getenv('CF_MODEL', MODELO_PADRAO),
+                timeout=float(os.getenv('CF_TIMEOUT', '30')),
+                max_connections=int(os.getenv('CF_MAX_CONNECTIONS', '10')),
+            )
             
     def chamar_llm(self, texto: str) -> str:
         """Chama o LLM da Cloudflare"""
@@ -45,31 +52,10 @@ class AgenteLLM:
             return "Agente não configurado"
             
         try:
-            url = f"https://api.cloudflare.com/client/v4/accounts/{self.account_id}/ai/run/@cf/meta/llama-2-7b-chat-fp16"
-            
-            headers = {
-                "Authorization": f"Bearer {self.token}",
-                "Content-Type": "application/json"
-            }
-            
-            data = {
-                "messages": [
-                    {
-                        "role": "user",
-                        "content": texto
-                    }
-                ]
-            }
-            
-            resp = requests.post(url, headers=headers, json=data, timeout=30)
-            
-            if resp.status_code == 200:
-                result = resp.json()
-                return result.get('result', {}).get('response', '')
-            else:
-                logger.error(f"Erro Cloudflare: {resp.status_code}")
-                return "Erro no LLM"
-                
+            return self.cliente.completar(texto)
+        except ErroLLM as e:
+            logger.error(f"Erro Cloudflare: {e}")
+            return "Erro no LLM"
         except Exception as e:
             logger.error(f"Erro: {str(e)}")
             return "Erro interno"
@@ -77,81 +63,25 @@ class AgenteLLM:
 # Instância global
 agente = AgenteLLM()
 
+# Chamadas do run_agent (síncrono) ao LLM, pra poder parar de esperar no fim do orçamento
+_llm_threads = ThreadPoolExecutor(max_workers=int(os.getenv('CF_MAX_CONNECTIONS', '10')),
+                                  thread_name_prefix="agente-llm")
+
+# Respostas do LLM já geradas pro mesmo (nome, UF) e mesmos dados
+cache_llm = LLMCache(
+    max_size=int(os.getenv('OAB_LLM_CACHE_SIZE', '500')),
+    ttl=float(os.getenv('OAB_LLM_CACHE_TTL', '86400')),
+    path=os.getenv('OAB_LLM_CACHE_PATH') or None,
+    flush_interval=float(os.getenv('OAB_LLM_CACHE_FLUSH', '5')),
+)
+
 def parse_oab_query(texto: str) -> Dict[str, Any]:
     """
     Extrai nome e UF de uma consulta
-    Função que mais me deu trabalho pra fazer
+    O parser fica em query_parser.py (gramática por token, com os sets montados uma vez só)
     """
     try:
-        # Normaliza o texto
-        texto = texto.strip().upper()
-        
-        # Padrões que tentei e funcionaram
-        padroes = [
-            # "nome: João Silva, uf: SP"
-            r'NOME:\s*([^,]+),?\s*UF:\s*([A-Z]{2})',
-            # "João Silva em SP"
-            r'([A-ZÁÀÂÃÉÈÊÍÌÎÓÒÔÕÚÙÛÇ\s]+)\s+EM\s+([A-Z]{2})',
-            # "João Silva de SP"
-            r'([A-ZÁÀÂÃÉÈÊÍÌÎÓÒÔÕÚÙÛÇ\s]+)\s+DE\s+([A-Z]{2})',
-            # "João Silva do Rio de Janeiro"
-            r'([A-ZÁÀÂÃÉÈÊÍÌÎÓÒÔÕÚÙÛÇ\s]+)\s+D[AO]\s+([A-Z\s]+)',
-            # Palavras-chave
-            r'(?:BUSQUE|CONSULTE|DADOS|ADVOGADO|DR\.?|DRA\.?)\s+([A-ZÁÀÂÃÉÈÊÍÌÎÓÒÔÕÚÙÛÇ\s]+)',
-        ]
-        
-        nome = None
-        uf = None
-        
-        # Primeiro procura a UF
-        for sigla, nome_completo in UFS_BRASIL.items():
-            if sigla in texto:
-                uf = sigla
-                break
-            if nome_completo.upper() in texto:
-                uf = sigla
-                break
-        
-        # Depois procura o nome
-        for padrao in padroes:
-            match = re.search(padrao, texto)
-            if match:
-                nome_encontrado = match.group(1).strip()
-                
-                # Limpa o nome
-                nome_encontrado = re.sub(r'\b(?:BUSQUE|CONSULTE|DADOS|ADVOGADO|DR\.?|DRA\.?)\b', '', nome_encontrado)
-                nome_encontrado = re.sub(r'\s+', ' ', nome_encontrado).strip()
-                
-                if len(nome_encontrado) >= 2:
-                    nome = nome_encontrado
-                    
-                    # Se achou UF no padrão, usa ela
-                    if len(match.groups()) >= 2:
-                        uf_encontrada = match.group(2).strip()
-                        if uf_encontrada in UFS_BRASIL:
-                            uf = uf_encontrada
-                    break
-        
-        # Se não achou nome, tenta extrair da query toda
-        if not nome:
-            limpo = re.sub(r'\b(?:BUSQUE|CONSULTE|DADOS|ADVOGADO|DR\.?|DRA\.?|PRECISO|DOS|DA|DO|O|A|EM|DE)\b', '', texto)
-            limpo = re.sub(r'\b[A-Z]{2}\b', '', limpo)  # Remove UFs
-            limpo = re.sub(r'\s+', ' ', limpo).strip()
-            
-            if len(limpo) >= 2:
-                nome = limpo
-        
-        # Valores default
-        if not nome:
-            nome = "NOME_NAO_ENCONTRADO"
-        if not uf:
-            uf = "SP"  # Default SP
-            
-        return {
-            'name': nome.title(),
-            'uf': uf
-        }
-        
+        return _parser.parse(texto)
     except Exception as e:
         logger.error(f"Erro no parsing: {str(e)}")
         return {
@@ -159,46 +89,45 @@ def parse_oab_query(texto: str) -> Dict[str, Any]:
             'uf': 'SP'
         }
 
+def parse_many(textos: List[str]) -> List[Dict[str, Any]]:
+    """parse_oab_query pra uma lista de consultas"""
+    return _parser.parse_many(textos)
+
+def _resposta_erro(erro: str) -> Dict[str, Any]:
+    return {
+        "oab": None,
+        "nome": None,
+        "uf": None,
+        "categoria": None,
+        "data_inscricao": None,
+        "situacao": None,
+        "error": erro
+    }
+
 def fetch_oab_tool(nome: str, uf: str) -> Dict[str, Any]:
     """
-    Busca na API da OAB
-    Função simples que chama a API
+    Busca na OAB pela mesma camada de serviço do POST /fetch_oab
+    No mesmo processo da API usa o cache e o pool dela; com OAB_API_URL vai numa API remota
     """
     try:
-        url = "http://localhost:8000/fetch_oab"
-        
-        dados = {
-            "name": nome,
-            "uf": uf
-        }
-        
-        resp = requests.post(url, json=dados, timeout=30)
-        
-        if resp.status_code == 200:
-            return resp.json()
-        else:
-            logger.error(f"Erro API: {resp.status_code}")
-            return {
-                "oab": None,
-                "nome": None,
-                "uf": None,
-                "categoria": None,
-                "data_inscricao": None,
-                "situacao": None,
-                "error": f"Erro HTTP {resp.status_code}"
-            }
-            
+        return get_cliente().fetch_oab(nome, uf)
+    except ServicoErro as e:
+        logger.error(f"Erro API: {e}")
+        return _resposta_erro(str(e))
     except Exception as e:
         logger.error(f"Erro na busca: {str(e)}")
-        return {
-            "oab": None,
-            "nome": None,
-            "uf": None,
-            "categoria": None,
-            "data_inscricao": None,
-            "situacao": None,
-            "error": str(e)
-        }
+        return _resposta_erro(str(e))
+
+async def fetch_oab_tool_async(nome: str, uf: str) -> Dict[str, Any]:
+    """Igual ao fetch_oab_tool, pra quem está no event loop (endpoint /agent)"""
+    try:
+        return await get_cliente().fetch_oab_async(nome, uf)
+    except ServicoErro as e:
+        logger.error(f"Erro API: {e}")
+        return _resposta_erro(str(e))
+    except Exception as e:
+        logger.error(f"Erro na busca: {str(e)}")
+        return _resposta_erro(str(e))
 
 def formatar_resposta(dados: Dict[str, Any]) -> str:
     """
@@ -229,11 +158,40 @@ def formatar_resposta(dados: Dict[str, Any]) -> str:
         logger.error(f"Erro ao formatar: {str(e)}")
         return f"❌ **Erro:** {str(e)}"
 
-def run_agent(consulta: str) -> str:
+def _orcamento(budget: Optional[float] = None) -> float:
+    """Segundos que a consulta toda pode levar antes da resposta formatada sair (0 = sem limite)"""
+    if budget is not None:
+        return budget
+    return float(os.getenv('OAB_AGENT_BUDGET', '8'))
+
+def _melhorar_depois() -> bool:
+    """Se o LLM continua depois do fallback (cache, GET /agent/upgrade e SSE)"""
+    return os.getenv('OAB_AGENT_UPGRADE', '1') != '0'
+
+def _restante(inicio: float, orcamento: float) -> Optional[float]:
+    if orcamento <= 0:
+        return None
+    return max(0.0, orcamento - (time.monotonic() - inicio))
+
+def _caminho(nome: str):
+    """Conta por onde a resposta saiu (llm, llm_cache, parser, fallback, llm_error, upgraded)"""
+    metrics.agent_path_total.inc(nome)
+
+def _chamar_e_guardar(parsed: Dict[str, Any], dados_oab: Dict[str, Any], prompt: str) -> Optional[str]:
+    resposta_llm = agente.chamar_llm(prompt)
+    if resposta_llm and "erro" not in resposta_llm.lower():
+        cache_llm.set_resposta(parsed, dados_oab, resposta_llm)
+        return resposta_llm
+    return None
+
+def run_agent(consulta: str, budget: Optional[float] = None) -> str:
     """
     Função principal do agente
+    Se o LLM não responder dentro do orçamento, devolve a resposta formatada
     """
     try:
+        inicio = time.monotonic()
+        orcamento = _orcamento(budget)
         logger.info(f"Processando: {consulta}")
         
         # 1. Fazer parsing da consulta
@@ -248,8 +206,34 @@ def run_agent(consulta: str) -> str:
         resposta = formatar_resposta(dados_oab)
         
         # 4. Se o LLM estiver ativo, tenta melhorar a resposta
-        if agente.ativo:
-            prompt = f"""
+        if not agente.ativo:
+            _caminho("parser")
+            return resposta
+        guardada = cache_llm.get_resposta(parsed, dados_oab)
+        if guardada is not None:
+            _caminho("llm_cache")
+            return guardada
+        
+        # Numa thread, assim dá pra parar de esperar no fim do orçamento
+        # (a chamada termina sozinha e a resposta fica no cache pra próxima)
+        futuro = _llm_threads.submit(_chamar_e_guardar, parsed, dados_oab, _prompt(consulta, dados_oab))
+        try:
+            resposta_llm = futuro.result(timeout=_restante(inicio, orcamento))
+        except FuturesTimeout:
+            _caminho("fallback")
+            return resposta
+        if resposta_llm:
+            _caminho("llm")
+            return resposta_llm
+        _caminho("llm_error")
+        return resposta
+        
+    except Exception as e:
+        logger.error(f"Erro no agente: {str(e)}")
+        return f"❌ **Erro:** {str(e)}"
+
+def _prompt(consulta: str, dados_oab: Dict[str, Any]) -> str:
+    return f"""
             Você é um assistente para consultas da OAB.
             
             Consulta: {consulta}
@@ -257,16 +241,168 @@ def run_agent(consulta: str) -> str:
             
             Dê uma resposta profissional sobre o resultado.
             """
-            
-            resposta_llm = agente.chamar_llm(prompt)
-            if resposta_llm and "erro" not in resposta_llm.lower():
-                return resposta_llm
-        
-        return resposta
-        
+
+# Chamadas ao LLM que passaram do orçamento e continuam rodando (chave do cache_llm -> tarefa)
+_melhorias: Dict[str, "asyncio.Task"] = {}
+
+def _recolher_erro(tarefa: "asyncio.Future"):
+    """Lê o erro de uma chamada que ninguém mais espera (fallback), pra não virar "never retrieved" no log"""
+    if tarefa.cancelled():
+        return
+    erro = tarefa.exception()
+    if erro is not None:
+        logger.error(f"Erro do LLM depois do fallback: {erro}")
+
+async def _completar_e_guardar(chave: str, parsed: Dict[str, Any], dados_oab: Dict[str, Any],
+                               prompt: str) -> str:
+    try:
+        resposta_llm = await agente.cliente.completar_async(prompt)
+        if resposta_llm:
+            cache_llm.set_resposta(parsed, dados_oab, resposta_llm)
+            if chave in _melhorias:
+                _caminho("upgraded")
+        return resposta_llm
+    finally:
+        _melhorias.pop(chave, None)
+
+async def run_agent_async(consulta: str, budget: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Mesma coisa que run_agent, sem travar o event loop
+    Retorna {"response", "success", "source"} e, quando o LLM passou do orçamento e
+    continua rodando, "upgrade_id" pra buscar a versão do LLM depois (GET /agent/upgrade/{id})
+    """
+    inicio = time.monotonic()
+    orcamento = _orcamento(budget)
+    parsed = parse_oab_query(consulta)
+    dados_oab = await fetch_oab_tool_async(parsed['name'], parsed['uf'])
+    resposta = formatar_resposta(dados_oab)
+    sucesso = not dados_oab.get('error')
+    
+    if not agente.ativo:
+        _caminho("parser")
+        return {"response": resposta, "success": sucesso, "source": "parser"}
+    guardada = cache_llm.get_resposta(parsed, dados_oab)
+    if guardada is not None:
+        _caminho("llm_cache")
+        return {"response": guardada, "success": sucesso, "source": "llm_cache"}
+    
+    chave = cache_llm.chave(parsed, dados_oab)
+    # Se a mesma resposta já está sendo gerada (de um fallback anterior), espera essa
+    tarefa = _melhorias.get(chave)
+    if tarefa is None:
+        tarefa = asyncio.ensure_future(_completar_e_guardar(chave, parsed, dados_oab, _prompt(consulta, dados_oab)))
+        tarefa.add_done_callback(_recolher_erro)
+    feitas, _ = await asyncio.wait({tarefa}, timeout=_restante(inicio, orcamento))
+    if tarefa not in feitas:
+        _caminho("fallback")
+        if not _melhorar_depois():
+            tarefa.cancel()
+            return {"response": resposta, "success": sucesso, "source": "fallback"}
+        _melhorias[chave] = tarefa
+        return {"response": resposta, "success": sucesso, "source": "fallback", "upgrade_id": chave}
+    try:
+        resposta_llm = tarefa.result()
+    except ErroLLM as e:
+        logger.error(f"Erro Cloudflare: {e}")
+        resposta_llm = None
     except Exception as e:
-        logger.error(f"Erro no agente: {str(e)}")
-        return f"❌ **Erro:** {str(e)}"
+        logger.error(f"Erro inesperado no LLM: {type(e).__name__}: {e}")
+        resposta_llm = None
+    if not resposta_llm:
+        _caminho("llm_error")
+        return {"response": resposta, "success": sucesso, "source": "fallback"}
+    _caminho("llm")
+    return {"response": resposta_llm, "success": sucesso, "source": "llm"}
+
+def estado_melhoria(upgrade_id: str) -> Optional[Dict[str, Any]]:
+    """pending enquanto o LLM gera, done com a resposta; None se não conhece o id (ou já expirou)"""
+    if upgrade_id in _melhorias:
+        return {"status": "pending", "response": None}
+    achou, resposta = cache_llm.get(upgrade_id)
+    if achou:
+        return {"status": "done", "response": resposta}
+    return None
+
+async def stream_agent(consulta: str, budget: Optional[float] = None) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Eventos (nome, dados) pro SSE do /agent:
+    - result: o que a busca na OAB achou
+    - fallback: o LLM não começou a responder dentro do orçamento - já vem a resposta formatada
+      (com OAB_AGENT_UPGRADE os tokens do LLM continuam chegando depois)
+    - token: pedaço da resposta conforme o LLM gera (sem LLM vem a resposta formatada inteira)
+    - done: resposta completa - se o LLM cair no meio, aqui vem a formatada no lugar dos tokens
+      (source: llm, llm_cache, parser ou fallback)
+    """
+    inicio = time.monotonic()
+    orcamento = _orcamento(budget)
+    parsed = parse_oab_query(consulta)
+    dados_oab = await fetch_oab_tool_async(parsed['name'], parsed['uf'])
+    sucesso = not dados_oab.get('error')
+    resposta = formatar_resposta(dados_oab)
+    yield "result", {"query": parsed, "data": dados_oab}
+    
+    if not agente.ativo:
+        _caminho("parser")
+        yield "token", {"text": resposta}
+        yield "done", {"response": resposta, "success": sucesso, "source": "parser"}
+        return
+    guardada = cache_llm.get_resposta(parsed, dados_oab)
+    if guardada is not None:
+        _caminho("llm_cache")
+        yield "token", {"text": guardada}
+        yield "done", {"response": guardada, "success": sucesso, "source": "llm_cache"}
+        return
+    
+    # Os tokens passam por uma fila pra dar pra esperar o primeiro com prazo
+    fila: asyncio.Queue = asyncio.Queue()
+    
+    async def consumir():
+        try:
+            async for token in agente.cliente.stream(_prompt(consulta, dados_oab)):
+                await fila.put(("token", token))
+            await fila.put(("fim", None))
+        except ErroLLM as e:
+            logger.error(f"Erro Cloudflare no stream: {e}")
+            await fila.put(("erro", e))
+        except Exception as e:
+            # Qualquer erro tem que chegar na fila, senão quem espera o próximo token fica travado
+            logger.error(f"Erro inesperado no stream do LLM: {type(e).__name__}: {e}")
+            await fila.put(("erro", e))
+    
+    tarefa = asyncio.ensure_future(consumir())
+    tarefa.add_done_callback(_recolher_erro)
+    partes = []
+    caiu = False
+    try:
+        while True:
+            espera = _restante(inicio, orcamento) if not partes and not caiu else None
+            try:
+                tipo, valor = await asyncio.wait_for(fila.get(), espera)
+            except asyncio.TimeoutError:
+                caiu = True
+                _caminho("fallback")
+                yield "fallback", {"response": resposta, "success": sucesso}
+                if not _melhorar_depois():
+                    yield "done", {"response": resposta, "success": sucesso, "source": "fallback"}
+                    return
+                continue
+            if tipo == "token":
+                partes.append(valor)
+                yield "token", {"text": valor}
+                continue
+            if tipo == "fim" and partes:
+                resposta_llm = "".join(partes)
+                cache_llm.set_resposta(parsed, dados_oab, resposta_llm)
+                _caminho("upgraded" if caiu else "llm")
+                yield "done", {"response": resposta_llm, "success": sucesso, "source": "llm"}
+                return
+            _caminho("llm_error")
+            if not caiu:
+                yield "token", {"text": resposta}
+            yield "done", {"response": resposta, "success": sucesso, "source": "fallback"}
+            return
+    finally:
+        tarefa.cancel()
 
 # Função compatível com versões antigas
 def run_simple_agent(consulta: str) -> str:
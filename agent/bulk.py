@@ -0,0 +1,272 @@
+"""
+Processa um JSONL grande de consultas em linguagem natural, em paralelo
+
+    python -m agent.bulk consultas.jsonl --output respostas.jsonl --workers 8
+
+Cada linha passa pelo parser, pela busca (fetch_oab_tool: cache, registro local e
+pool da API no mesmo processo, ou OAB_API_URL) e pela formatação. O arquivo de
+entrada é lido aos poucos, com no máximo 2x workers consultas em andamento.
+As respostas vão sendo gravadas no --output conforme terminam (fora de ordem; o
+campo "line" diz de qual linha veio), e o checkpoint (--output + ".ckpt") guarda:
+- até que linha está tudo feito (e o byte dela no arquivo, pra continuar sem reler)
+- as linhas depois dela que já terminaram
+- o tamanho do --output naquele momento
+Se o processo cair, rodar o mesmo comando de novo corta o --output no tamanho do
+checkpoint e continua de onde parou, sem repetir nem perder linha. Um --output que já
+tem conteúdo mas não tem checkpoint não é apagado: só com --restart.
+
+Linha de entrada: {"request_id": ..., "query": ...} - sem "query" usa "body" ou "title"
+(o formato do requests.jsonl); uma string JSON solta também vale.
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from api import service
+from .agent_llm import fetch_oab_tool, formatar_resposta, parse_oab_query
+
+logger = logging.getLogger(__name__)
+
+CAMPOS_CONSULTA = ("query", "body", "title")
+CAMPOS_ID = ("request_id", "id")
+
+
+class Checkpoint:
+    """Progresso de uma rodada, gravado com arquivo temporário + rename"""
+
+    def __init__(self, path: str, entrada: str):
+        self.path = path
+        self.entrada = os.path.abspath(entrada)
+        self.linha = 0            # todas as linhas antes desta já estão no --output
+        self.offset = 0           # byte do arquivo de entrada onde começa self.linha
+        self.feitas: Dict[int, int] = {}  # linhas depois de self.linha que já terminaram -> byte do fim
+        self.saida_bytes = 0      # tamanho do --output quando o checkpoint foi gravado
+        self.processadas = 0
+        self.erros = 0
+
+    def carregar(self) -> bool:
+        """Volta o progresso salvo; False se não tinha checkpoint"""
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                dados = json.load(f)
+        except FileNotFoundError:
+            return False
+        if dados.get("input") != self.entrada:
+            raise ValueError(f"Checkpoint {self.path} é de outro arquivo ({dados.get('input')}); use --restart")
+        self.linha = dados["line"]
+        self.offset = dados["offset"]
+        self.feitas = {int(linha): fim for linha, fim in dados["done"].items()}
+        self.saida_bytes = dados["output_bytes"]
+        self.processadas = dados.get("processed", 0)
+        self.erros = dados.get("errors", 0)
+        return True
+
+    def salvar(self):
+        dados = {
+            "input": self.entrada,
+            "line": self.linha,
+            "offset": self.offset,
+            "done": self.feitas,
+            "output_bytes": self.saida_bytes,
+            "processed": self.processadas,
+            "errors": self.erros,
+        }
+        temporario = f"{self.path}.tmp"
+        with open(temporario, "w", encoding="utf-8") as f:
+            json.dump(dados, f)
+        os.replace(temporario, self.path)
+
+    def terminou(self, linha: int, fim: int):
+        """Marca a linha (que termina no byte fim) como feita e anda com self.linha enquanto não tiver buraco"""
+        self.feitas[linha] = fim
+        while self.linha in self.feitas:
+            self.offset = self.feitas.pop(self.linha)
+            self.linha += 1
+
+
+def ler_entradas(path: str, linha: int = 0, offset: int = 0) -> Iterator[Tuple[int, int, str]]:
+    """(número da linha, byte onde ela termina, texto) a partir de um ponto já conhecido"""
+    with open(path, "rb") as f:
+        f.seek(offset)
+        while True:
+            bruta = f.readline()
+            if not bruta:
+                return
+            yield linha, f.tell(), bruta.decode("utf-8", errors="replace").strip()
+            linha += 1
+
+
+def _consulta(texto: str) -> Tuple[Optional[str], str]:
+    """(id, consulta) de uma linha do JSONL"""
+    item = json.loads(texto)
+    if isinstance(item, str):
+        return None, item
+    if not isinstance(item, dict):
+        raise ValueError("linha não é um objeto JSON nem uma string")
+    consulta = next((item[c] for c in CAMPOS_CONSULTA if isinstance(item.get(c), str) and item[c].strip()), None)
+    if consulta is None:
+        raise ValueError(f"linha sem nenhum dos campos {', '.join(CAMPOS_CONSULTA)}")
+    id_ = next((item[c] for c in CAMPOS_ID if item.get(c) is not None), None)
+    return id_, consulta
+
+
+def processar(linha: int, texto: str) -> Dict[str, Any]:
+    """Uma linha do JSONL: parser, busca e resposta formatada (erros viram um registro com "error")"""
+    inicio = time.perf_counter()
+    resultado: Dict[str, Any] = {"line": linha, "request_id": None}
+    try:
+        resultado["request_id"], consulta = _consulta(texto)
+        resultado["query"] = consulta
+        parsed = parse_oab_query(consulta)
+        dados = fetch_oab_tool(parsed["name"], parsed["uf"])
+        resultado.update({
+            "parsed": parsed,
+            "data": dados,
+            "response": formatar_resposta(dados),
+            "success": bool(dados.get("oab")) and not dados.get("error"),
+            "error": dados.get("error"),
+        })
+    except Exception as e:
+        resultado.update({"success": False, "error": f"{type(e).__name__}: {e}"})
+    resultado["elapsed_ms"] = round((time.perf_counter() - inicio) * 1000, 1)
+    return resultado
+
+
+def rodar(entrada: str, saida: str, workers: int = 4, checkpoint_path: Optional[str] = None,
+          checkpoint_every: int = 50, report_every: float = 5.0, restart: bool = False,
+          limite: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Processa o arquivo e devolve o resumo da rodada
+    - limite: para depois de tantas linhas novas (útil pra testar; o resto fica pro resume)
+    """
+    checkpoint = Checkpoint(checkpoint_path or f"{saida}.ckpt", entrada)
+    retomou = False if restart else checkpoint.carregar()
+    if retomou:
+        logger.info(f"Continuando da linha {checkpoint.linha} ({len(checkpoint.feitas)} adiantadas)")
+    elif not restart and os.path.exists(saida) and os.path.getsize(saida) > 0:
+        # Sem checkpoint não dá pra saber de onde veio esse arquivo - melhor não apagar
+        raise ValueError(f"{saida} já tem conteúdo e não tem checkpoint; use --restart pra sobrescrever")
+
+    # Sem checkpoint começa do zero; com checkpoint descarta o que foi escrito depois dele
+    with open(saida, "ab") as f:
+        f.truncate(checkpoint.saida_bytes)
+
+    inicio = time.monotonic()
+    ultimo_relatorio = inicio
+    novas = erros_novos = 0
+    pendentes: Dict[Any, Tuple[int, int]] = {}
+    interrompido = False
+
+    def relatorio(final: bool = False):
+        passou = max(time.monotonic() - inicio, 1e-9)
+        print(f"{'Total' if final else 'Progresso'}: {novas} consultas em {passou:.1f}s "
+              f"({novas / passou:.1f}/s), {erros_novos} com erro, {len(pendentes)} em andamento",
+              file=sys.stderr, flush=True)
+
+    # Binário pra que o tell() seja o tamanho em bytes que vai pro checkpoint
+    with open(saida, "ab") as arquivo, ThreadPoolExecutor(
+        max_workers=workers, thread_name_prefix="bulk"
+    ) as executor:
+
+        def colher(timeout: Optional[float]):
+            nonlocal novas, erros_novos
+            prontas, _ = wait(pendentes, timeout=timeout, return_when=FIRST_COMPLETED)
+            for futuro in prontas:
+                linha, fim = pendentes.pop(futuro)
+                resultado = futuro.result()
+                arquivo.write(json.dumps(resultado, ensure_ascii=False).encode("utf-8") + b"\n")
+                checkpoint.terminou(linha, fim)
+                novas += 1
+                checkpoint.processadas += 1
+                if not resultado["success"]:
+                    erros_novos += 1
+                    checkpoint.erros += 1
+                if novas % checkpoint_every == 0:
+                    arquivo.flush()
+                    checkpoint.saida_bytes = arquivo.tell()
+                    checkpoint.salvar()
+
+        try:
+            for linha, fim, texto in ler_entradas(entrada, checkpoint.linha, checkpoint.offset):
+                if linha in checkpoint.feitas:
+                    continue
+                if not texto:
+                    # Linha em branco não gera resposta, só anda com o checkpoint
+                    checkpoint.terminou(linha, fim)
+                    continue
+                if limite is not None and novas + len(pendentes) >= limite:
+                    break
+                pendentes[executor.submit(processar, linha, texto)] = (linha, fim)
+                while len(pendentes) >= workers * 2:
+                    colher(timeout=None)
+                if report_every and time.monotonic() - ultimo_relatorio >= report_every:
+                    relatorio()
+                    ultimo_relatorio = time.monotonic()
+            while pendentes:
+                colher(timeout=report_every or None)
+                if report_every and time.monotonic() - ultimo_relatorio >= report_every:
+                    relatorio()
+                    ultimo_relatorio = time.monotonic()
+        except KeyboardInterrupt:
+            # O que já terminou fica salvo; o que estava em andamento roda de novo no resume
+            interrompido = True
+            for futuro in pendentes:
+                futuro.cancel()
+            logger.warning("Interrompido - rode o mesmo comando pra continuar")
+        finally:
+            arquivo.flush()
+            checkpoint.saida_bytes = arquivo.tell()
+            checkpoint.salvar()
+
+    relatorio(final=True)
+    passou = time.monotonic() - inicio
+    return {
+        "processed": novas,
+        "errors": erros_novos,
+        "seconds": round(passou, 3),
+        "per_second": round(novas / passou, 2) if passou else 0.0,
+        "resumed": retomou,
+        "interrupted": interrompido,
+        "next_line": checkpoint.linha,
+        "total_processed": checkpoint.processadas,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Roda um JSONL de consultas pelo agente (parser, busca e resposta)")
+    parser.add_argument("input", help="JSONL com uma consulta por linha")
+    parser.add_argument("--output", help="JSONL das respostas (padrão: <input>.out.jsonl)")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("OAB_BULK_WORKERS", "4")),
+                        help="consultas em paralelo")
+    parser.add_argument("--checkpoint", help="arquivo do checkpoint (padrão: <output>.ckpt)")
+    parser.add_argument("--checkpoint-every", type=int, default=int(os.getenv("OAB_BULK_CHECKPOINT_EVERY", "50")),
+                        help="grava o checkpoint a cada N respostas")
+    parser.add_argument("--report-every", type=float, default=5.0, help="segundos entre os relatórios de vazão")
+    parser.add_argument("--restart", action="store_true", help="ignora o checkpoint e começa do zero")
+    parser.add_argument("--limit", type=int, help="processa no máximo N linhas novas nesta rodada")
+    args = parser.parse_args(argv)
+
+    saida = args.output or f"{os.path.splitext(args.input)[0]}.out.jsonl"
+    try:
+        resumo = rodar(args.input, saida, workers=max(1, args.workers), checkpoint_path=args.checkpoint,
+                       checkpoint_every=max(1, args.checkpoint_every), report_every=args.report_every,
+                       restart=args.restart, limite=args.limit)
+    except (OSError, ValueError) as e:
+        print(f"Erro: {e}", file=sys.stderr)
+        return 2
+    finally:
+        # Fecha os navegadores (busca no próprio processo) ou as conexões com a OAB_API_URL
+        service.fechar()
+        service.set_cliente(None)
+    print(json.dumps(resumo, ensure_ascii=False))
+    return 130 if resumo["interrupted"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+"""
+Cache das respostas do LLM
+O LLM só reescreve os dados da OAB, então a mesma pessoa com os mesmos dados
+não precisa de outra chamada. A chave é um hash da consulta já interpretada
+(nome normalizado + UF) e dos dados, não do prompt - "Busque Ana Rosa em MS" e
+"nome: ana rosa, uf: ms" caem na mesma entrada.
+Com um caminho (path) as entradas vão pra um JSON e voltam depois de um restart.
+A gravação não acontece a cada resposta nova (o arquivo todo é reescrito): ela fica
+marcada e sai numa thread depois de flush_interval segundos, juntando as respostas
+que chegarem nesse meio tempo. flush() grava na hora (o lifespan da API e o atexit chamam).
+"""
+
+import os
+import atexit
+import json
+import time
+import hashlib
+import logging
+import threading
+from typing import Any, Dict, Optional
+
+from api.cache import TTLCache, normalizar_nome
+
+logger = logging.getLogger(__name__)
+
+
+class LLMCache(TTLCache):
+    """TTLCache das respostas do LLM, com persistência opcional em disco"""
+
+    def __init__(self, max_size: int = 500, ttl: float = 86400, path: Optional[str] = None,
+                 flush_interval: float = 5.0):
+        super().__init__(max_size=max_size, ttl=ttl)
+        self.path = path
+        self.flush_interval = flush_interval
+        self._arquivo_lock = threading.Lock()
+        # Tem alteração que ainda não foi pro disco, e o timer que vai gravar
+        self._sujo = False
+        self._timer: Optional[threading.Timer] = None
+        self._timer_lock = threading.Lock()
+        if path:
+            self.carregar()
+            atexit.register(self.flush)
+
+    @staticmethod
+    def chave(parsed: Dict[str, Any], dados: Dict[str, Any]) -> str:
+        """Hash canônico: mesmo (nome, UF) e mesmos dados = mesma chave, em qualquer ordem de campos"""
+        canonico = json.dumps(
+            {
+                "name": normalizar_nome(parsed.get("name", "")),
+                "uf": (parsed.get("uf") or "").strip().upper(),
+                "dados": dados,
+            },
+            sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str,
+        )
+        return hashlib.sha256(canonico.encode("utf-8")).hexdigest()
+
+    def get_resposta(self, parsed: Dict[str, Any], dados: Dict[str, Any]) -> Optional[str]:
+        achou, resposta = self.get(self.chave(parsed, dados))
+        return resposta if achou else None
+
+    def set_resposta(self, parsed: Dict[str, Any], dados: Dict[str, Any], resposta: str):
+        # Erro na busca costuma ser passageiro, não vale guardar a resposta em cima dele
+        if not resposta or dados.get("error"):
+            return
+        self.set(self.chave(parsed, dados), resposta)
+        if self.path:
+            self._agendar()
+
+    def _agendar(self):
+        """Marca que tem coisa nova e agenda a gravação numa thread (se ainda não tiver uma agendada)"""
+        with self._timer_lock:
+            self._sujo = True
+            if self._timer is not None:
+                return
+            self._timer = threading.Timer(self.flush_interval, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        """Grava agora o que estiver pendente"""
+        with self._timer_lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._sujo:
+                return
+            self._sujo = False
+        self.salvar()
+
+    def carregar(self) -> int:
+        """Lê as entradas ainda válidas do arquivo; retorna quantas voltaram"""
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                entradas = json.load(f)
+        except FileNotFoundError:
+            return 0
+        except (OSError, ValueError) as e:
+            logger.warning(f"Cache do LLM ilegível em {self.path}, começando vazio: {e}")
+            return 0
+        agora = time.time()
+        carregadas = 0
+        for entrada in entradas:
+            restante = entrada["expires_at"] - agora
+            if restante > 0:
+                self.set(entrada["key"], entrada["response"], restante)
+                carregadas += 1
+        logger.info(f"Cache do LLM: {carregadas} respostas carregadas de {self.path}")
+        return carregadas
+
+    def salvar(self):
+        """Grava as entradas válidas (arquivo temporário + rename, pra não deixar JSON pela metade)"""
+        agora = time.time()
+        entradas = [
+            {"key": chave, "expires_at": agora + restante, "response": resposta}
+            for chave, restante, resposta in self.items()
+        ]
+        with self._arquivo_lock:
+            try:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                temporario = f"{self.path}.tmp"
+                with open(temporario, "w", encoding="utf-8") as f:
+                    json.dump(entradas, f, ensure_ascii=False)
+                os.replace(temporario, self.path)
+            except OSError as e:
+                logger.error(f"Erro ao salvar o cache do LLM: {e}")
+
+    def clear(self) -> int:
+        total = super().clear()
+        if self.path:
+            self._agendar()
+        return total
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        stats["ttl"] = self.ttl
+        stats["persistent"] = bool(self.path)
+        return stats
@@ -0,0 +1,141 @@
+"""
+Cliente do Workers AI da Cloudflare
+Um httpx.Client (e um AsyncClient por event loop) fica aberto e reaproveita as
+conexões, então só a primeira chamada paga o handshake TLS. Cada chamada tem o
+seu prazo, e o stream() devolve os tokens conforme o modelo gera (SSE da Cloudflare).
+CF_API_BASE troca o endereço da API - os testes usam um servidor local no lugar.
+"""
+
+import json
+import asyncio
+import logging
+import weakref
+from typing import AsyncIterator, Dict, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+CF_API_BASE = "https://api.cloudflare.com/client/v4"
+MODELO_PADRAO = "@cf/meta/llama-2-7b-chat-fp16"
+
+
+class ErroLLM(Exception):
+    """O LLM não respondeu (status ruim, rede, resposta fora do formato ou prazo estourado)"""
+
+
+class ClienteLLM:
+    """
+    - timeout: prazo padrão (segundos) de cada chamada inteira, não de cada leitura
+    - max_connections: conexões abertas ao mesmo tempo (e mantidas em keep-alive)
+    """
+
+    def __init__(self, account_id: str, token: str, base_url: str = CF_API_BASE,
+                 modelo: str = MODELO_PADRAO, timeout: float = 30.0, max_connections: int = 10):
+        self.url = f"{base_url.rstrip('/')}/accounts/{account_id}/ai/run/{modelo}"
+        self.timeout = timeout
+        self._headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
+        self._limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        self._sync: Optional[httpx.Client] = None
+        # As conexões do AsyncClient ficam presas ao loop em que foram abertas
+        self._async: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def _corpo(self, prompt: str, stream: bool = False) -> Dict:
+        corpo = {"messages": [{"role": "user", "content": prompt}]}
+        if stream:
+            corpo["stream"] = True
+        return corpo
+
+    def _cliente_async(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        cliente = self._async.get(loop)
+        if cliente is None:
+            cliente = self._async[loop] = httpx.AsyncClient(headers=self._headers, limits=self._limits)
+        return cliente
+
+    @staticmethod
+    def _texto(resp: httpx.Response) -> str:
+        if resp.status_code != 200:
+            raise ErroLLM(f"Cloudflare respondeu {resp.status_code}")
+        try:
+            resultado = resp.json().get("result")
+        except (ValueError, AttributeError) as e:
+            raise ErroLLM(f"Resposta da Cloudflare fora do formato: {resp.text[:80]}") from e
+        # 200 com "result": null (ou sem texto) também acontece
+        texto = resultado.get("response") if isinstance(resultado, dict) else None
+        if not isinstance(texto, str):
+            raise ErroLLM(f"Resposta da Cloudflare fora do formato: {resp.text[:80]}")
+        return texto
+
+    def completar(self, prompt: str, timeout: Optional[float] = None) -> str:
+        """Resposta inteira, bloqueando a thread"""
+        if self._sync is None:
+            self._sync = httpx.Client(headers=self._headers, limits=self._limits)
+        try:
+            resp = self._sync.post(self.url, json=self._corpo(prompt),
+                                   timeout=self.timeout if timeout is None else timeout)
+        except httpx.HTTPError as e:
+            raise ErroLLM(f"Erro falando com a Cloudflare: {e}") from e
+        return self._texto(resp)
+
+    async def completar_async(self, prompt: str, timeout: Optional[float] = None) -> str:
+        """Resposta inteira sem travar o loop; estoura ErroLLM se passar do prazo"""
+        prazo = self.timeout if timeout is None else timeout
+        try:
+            resp = await asyncio.wait_for(
+                self._cliente_async().post(self.url, json=self._corpo(prompt), timeout=prazo), prazo
+            )
+        except asyncio.TimeoutError as e:
+            raise ErroLLM(f"LLM não respondeu em {prazo:.1f}s") from e
+        except httpx.HTTPError as e:
+            raise ErroLLM(f"Erro falando com a Cloudflare: {e}") from e
+        return self._texto(resp)
+
+    async def stream(self, prompt: str, timeout: Optional[float] = None) -> AsyncIterator[str]:
+        """Tokens conforme chegam; o prazo vale pro stream todo"""
+        loop = asyncio.get_running_loop()
+        prazo = self.timeout if timeout is None else timeout
+        fim = loop.time() + prazo
+        try:
+            async with self._cliente_async().stream("POST", self.url, json=self._corpo(prompt, stream=True),
+                                                     timeout=prazo) as resp:
+                if resp.status_code != 200:
+                    raise ErroLLM(f"Cloudflare respondeu {resp.status_code}")
+                linhas = resp.aiter_lines()
+                while True:
+                    restante = fim - loop.time()
+                    if restante <= 0:
+                        raise ErroLLM(f"LLM não terminou em {prazo:.1f}s")
+                    try:
+                        linha = await asyncio.wait_for(linhas.__anext__(), restante)
+                    except StopAsyncIteration:
+                        return
+                    except asyncio.TimeoutError as e:
+                        raise ErroLLM(f"LLM não terminou em {prazo:.1f}s") from e
+                    if not linha.startswith("data:"):
+                        continue
+                    dado = linha[5:].strip()
+                    if dado == "[DONE]":
+                        return
+                    try:
+                        texto = json.loads(dado).get("response")
+                    except (ValueError, AttributeError):
+                        logger.warning(f"Evento do LLM ignorado: {dado[:80]}")
+                        continue
+                    if isinstance(texto, str) and texto:
+                        yield texto
+        except (httpx.HTTPError, httpx.StreamError) as e:
+            raise ErroLLM(f"Erro falando com a Cloudflare: {e}") from e
+
+    async def aclose(self):
+        """Fecha o AsyncClient do loop atual"""
+        cliente = self._async.pop(asyncio.get_running_loop(), None)
+        if cliente is not None:
+            await cliente.aclose()
+
+    def close(self):
+        if self._sync is not None:
+            self._sync.close()
+            self._sync = None
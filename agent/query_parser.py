@@ -0,0 +1,260 @@
+"""
+Parser das consultas em linguagem natural ("Busque o advogado João Silva em SP")
+Uma gramática só, por token. Tudo é montado uma vez no import: cada palavra que a
+gramática conhece (comandos, partículas, marcadores, siglas, palavras dos estados) entra
+nos sets do jeito que costuma vir escrita ('busque', 'Busque', 'BUSQUE', 'Dr.', 'nome:',
+'SP?') e também como chave ('GOIAS'), então a consulta só precisa de um split e de
+consultas em set. Palavra que não está em set nenhum é palavra do nome.
+Se sobrar pedaço com pontuação grudada ou caixa estranha ("Rosa/MS", "BuSqUe"), a
+consulta é quebrada pela regex de tokens e a mesma gramática roda de novo com as chaves.
+
+Regras:
+- sigla vale como UF em maiúscula ("SP") ou quando vem marcada: depois de
+  "em/de/do/no/uf:/-//" e no fim da frase ("ana rosa em se"). Minúscula solta só vale como
+  última palavra de uma consulta toda em minúscula ("joao silva rs") - "Carlos Pa", "se",
+  "pa" e "ma" no meio da frase continuam sendo palavras
+- nome de estado ("Rio de Janeiro", "Goiás") só vale depois de preposição, "uf:" ou
+  separador (",", "-", "/") - "Maria Acre" e "Tocantins Silva" são nomes
+- se tiver mais de uma UF, vale a última (o nome vem antes)
+- o nome é a maior sequência de palavras que sobra, sem palavras de comando
+  ("busque", "advogado", "Dr.") e sem artigos/preposições nas pontas
+"""
+
+import re
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+# UFs do Brasil - lista que peguei na internet
+UFS_BRASIL = {
+    'AC': 'Acre', 'AL': 'Alagoas', 'AP': 'Amapá', 'AM': 'Amazonas',
+    'BA': 'Bahia', 'CE': 'Ceará', 'DF': 'Distrito Federal', 'ES': 'Espírito Santo',
+    'GO': 'Goiás', 'MA': 'Maranhão', 'MT': 'Mato Grosso', 'MS': 'Mato Grosso do Sul',
+    'MG': 'Minas Gerais', 'PA': 'Pará', 'PB': 'Paraíba', 'PR': 'Paraná',
+    'PE': 'Pernambuco', 'PI': 'Piauí', 'RJ': 'Rio de Janeiro', 'RN': 'Rio Grande do Norte',
+    'RS': 'Rio Grande do Sul', 'RO': 'Rondônia', 'RR': 'Roraima', 'SC': 'Santa Catarina',
+    'SP': 'São Paulo', 'SE': 'Sergipe', 'TO': 'Tocantins'
+}
+
+NOME_PADRAO = "NOME_NAO_ENCONTRADO"
+UF_PADRAO = "SP"
+
+# Palavras, números e a pontuação que separa partes da consulta
+_TOKEN = re.compile(r"[^\W\d_]+|\d+|[:,;/()\-]")
+
+_ACENTOS = str.maketrans("ÁÀÂÃÄÉÈÊËÍÌÎÏÓÒÔÕÖÚÙÛÜÇÑ", "AAAAAEEEEIIIIOOOOOUUUUCN")
+
+# Chave dos números (não entram no nome)
+_NUMERO = "0"
+
+_PONTUACAO = frozenset(":,;/()-")
+
+# Podem ficar no meio do nome ("Paulo Sérgio de Almeida"), mas não nas pontas
+_PARTICULAS = frozenset({"DE", "DA", "DO", "DOS", "DAS", "E"})
+
+# Nunca fazem parte do nome
+_COMANDOS = frozenset({
+    "BUSQUE", "BUSCA", "BUSCAR", "BUSCO", "PROCURE", "PROCURAR", "ENCONTRE", "CONSULTE", "CONSULTAR",
+    "CONSULTA", "PESQUISE", "PESQUISAR", "VERIFIQUE", "MOSTRE", "TRAGA", "ME", "PRECISO", "QUERO",
+    "GOSTARIA", "SABER", "VER", "DADOS", "INFORMACOES", "INFORMACAO", "REGISTRO", "INSCRICAO", "NUMERO",
+    "OAB", "ADVOGADO", "ADVOGADA", "ADVOGADOS", "ADVOGADAS", "DR", "DRA", "DOUTOR", "DOUTORA",
+    "NOME", "UF", "ESTADO", "SITUACAO", "POR", "FAVOR", "PARA", "MIM", "SOBRE", "QUAL", "E",
+    "O", "A", "OS", "AS", "UM", "UMA", "EM", "NO", "NA", "NOS", "NAS", "DOS", "DAS", "DE", "DA", "DO",
+})
+
+# Antes de uma UF ("em SP", "do Rio de Janeiro", "uf: MS", "Ana Rosa - MS", "Ana Rosa/MS")
+_ANTES_DA_UF = frozenset({"EM", "DE", "DO", "DA", "NO", "NA", "UF", "ESTADO", ":", "-", "/"})
+
+Parsed = Dict[str, str]
+
+
+def chave(token: str) -> str:
+    """Token em maiúscula e sem acento: 'Goiás' -> 'GOIAS'"""
+    return token.upper().translate(_ACENTOS)
+
+
+def _escritas(palavras: Iterable[str]) -> FrozenSet[str]:
+    """Como cada palavra costuma vir: 'goiás', 'Goiás', 'GOIÁS', 'GOIAS' (+ 'Goiás.', 'Goiás?')"""
+    return frozenset(
+        forma + fim
+        for p in palavras
+        for forma in (p.lower(), p.capitalize(), p.upper(), chave(p))
+        for fim in ("", ".", "?", "!")
+    )
+
+
+def _palavras_por_chave() -> Dict[str, Set[str]]:
+    """Chave -> palavras como se escrevem ('PARA' -> {'PARA', 'Pará'}), de tudo que a gramática conhece"""
+    palavras: Dict[str, Set[str]] = {}
+    for palavra in (*_COMANDOS, *UFS_BRASIL, "informações", "informação", "inscrição", "número", "situação",
+                    *(t for nome in UFS_BRASIL.values() for t in _TOKEN.findall(nome))):
+        palavras.setdefault(chave(palavra), set()).add(palavra)
+    return palavras
+
+
+_PALAVRAS = _palavras_por_chave()
+
+
+def _escritas_das_chaves(chaves: Iterable[str]) -> FrozenSet[str]:
+    """_escritas de todas as palavras com essas chaves ('PARA' também vale pra 'Pará')"""
+    return _escritas(p for k in chaves for p in _PALAVRAS.get(k, (k,)))
+
+
+# "nome:" e "uf:" grudados: no parser por token viram a palavra e ":" (que marca a UF)
+_DOIS_PONTOS = frozenset(forma + ":" for p in ("nome", "uf", "estado") for forma in (p, p.capitalize(), p.upper()))
+
+_PARTICULAS_ESCRITAS = _escritas_das_chaves(_PARTICULAS)
+_FORA_DO_NOME = (_escritas_das_chaves(_COMANDOS - _PARTICULAS) | _PONTUACAO | _DOIS_PONTOS | {_NUMERO}) \
+    - _PARTICULAS_ESCRITAS
+_ANTES_DA_UF_ESCRITAS = _escritas_das_chaves(_ANTES_DA_UF - _PONTUACAO) | _PONTUACAO.intersection(_ANTES_DA_UF) \
+    | _DOIS_PONTOS
+# Antes de um nome de estado também vale a vírgula ("Paulo Sérgio de Almeida, Goiás")
+_ANTES_DO_ESTADO_ESCRITAS = _ANTES_DA_UF_ESCRITAS | {","}
+# Depois deles a sigla vale em qualquer caixa, mesmo no meio da frase ("uf: ms, por favor")
+_DEPOIS_DE_UF = _escritas_das_chaves({"UF"}) | {":"} | _DOIS_PONTOS
+
+_SIGLAS_ESCRITAS = {forma: sigla for sigla in UFS_BRASIL for forma in _escritas({sigla})}
+
+
+def _estados_no_fim() -> Dict[str, List[Tuple[int, FrozenSet[str], str]]]:
+    """
+    Última palavra do estado (escrita) -> [(palavras, começo do nome em minúscula, sigla)]
+    ('Janeiro' -> [(3, {'rio de'}, 'RJ')]), os mais longos primeiro
+    """
+    indice: Dict[str, List[Tuple[int, FrozenSet[str], str]]] = {}
+    for sigla, nome in UFS_BRASIL.items():
+        palavras = _TOKEN.findall(nome)
+        comeco = " ".join(palavras[:-1]).lower()
+        opcao = (len(palavras), frozenset({comeco, chave(comeco).lower()}), sigla)
+        for forma in _escritas({palavras[-1]}):
+            indice.setdefault(forma, []).append(opcao)
+    for opcoes in indice.values():
+        opcoes.sort(key=lambda item: -item[0])
+    return indice
+
+
+_ESTADOS_NO_FIM = _estados_no_fim()
+
+_CONHECIDAS = _PARTICULAS_ESCRITAS | _FORA_DO_NOME | _ANTES_DO_ESTADO_ESCRITAS | set(_SIGLAS_ESCRITAS) \
+    | set(_ESTADOS_NO_FIM) | _escritas(p for palavras in _PALAVRAS.values() for p in palavras)
+
+
+class QueryParser:
+    """Parser sem estado por consulta - uma instância serve pra todas as threads"""
+
+    def parse(self, texto: str) -> Parsed:
+        """{'name': ..., 'uf': ...} com os mesmos padrões do parser antigo quando não acha"""
+        texto = texto or ""
+        tokens = texto.replace(",", " , ").split()
+        parsed = _gramatica(texto, tokens, tokens, True)
+        if parsed is None:
+            # Pontuação grudada ou caixa estranha: tokens da regex e as chaves deles
+            originais = _TOKEN.findall(texto)
+            parsed = _gramatica(texto, originais, [_NUMERO if t.isdigit() else chave(t) for t in originais], False)
+        return parsed
+
+    def parse_many(self, textos: Iterable[str]) -> List[Parsed]:
+        """Várias consultas de uma vez (consultas repetidas no lote são interpretadas uma vez só)"""
+        vistos: Dict[str, Parsed] = {}
+        resultado = []
+        for texto in textos:
+            parsed = vistos.get(texto)
+            if parsed is None:
+                parsed = vistos[texto] = self.parse(texto)
+            resultado.append(dict(parsed))
+        return resultado
+
+
+def _gramatica(texto: str, originais: List[str], tokens: List[str], do_split: bool) -> Optional[Parsed]:
+    """
+    As regras da docstring do módulo. tokens é o que se procura nos sets (o próprio pedaço do
+    split, ou a chave do token da regex) e originais é como veio escrito. Com do_split volta
+    None se tiver palavra desconhecida que não seja só letras em caixa normal
+    """
+    total = len(tokens)
+
+    # 1. UF: a última da consulta, procurando de trás pra frente. Achou, os tokens dela viram
+    # ":" pra não entrar no nome (o nome nunca pega esses índices de originais, então tanto faz
+    # se originais e tokens são a mesma lista)
+    uf = None
+    i = total
+    while i:
+        i -= 1
+        token = tokens[i]
+        if token in _SIGLAS_ESCRITAS:
+            # Sigla no meio do texto pode ser palavra ("Carlos Pa", "Veja se Ana Rosa...")
+            anterior = tokens[i - 1] if i else ""
+            fim = i + 1 == total or tokens[i + 1] in _PONTUACAO
+            if originais[i].isupper():
+                vale = fim or anterior in _ANTES_DA_UF_ESCRITAS or not i or not originais[i - 1].isupper()
+            elif anterior in _ANTES_DA_UF_ESCRITAS:
+                vale = fim or anterior in _DEPOIS_DE_UF
+            else:
+                vale = i + 1 == total and texto.islower()
+            if vale:
+                uf = _SIGLAS_ESCRITAS[token]
+                tokens[i] = ":"
+                break
+        elif token in _ESTADOS_NO_FIM:
+            for n, comecos, sigla in _ESTADOS_NO_FIM[token]:
+                if n <= i and tokens[i - n] in _ANTES_DO_ESTADO_ESCRITAS and (
+                        n == 1 or " ".join(tokens[i - n + 1:i]).lower() in comecos):
+                    uf = sigla
+                    tokens[i - n + 1:i + 1] = [":"] * n
+                    break
+            if uf is not None:
+                break
+
+    # 2. Nome: maior sequência de palavras que sobra, sem partículas nas pontas (a primeira
+    # ganha no empate)
+    melhor_inicio = melhor_fim = sequencias = 0
+    com_particula = False
+    inicio = particula = ultimo = j = -1
+    for token in tokens:
+        j += 1
+        if token in _FORA_DO_NOME:
+            if inicio >= 0:
+                if ultimo + 1 - inicio > melhor_fim - melhor_inicio:
+                    melhor_inicio, melhor_fim = inicio, ultimo + 1
+                    com_particula = inicio < particula < ultimo
+                inicio = -1
+        elif token in _PARTICULAS_ESCRITAS:
+            if particula < inicio:
+                particula = j
+        elif inicio < 0:
+            inicio = ultimo = j
+            sequencias += 1
+        else:
+            ultimo = j
+    # A última sequência fecha no fim da consulta
+    if inicio >= 0 and ultimo + 1 - inicio > melhor_fim - melhor_inicio:
+        melhor_inicio, melhor_fim = inicio, ultimo + 1
+        com_particula = inicio < particula < ultimo
+
+    if not melhor_fim:
+        return {"name": NOME_PADRAO, "uf": uf or UF_PADRAO}
+    palavras = originais[melhor_inicio:melhor_fim]
+    nome = " ".join(palavras)
+    titulo = nome.istitle()
+    if do_split:
+        if not "".join(palavras).isalpha():
+            return None
+        # Caixa estranha no nome ("BuSqUe Ana") ou palavra fora dele que pode ser "Rosa/MS"
+        if sequencias > 1 or not (titulo or nome.islower() or nome.isupper()):
+            if not all(_simples(t) for t in tokens if t not in _CONHECIDAS):
+                return None
+
+    if com_particula:
+        nome = " ".join([
+            palavra.lower() if token in _PARTICULAS_ESCRITAS else palavra.capitalize()
+            for palavra, token in zip(palavras, tokens[melhor_inicio:melhor_fim])
+        ])
+    elif not titulo:
+        nome = nome.title()
+    return {"name": nome, "uf": uf or UF_PADRAO}
+
+
+def _simples(palavra: str) -> bool:
+    """Só letras, em caixa normal ('joão', 'João', 'JOÃO') - o que o split resolve sozinho"""
+    return palavra.isalpha() and (palavra.istitle() or palavra.islower() or palavra.isupper())
+
+
+parser = QueryParser()
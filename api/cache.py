@@ -0,0 +1,149 @@
+"""
+Cache dos resultados do scraper
+Muita gente pergunta pelos mesmos advogados, então guardo o resultado
+por um tempo em vez de abrir o site da OAB de novo
+"""
+
+import time
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+from scraper.scraper_oab import AdvogadoData
+
+
+def normalizar_nome(nome: str) -> str:
+    """Tira acentos, caixa e espaços repetidos: 'João  Silva' -> 'joao silva'"""
+    decomposto = unicodedata.normalize("NFKD", nome or "")
+    sem_acento = "".join(c for c in decomposto if not unicodedata.combining(c))
+    return " ".join(sem_acento.casefold().split())
+
+
+class TTLCache:
+    """
+    Cache LRU com tempo de expiração por entrada
+    Thread-safe porque o scraper roda em várias threads
+    """
+
+    def __init__(self, max_size: int = 1000, ttl: float = 3600):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._dados: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expired = 0
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        """Retorna (achou, valor) - achou=False se não tem ou expirou"""
+        agora = time.monotonic()
+        with self._lock:
+            item = self._dados.get(key)
+            if item is not None:
+                expira, valor = item
+                if expira > agora:
+                    self._dados.move_to_end(key)
+                    self.hits += 1
+                    return True, valor
+                del self._dados[key]
+                self.expired += 1
+            self.misses += 1
+            return False, None
+
+    def set(self, key: Hashable, valor: Any, ttl: Optional[float] = None):
+        ttl = self.ttl if ttl is None else ttl
+        if self.max_size <= 0 or ttl <= 0:
+            return
+        with self._lock:
+            self._dados[key] = (time.monotonic() + ttl, valor)
+            self._dados.move_to_end(key)
+            while len(self._dados) > self.max_size:
+                self._dados.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: Hashable) -> bool:
+        with self._lock:
+            return self._dados.pop(key, None) is not None
+
+    def clear(self) -> int:
+        """Limpa tudo e retorna quantas entradas tinha"""
+        with self._lock:
+            total = len(self._dados)
+            self._dados.clear()
+            return total
+
+    def items(self) -> List[Tuple[Hashable, float, Any]]:
+        """Lista (chave, segundos até expirar, valor) das entradas válidas"""
+        agora = time.monotonic()
+        with self._lock:
+            return [(k, expira - agora, v) for k, (expira, v) in self._dados.items() if expira > agora]
+
+    def __len__(self) -> int:
+        return len(self._dados)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._dados),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+                "evictions": self.evictions,
+                "expired": self.expired,
+            }
+
+
+class ResultCache(TTLCache):
+    """
+    Cache das buscas na OAB, chaveado por (nome normalizado, UF)
+    Resultado vazio (não achou) fica menos tempo que resultado positivo
+    """
+
+    def __init__(self, max_size: int = 1000, ttl: float = 86400, negative_ttl: float = 600):
+        super().__init__(max_size=max_size, ttl=ttl)
+        self.negative_ttl = negative_ttl
+
+    @staticmethod
+    def chave(name: str, uf: str) -> Tuple[str, str]:
+        return normalizar_nome(name), (uf or "").strip().upper()
+
+    @classmethod
+    def chave_todos(cls, name: str, uf: str, max_paginas: int = 1) -> Tuple[str, str, str, int]:
+        """Chave da lista completa de resultados (depende de quantas páginas foram lidas)"""
+        return (*cls.chave(name, uf), "todos", max_paginas)
+
+    def get_resultado(self, name: str, uf: str) -> Tuple[bool, Optional[AdvogadoData]]:
+        return self.get(self.chave(name, uf))
+
+    def set_resultado(self, name: str, uf: str, resultado: AdvogadoData):
+        ttl = self.ttl if resultado.oab else self.negative_ttl
+        self.set(self.chave(name, uf), resultado, ttl)
+
+    def get_resultados(self, name: str, uf: str, max_paginas: int = 1) -> Tuple[bool, Optional[List[AdvogadoData]]]:
+        return self.get(self.chave_todos(name, uf, max_paginas))
+
+    def set_resultados(self, name: str, uf: str, resultados: List[AdvogadoData], max_paginas: int = 1):
+        """Guarda a lista completa e também o primeiro resultado (o que o /fetch_oab usa)"""
+        ttl = self.ttl if resultados else self.negative_ttl
+        self.set(self.chave_todos(name, uf, max_paginas), list(resultados), ttl)
+        self.set_resultado(name, uf, resultados[0] if resultados else AdvogadoData())
+
+    def delete_resultado(self, name: str, uf: str) -> bool:
+        """Remove a busca e as listas completas do mesmo (nome, UF)"""
+        chave = self.chave(name, uf)
+        removido = self.delete(chave)
+        for k, _, _ in self.items():
+            if len(k) > 2 and k[:2] == chave:
+                removido = self.delete(k) or removido
+        return removido
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        stats["ttl"] = self.ttl
+        stats["negative_ttl"] = self.negative_ttl
+        return stats
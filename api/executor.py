@@ -0,0 +1,104 @@
+"""
+Executor dedicado pro scraping
+O scraper é todo síncrono, então roda em threads separadas pra não
+travar o loop do asyncio (e o /health junto)
+"""
+
+import math
+import time
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+
+class ExecutorSaturated(Exception):
+    """Fila cheia - a API responde 503 com Retry-After"""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Fila de scraping cheia, tente em {retry_after}s")
+        self.retry_after = retry_after
+
+
+class ScrapeExecutor:
+    """
+    ThreadPool com limite de fila
+    - max_workers: buscas rodando ao mesmo tempo
+    - max_queue: buscas esperando uma thread livre, além das que estão rodando
+    """
+
+    def __init__(self, max_workers: int = 4, max_queue: int = 16):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="scrape")
+        self._lock = threading.Lock()
+        self._pendentes = 0  # na fila + rodando
+        self._rodando = 0
+
+        self.completed = 0
+        self.rejected = 0
+        # Média móvel do tempo de cada busca, usada pro Retry-After
+        self._duracao_media = 5.0
+
+    def retry_after(self) -> int:
+        """Estimativa de quando a fila vai ter espaço"""
+        ondas = max(1, self._pendentes - self.max_workers + 1) / self.max_workers
+        return max(1, math.ceil(self._duracao_media * ondas))
+
+    def submit(self, fn: Callable[..., Any], *args) -> Future:
+        with self._lock:
+            if self._pendentes >= self.max_workers + self.max_queue:
+                self.rejected += 1
+                raise ExecutorSaturated(self.retry_after())
+            self._pendentes += 1
+        try:
+            fut = self._executor.submit(self._rodar, fn, *args)
+        except BaseException:
+            with self._lock:
+                self._pendentes -= 1
+            raise
+        fut.add_done_callback(self._cancelado)
+        return fut
+
+    def _cancelado(self, fut: Future):
+        # Cancelado na fila (shutdown) não passa pelo _rodar, então desconta aqui
+        if fut.cancelled():
+            with self._lock:
+                self._pendentes -= 1
+
+    def _rodar(self, fn: Callable[..., Any], *args) -> Any:
+        inicio = time.monotonic()
+        with self._lock:
+            self._rodando += 1
+        try:
+            return fn(*args)
+        finally:
+            duracao = time.monotonic() - inicio
+            with self._lock:
+                self._rodando -= 1
+                self._pendentes -= 1
+                self.completed += 1
+                self._duracao_media = 0.8 * self._duracao_media + 0.2 * duracao
+
+    async def run(self, fn: Callable[..., Any], *args) -> Any:
+        """Versão async: espera o resultado sem bloquear o loop"""
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "running": self._rodando,
+                "queued": self._pendentes - self._rodando,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "avg_seconds": round(self._duracao_media, 3),
+            }
+
+    def shutdown(self, wait: bool = False):
+        """Cancela o que está na fila (quem espera pelo SingleFlight recebe ChamadaCancelada)"""
+        self._executor.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,118 @@
+"""
+Índice de nomes com busca aproximada (trigramas)
+Serve pra achar "Joao Silva", "joão silv" ou "Ana Cury" no registro local
+sem precisar abrir o site da OAB
+"""
+
+import time
+import threading
+from collections import defaultdict
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
+
+from scraper.scraper_oab import AdvogadoData
+from .cache import normalizar_nome
+
+
+def trigramas(nome: str) -> FrozenSet[str]:
+    """Trigramas de cada palavra, no estilo do pg_trgm ('  ana ' -> '  a', ' an', 'ana', 'na ')"""
+    grams = set()
+    for palavra in normalizar_nome(nome).split():
+        palavra = f"  {palavra} "
+        for i in range(len(palavra) - 2):
+            grams.add(palavra[i:i + 3])
+    return frozenset(grams)
+
+
+def similaridade(consulta: FrozenSet[str], nome: FrozenSet[str]) -> float:
+    """
+    Média entre Jaccard e quanto da consulta aparece no nome
+    Assim nome parcial ("Ana Cury") ainda pontua, mas o nome completo pontua mais
+    """
+    if not consulta or not nome:
+        return 0.0
+    comum = len(consulta & nome)
+    jaccard = comum / len(consulta | nome)
+    cobertura = comum / len(consulta)
+    return (jaccard + cobertura) / 2
+
+
+class _Particao:
+    """Índice de uma UF só"""
+
+    def __init__(self):
+        self.docs: Dict[str, Tuple[AdvogadoData, FrozenSet[str], float]] = {}
+        self.postings: Dict[str, Set[str]] = defaultdict(set)
+
+    def adicionar(self, adv: AdvogadoData, atualizado_em: float):
+        self.remover(adv.oab)
+        grams = trigramas(adv.nome or "")
+        self.docs[adv.oab] = (adv, grams, atualizado_em)
+        for g in grams:
+            self.postings[g].add(adv.oab)
+
+    def remover(self, oab: str):
+        antigo = self.docs.pop(oab, None)
+        if antigo is None:
+            return
+        for g in antigo[1]:
+            ids = self.postings.get(g)
+            if ids is not None:
+                ids.discard(oab)
+                if not ids:
+                    del self.postings[g]
+
+    def candidatos(self, grams: FrozenSet[str]) -> Set[str]:
+        ids: Set[str] = set()
+        for g in grams:
+            ids |= self.postings.get(g, set())
+        return ids
+
+
+class FuzzyNameIndex:
+    """Índice em memória, separado por UF, atualizado a cada registro novo"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._ufs: Dict[str, _Particao] = defaultdict(_Particao)
+
+    def adicionar(self, adv: AdvogadoData, atualizado_em: Optional[float] = None):
+        if not adv.oab or not adv.uf or not adv.nome:
+            return
+        with self._lock:
+            self._ufs[adv.uf.upper()].adicionar(adv, atualizado_em or time.time())
+
+    def buscar(self, name: str, uf: Optional[str] = None, limite: int = 10,
+               threshold: float = 0.5) -> List[Tuple[AdvogadoData, float, float]]:
+        """Retorna [(advogado, score, atualizado_em)] do mais parecido pro menos"""
+        grams = trigramas(name)
+        if not grams:
+            return []
+        with self._lock:
+            if uf:
+                particao = self._ufs.get(uf.upper())
+                particoes = [particao] if particao else []
+            else:
+                particoes = list(self._ufs.values())
+
+            resultados = []
+            for particao in particoes:
+                for oab in particao.candidatos(grams):
+                    adv, doc_grams, atualizado_em = particao.docs[oab]
+                    score = similaridade(grams, doc_grams)
+                    if score >= threshold:
+                        resultados.append((adv, round(score, 4), atualizado_em))
+
+        resultados.sort(key=lambda r: r[1], reverse=True)
+        return resultados[:limite]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(p.docs) for p in self._ufs.values())
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "records": sum(len(p.docs) for p in self._ufs.values()),
+                "ufs": len(self._ufs),
+                "trigrams": sum(len(p.postings) for p in self._ufs.values()),
+            }
@@ -0,0 +1,253 @@
+"""
+Jobs assíncronos pra buscas demoradas
+O cliente recebe um id na hora e consulta depois (ou recebe no callback),
+em vez de segurar a conexão durante o scraping todo
+O callback_url vem do cliente, então só vai pra http/https em endereço público (ou
+pros hosts liberados em callback_hosts) - senão a API vira um proxy pra rede interna
+"""
+
+import json
+import time
+import socket
+import ipaddress
+import uuid
+import queue
+import sqlite3
+import logging
+import threading
+from dataclasses import asdict
+from typing import Any, Callable, Dict, List, Optional, Sequence
+from urllib.parse import urlsplit
+
+import requests
+
+from scraper.scraper_oab import AdvogadoData
+
+logger = logging.getLogger(__name__)
+
+# Status possíveis de um job
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+ERROR = "error"
+
+
+class CallbackInvalido(ValueError):
+    """callback_url que a API não vai chamar"""
+
+
+def validar_callback(url: str, hosts_permitidos: Sequence[str] = ()):
+    """
+    Confere se dá pra mandar o POST do job pra essa URL
+    - só http/https
+    - com hosts_permitidos, só esses hosts (podem ser da rede interna)
+    - sem, o host tem que resolver só pra endereços públicos: nada de localhost,
+      rede privada, link-local (ex: 169.254.169.254 dos metadados da nuvem) etc.
+    """
+    partes = urlsplit(url)
+    if partes.scheme not in ("http", "https") or not partes.hostname:
+        raise CallbackInvalido("callback_url deve ser uma URL http ou https")
+    host = partes.hostname.lower()
+    if hosts_permitidos:
+        if host not in hosts_permitidos:
+            raise CallbackInvalido(f"Host do callback_url não está liberado: {host}")
+        return
+    try:
+        enderecos = {info[4][0] for info in socket.getaddrinfo(host, partes.port or 80, proto=socket.IPPROTO_TCP)}
+    except (socket.gaierror, UnicodeError, ValueError):
+        raise CallbackInvalido(f"Host do callback_url não resolve: {host}")
+    for endereco in enderecos:
+        # Tira o "%eth0" de IPv6 com escopo antes de analisar
+        if not ipaddress.ip_address(endereco.split("%", 1)[0]).is_global:
+            raise CallbackInvalido(f"callback_url aponta pra um endereço interno: {host}")
+
+
+class JobStore:
+    """Guarda os jobs num SQLite local pra sobreviver a um restart"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    name TEXT NOT NULL,
+                    uf TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    callback_url TEXT,
+                    callback_status INTEGER,
+                    result TEXT,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status)")
+
+    def criar(self, name: str, uf: str, callback_url: Optional[str] = None) -> Dict[str, Any]:
+        agora = time.time()
+        job_id = uuid.uuid4().hex
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO jobs (id, name, uf, status, callback_url, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, name, uf, QUEUED, callback_url, agora, agora),
+            )
+        return self.get(job_id)
+
+    def atualizar(self, job_id: str, **campos):
+        if "result" in campos and campos["result"] is not None:
+            campos["result"] = json.dumps(campos["result"])
+        campos["updated_at"] = time.time()
+        colunas = ", ".join(f"{k} = ?" for k in campos)
+        with self._lock, self._conn:
+            self._conn.execute(f"UPDATE jobs SET {colunas} WHERE id = ?", (*campos.values(), job_id))
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def pendentes(self) -> List[str]:
+        """Jobs que não terminaram (ex: o processo caiu no meio)"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id FROM jobs WHERE status IN (?, ?) ORDER BY created_at", (QUEUED, RUNNING)
+            ).fetchall()
+        return [row["id"] for row in rows]
+
+    def contar(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        return {row["status"]: row["n"] for row in rows}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class JobRunner:
+    """
+    Threads que processam os jobs da fila
+    processar(name, uf) é a mesma busca do /fetch_oab (cache + scraping)
+    """
+
+    def __init__(self, store: JobStore, processar: Callable[[str, str], AdvogadoData],
+                 workers: int = 2, callback_timeout: float = 10.0, callback_hosts: Sequence[str] = ()):
+        self.store = store
+        self.processar = processar
+        self.workers = workers
+        self.callback_timeout = callback_timeout
+        # Hosts liberados pro callback (vazio = qualquer endereço público)
+        self.callback_hosts = tuple(host.lower() for host in callback_hosts)
+        self._fila: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._threads: List[threading.Thread] = []
+        # Ligado no stop: worker que terminar o job atual não pega o próximo
+        self._parando = threading.Event()
+        self._session = requests.Session()
+
+    def start(self):
+        """Sobe as threads e coloca de volta na fila o que ficou pendente"""
+        if self._threads:
+            return
+        self._parando.clear()
+        # Sobra de um stop (None que nenhum worker pegou); os ids voltam pelo banco logo abaixo
+        self._esvaziar_fila()
+        pendentes = self.store.pendentes()
+        if pendentes:
+            logger.info(f"Retomando {len(pendentes)} job(s) pendente(s)")
+        for job_id in pendentes:
+            self.store.atualizar(job_id, status=QUEUED)
+            self._fila.put(job_id)
+        for i in range(self.workers):
+            t = threading.Thread(target=self._loop, name=f"job-worker-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def validar_callback(self, url: str):
+        """Levanta CallbackInvalido se o callback_url não pode ser chamado (resolve o DNS, então bloqueia)"""
+        validar_callback(url, self.callback_hosts)
+
+    def submit(self, name: str, uf: str, callback_url: Optional[str] = None) -> Dict[str, Any]:
+        job = self.store.criar(name, uf, callback_url)
+        self._fila.put(job["id"])
+        return job
+
+    def _loop(self):
+        while not self._parando.is_set():
+            job_id = self._fila.get()
+            if job_id is None or self._parando.is_set():
+                # O id que ficou na fila continua queued no banco e volta no próximo start
+                return
+            try:
+                self._rodar(job_id)
+            except Exception as e:
+                logger.error(f"Erro inesperado no job {job_id}: {e}")
+
+    def _rodar(self, job_id: str):
+        job = self.store.get(job_id)
+        if job is None or job["status"] not in (QUEUED, RUNNING):
+            return
+        self.store.atualizar(job_id, status=RUNNING)
+        try:
+            resultado = self.processar(job["name"], job["uf"])
+            self.store.atualizar(job_id, status=DONE, result=asdict(resultado), error=None)
+        except Exception as e:
+            logger.error(f"Job {job_id} falhou: {e}")
+            self.store.atualizar(job_id, status=ERROR, error=f"{type(e).__name__}: {e}")
+
+        if job["callback_url"]:
+            self._callback(self.store.get(job_id))
+
+    def _callback(self, job: Dict[str, Any]):
+        """Avisa o cliente no callback_url com o job terminado"""
+        try:
+            # Confere de novo na hora: o DNS pode ter mudado desde o POST /jobs (e não segue redirect)
+            self.validar_callback(job["callback_url"])
+            resp = self._session.post(job["callback_url"], json=job, timeout=self.callback_timeout,
+                                      allow_redirects=False)
+            self.store.atualizar(job["id"], callback_status=resp.status_code)
+        except Exception as e:
+            logger.warning(f"Callback do job {job['id']} falhou: {e}")
+            self.store.atualizar(job["id"], callback_status=0)
+
+    def stop(self, timeout: Optional[float] = 30.0) -> bool:
+        """
+        Para os workers sem processar o resto da fila (os jobs continuam queued no banco).
+        Espera até timeout segundos pelos jobs que já estão rodando e devolve True se
+        todas as threads saíram - só aí dá pra fechar o store
+        """
+        self._parando.set()
+        # Esvazia a fila antes do None, senão cada worker ainda passa pelos ids da frente
+        self._esvaziar_fila()
+        for _ in self._threads:
+            self._fila.put(None)
+        limite = None if timeout is None else time.monotonic() + timeout
+        for t in self._threads:
+            t.join(None if limite is None else max(0.0, limite - time.monotonic()))
+        vivas = [t for t in self._threads if t.is_alive()]
+        if vivas:
+            logger.warning(f"{len(vivas)} worker(s) de jobs ainda rodando depois de {timeout}s")
+            self._threads = vivas
+            return False
+        self._threads = []
+        self._session.close()
+        return True
+
+    def _esvaziar_fila(self):
+        while True:
+            try:
+                self._fila.get_nowait()
+            except queue.Empty:
+                return
+
+    def stats(self) -> Dict[str, Any]:
+        return {"workers": self.workers, "queue": self._fila.qsize(), "jobs": self.store.contar()}
@@ -1,26 +1,111 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from contextlib import asynccontextmanager
+from typing import List, Optional
+import asyncio
+import json
 import logging
+import time
 import sys
 import os
 
 # Gambiarra pra importar o scraper - não consegui resolver de outra forma
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from scraper.scraper_oab import OABScraper
-from .models import FetchOABRequest, FetchOABResponse
+from scraper.scraper_oab import AdvogadoData, resolver_chromedriver
+from .models import (
+    FetchOABRequest, FetchOABResponse, FetchOABBatchRequest, FetchOABBatchItem,
+    FetchOABMultiRequest, FetchOABMultiResponse,
+    JobRequest, JobResponse, AdvogadoRegistroResponse, AdvogadoBuscaItem,
+    AgentQueryRequest, AgentQueryResponse, AgentUpgradeResponse,
+)
+from .executor import ExecutorSaturated
+from .jobs import JobStore, JobRunner, CallbackInvalido
+from . import metrics, service
+from .service import ServicoErro, cache, flight, startup, INICIO_PROCESSO
+from agent import agent_llm
 
 # Configuração básica de log
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Jobs assíncronos - processados por threads próprias
+jobs: Optional[JobRunner] = None
+
+def _criar_jobs() -> JobRunner:
+    caminho = os.getenv("OAB_JOBS_DB", os.path.join(service.DATA_DIR, "jobs.db"))
+    os.makedirs(os.path.dirname(caminho) or ".", exist_ok=True)
+    runner = JobRunner(
+        JobStore(caminho),
+        processar=service.buscar_sync,
+        workers=int(os.getenv("OAB_JOB_WORKERS", "2")),
+        callback_hosts=[h.strip() for h in os.getenv("OAB_CALLBACK_ALLOWED_HOSTS", "").split(",") if h.strip()],
+    )
+    runner.start()
+    return runner
+
+def _get_jobs() -> JobRunner:
+    global jobs
+    if jobs is None:
+        jobs = _criar_jobs()
+    return jobs
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global jobs
+    startup["ready"] = False
+    startup["warm_error"] = None
+    backend = service.backend = service.criar_backend()
+    service.executor = service.criar_executor()
+    # Já retoma os jobs que ficaram pendentes antes do restart
+    jobs = _criar_jobs()
+    try:
+        await asyncio.to_thread(service.get_fuzzy)
+    except Exception as e:
+        logger.error(f"Erro ao montar o índice de nomes: {e}")
+    if backend.modo != "http":
+        try:
+            # Resolve o chromedriver uma vez e abre os navegadores mínimos, numa thread pra não travar o loop
+            await asyncio.to_thread(resolver_chromedriver)
+            if backend.tabs is not None:
+                # Abre o Chrome das abas aqui, pra só ficar pronto (e o erro ir pro warm_error) com ele aberto
+                await asyncio.to_thread(backend.tabs.aquecer)
+            else:
+                await asyncio.to_thread(backend.pool.start)
+        except Exception as e:
+            startup["warm_error"] = str(e)
+            logger.error(f"Erro ao aquecer o pool de drivers: {e}")
+    startup["startup_seconds"] = round(time.monotonic() - INICIO_PROCESSO, 3)
+    metrics.startup_seconds.set(valor=startup["startup_seconds"])
+    # Só com Selenium e sem navegador não dá pra atender; no auto o HTTP ainda funciona
+    startup["ready"] = not (backend.modo == "selenium" and startup["warm_error"])
+    logger.info(f"API pronta em {startup['startup_seconds']:.2f}s (ready={startup['ready']})")
+    yield
+    startup["ready"] = False
+    # O store só fecha com os workers fora; se algum travou, fica aberto até o processo sair
+    if await asyncio.to_thread(jobs.stop):
+        jobs.store.close()
+    jobs = None
+    service.fechar()
+    # Grava o que o cache do LLM ainda não tinha mandado pro disco
+    await asyncio.to_thread(agent_llm.cache_llm.flush)
+    if agent_llm.agente.cliente is not None:
+        await agent_llm.agente.cliente.aclose()
+
 # Cria a aplicação FastAPI
 app = FastAPI(
     title="OAB Scraper API",
     description="API que eu fiz pra buscar dados de advogados na OAB",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+@app.exception_handler(ServicoErro)
+async def servico_erro_handler(request: Request, e: ServicoErro):
+    """Erros da camada de serviço viram a resposta HTTP com o status (e headers) que ela escolheu"""
+    return JSONResponse({"detail": e.detail}, status_code=e.status_code, headers=e.headers)
+
 # CORS liberado - não é o ideal mas funciona
 app.add_middleware(
     CORSMiddleware,
@@ -38,65 +123,288 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+@app.get("/health/live")
+async def health_live():
+    """O processo está de pé (não olha navegador nem site da OAB)"""
+    return {"status": "alive"}
+
+@app.get("/health/ready")
+async def health_ready():
+    """Pronto pra receber buscas: driver resolvido e navegadores aquecidos (503 enquanto sobe)"""
+    backend = service.backend
+    corpo = {
+        "status": "ready" if startup["ready"] else "starting",
+        "backend": backend.modo if backend is not None else None,
+        "startup_seconds": startup["startup_seconds"],
+        "first_lookup_seconds": startup["first_lookup_seconds"],
+    }
+    if backend is not None and backend.modo != "http":
+        corpo["pool"] = backend.tabs.stats() if backend.tabs is not None else backend.pool.stats()
+    if startup["warm_error"]:
+        corpo["warm_error"] = startup["warm_error"]
+    return JSONResponse(corpo, status_code=200 if startup["ready"] else 503)
+
 @app.post("/fetch_oab", response_model=FetchOABResponse)
 async def fetch_oab(dados: FetchOABRequest):
     """
     Busca dados de um advogado na OAB
     Testei bastante e funciona na maioria dos casos
     """
-    scraper = None
+    logger.info(f"Buscando advogado: {dados.name} - UF: {dados.uf}")
+    return await service.consultar(dados.name, dados.uf)
+
+@app.post("/fetch_oab/all", response_model=FetchOABMultiResponse)
+async def fetch_oab_all(dados: FetchOABMultiRequest):
+    """
+    Igual ao /fetch_oab, mas devolve todos os advogados encontrados
+    Segue a paginação do site até max_paginas
+    """
     try:
-        logger.info(f"Buscando advogado: {dados.name} - UF: {dados.uf}")
-        
-        # Validações básicas - aprendi que é importante fazer
-        if not dados.name or not dados.name.strip():
-            raise HTTPException(status_code=400, detail="Nome é obrigatório")
-        
-        if not dados.uf or len(dados.uf.strip()) != 2:
-            raise HTTPException(status_code=400, detail="UF deve ter 2 caracteres")
-        
-        # Normaliza UF pra maiúscula
-        uf = dados.uf.strip().upper()
-        
-        # Lista de UFs válidas - copiei da internet
-        ufs_validas = [
-            "AC", "AL", "AP", "AM", "BA", "CE", "DF", "ES", "GO", 
-            "MA", "MT", "MS", "MG", "PA", "PB", "PR", "PE", "PI", 
-            "RJ", "RN", "RS", "RO", "RR", "SC", "SP", "SE", "TO"
-        ]
+        uf = service.validar(dados.name, dados.uf)
+        limite = int(os.getenv("OAB_MAX_PAGINAS", "5"))
+        max_paginas = min(dados.max_paginas or limite, limite)
+        logger.info(f"Buscando todos: {dados.name} - UF: {uf} (até {max_paginas} páginas)")
         
-        if uf not in ufs_validas:
-            raise HTTPException(status_code=400, detail=f"UF '{uf}' não é válida")
-        
-        # Inicializa o scraper
-        scraper = OABScraper(headless=True)
-        
-        # Faz o scraping
-        resultado = scraper.search_advogado(dados.name.strip(), uf)
-        
-        # Se não encontrou nada, retorna campos vazios
-        if not resultado.oab:
-            return FetchOABResponse()
-        
-        # Retorna os dados encontrados
-        return FetchOABResponse(
-            oab=resultado.oab,
-            nome=resultado.nome,
-            uf=resultado.uf,
-            categoria=resultado.categoria,
-            data_inscricao=resultado.data_inscricao,
-            situacao=resultado.situacao
+        resultados = await service.buscar_todos(dados.name, uf, max_paginas)
+        return FetchOABMultiResponse(
+            total=len(resultados),
+            resultados=[service.para_resposta(r) for r in resultados],
         )
+    except Exception as e:
+        raise service.traduzir_erro(e)
+
+async def _buscar_item(index: int, item: FetchOABRequest, sem: asyncio.Semaphore) -> FetchOABBatchItem:
+    """Uma busca do lote - erro vira status no item em vez de derrubar o lote todo"""
+    async with sem:
+        inicio = time.perf_counter()
+        resultado = None
+        erro = None
+        for tentativa in range(3):
+            try:
+                uf = service.validar(item.name, item.uf)
+                resultado = await service.buscar(item.name, uf)
+                erro = None
+                break
+            except ExecutorSaturated as e:
+                # Fila cheia por causa de outras requisições - espera um pouco e tenta de novo
+                erro = str(e)
+                await asyncio.sleep(min(e.retry_after, 5))
+            except ServicoErro as e:
+                erro = str(e.detail)
+                break
+            except Exception as e:
+                logger.error(f"Erro no item {index} do lote: {e}")
+                erro = f"{type(e).__name__}: {e}"
+                break
+        elapsed_ms = round((time.perf_counter() - inicio) * 1000, 1)
+    
+    if erro is not None:
+        status = "error"
+    else:
+        status = "ok" if resultado.oab else "not_found"
+    return FetchOABBatchItem(
+        index=index,
+        name=item.name,
+        uf=item.uf,
+        status=status,
+        elapsed_ms=elapsed_ms,
+        result=service.para_resposta(resultado) if resultado is not None else None,
+        error=erro,
+    )
+
+@app.post("/fetch_oab/batch")
+async def fetch_oab_batch(dados: FetchOABBatchRequest):
+    """
+    Busca várias pessoas de uma vez
+    Cada resultado sai numa linha NDJSON assim que fica pronto (fora de ordem, use o index)
+    """
+    limite = int(os.getenv("OAB_BATCH_CONCURRENCY", "4"))
+    sem = asyncio.Semaphore(min(dados.concurrency or limite, limite))
+    logger.info(f"Lote com {len(dados.items)} buscas")
+    
+    async def gerar():
+        tarefas = [asyncio.create_task(_buscar_item(i, item, sem)) for i, item in enumerate(dados.items)]
+        try:
+            for proxima in asyncio.as_completed(tarefas):
+                item = await proxima
+                yield item.model_dump_json() + "\n"
+        finally:
+            # Se o cliente desconectar, não precisa continuar o resto
+            for tarefa in tarefas:
+                tarefa.cancel()
+    
+    return StreamingResponse(gerar(), media_type="application/x-ndjson")
+
+@app.post("/agent", response_model=AgentQueryResponse)
+async def agent_endpoint(dados: AgentQueryRequest, request: Request):
+    """
+    Pergunta em linguagem natural ("Busque o advogado João Silva em SP")
+    Com stream=true (ou Accept: text/event-stream) a resposta sai em SSE conforme o LLM gera
+    Se o LLM passar do orçamento (budget ou OAB_AGENT_BUDGET), sai a resposta formatada na hora
+    """
+    if not dados.query or not dados.query.strip():
+        raise HTTPException(status_code=400, detail="Consulta é obrigatória")
+    logger.info(f"Agente: {dados.query}")
+    
+    if dados.stream or "text/event-stream" in request.headers.get("accept", ""):
+        async def eventos():
+            async for evento, corpo in agent_llm.stream_agent(dados.query, dados.budget):
+                yield f"event: {evento}\ndata: {json.dumps(corpo, ensure_ascii=False)}\n\n"
         
-    except HTTPException:
-        raise
+        return StreamingResponse(eventos(), media_type="text/event-stream",
+                                 headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+    
+    return AgentQueryResponse(**await agent_llm.run_agent_async(dados.query, dados.budget))
+
+@app.get("/agent/upgrade/{upgrade_id}", response_model=AgentUpgradeResponse)
+async def agent_upgrade(upgrade_id: str):
+    """Resposta do LLM que passou do orçamento no POST /agent (pending até ficar pronta)"""
+    estado = agent_llm.estado_melhoria(upgrade_id)
+    if estado is None:
+        raise HTTPException(status_code=404, detail="Id desconhecido ou expirado")
+    return AgentUpgradeResponse(**estado)
+
+@app.get("/advogados/busca", response_model=List[AdvogadoBuscaItem])
+async def buscar_advogados_local(name: str, uf: Optional[str] = None, limit: int = 10, threshold: float = 0.5):
+    """Busca aproximada (sem acento, com erro de digitação, nome parcial) só no registro local"""
+    if not name.strip():
+        raise HTTPException(status_code=400, detail="Nome é obrigatório")
+    if uf:
+        uf = service.validar_uf(uf)
+    encontrados = service.get_fuzzy().buscar(name, uf, limite=min(limit, 100), threshold=threshold)
+    return [
+        AdvogadoBuscaItem(**service.para_resposta(adv).model_dump(), score=score, atualizado_em=atualizado_em)
+        for adv, score, atualizado_em in encontrados
+    ]
+
+@app.get("/advogados/{uf}/{oab}", response_model=AdvogadoRegistroResponse)
+async def get_advogado(uf: str, oab: str):
+    """
+    Busca direto pelo número da OAB no registro local
+    Só vai no site se não tiver o registro ou se ele estiver velho
+    """
+    uf = service.validar_uf(uf)
+    oab = oab.strip()
+    if not oab.isdigit():
+        raise HTTPException(status_code=400, detail="Número da OAB deve ter só dígitos")
+    
+    max_idade = float(os.getenv("OAB_REGISTRY_MAX_AGE", "604800"))
+    registro = service.get_registry().get(uf, oab)
+    if registro and time.time() - registro[1] < max_idade:
+        return AdvogadoRegistroResponse(**service.para_resposta(registro[0]).model_dump(),
+                                        fonte="local", atualizado_em=registro[1])
+    
+    try:
+        resultado = await service.buscar_inscricao(oab, uf)
     except Exception as e:
-        logger.error(f"Erro: {str(e)}")
-        raise HTTPException(status_code=500, detail="Algo deu errado")
-    finally:
-        # Sempre fechar o scraper pra não vazar memória
-        if scraper:
-            scraper.close()
+        if registro is None:
+            raise service.traduzir_erro(e)
+        # Melhor devolver o registro velho do que erro
+        logger.warning(f"Scraping falhou, usando registro antigo: {e}")
+        resultado = None
+    
+    if resultado is not None and resultado.oab:
+        return AdvogadoRegistroResponse(**service.para_resposta(resultado).model_dump(),
+                                        fonte="scraping", atualizado_em=time.time())
+    if registro:
+        return AdvogadoRegistroResponse(**service.para_resposta(registro[0]).model_dump(),
+                                        fonte="local", atualizado_em=registro[1])
+    raise HTTPException(status_code=404, detail="Advogado não encontrado")
+
+def _job_resposta(job: dict) -> JobResponse:
+    resultado = job["result"]
+    return JobResponse(
+        id=job["id"],
+        status=job["status"],
+        name=job["name"],
+        uf=job["uf"],
+        created_at=job["created_at"],
+        updated_at=job["updated_at"],
+        result=service.para_resposta(AdvogadoData(**resultado)) if resultado else None,
+        error=job["error"],
+        callback_url=job["callback_url"],
+        callback_status=job["callback_status"],
+    )
+
+@app.post("/jobs", response_model=JobResponse, status_code=202)
+async def criar_job(dados: JobRequest):
+    """
+    Cria um job de busca e retorna o id na hora
+    O resultado sai no GET /jobs/{id} ou no callback_url, se passar um
+    """
+    uf = service.validar(dados.name, dados.uf)
+    if dados.callback_url:
+        try:
+            # Resolve o host numa thread pra não travar o loop
+            await asyncio.to_thread(_get_jobs().validar_callback, dados.callback_url)
+        except CallbackInvalido as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    job = _get_jobs().submit(dados.name.strip(), uf, dados.callback_url)
+    logger.info(f"Job {job['id']} criado: {dados.name} - UF: {uf}")
+    return _job_resposta(job)
+
+@app.get("/jobs/{job_id}", response_model=JobResponse)
+async def consultar_job(job_id: str):
+    job = _get_jobs().store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job não encontrado")
+    return _job_resposta(job)
+
+@app.get("/cache")
+async def cache_info(limit: int = 50):
+    """Estatísticas do cache e as entradas mais recentes"""
+    entradas = []
+    for chave, expira_em, resultado in reversed(cache.items()):
+        if len(entradas) >= limit:
+            break
+        if len(chave) != 2:
+            continue  # listas completas do /fetch_oab/all
+        nome, uf = chave
+        entradas.append({
+            "name": nome,
+            "uf": uf,
+            "oab": resultado.oab,
+            "expires_in": round(expira_em, 1),
+        })
+    return {
+        "stats": cache.stats(),
+        "singleflight": flight.stats(),
+        "executor": service.get_executor().stats(),
+        "llm": agent_llm.cache_llm.stats(),
+        "entries": entradas,
+    }
+
+@app.delete("/cache")
+async def cache_purge(name: Optional[str] = None, uf: Optional[str] = None):
+    """Limpa o cache todo, ou só uma busca se passar name e uf"""
+    if name or uf:
+        if not (name and uf):
+            raise HTTPException(status_code=400, detail="Passe name e uf juntos")
+        removidos = 1 if cache.delete_resultado(name, uf) else 0
+    else:
+        removidos = cache.clear()
+        agent_llm.cache_llm.clear()
+    return {"removed": removidos}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics_endpoint():
+    """Métricas no formato do Prometheus (etapas do scraping, resultados por UF, cache e pool)"""
+    metrics.copiar_stats(metrics.cache_info, cache.stats())
+    metrics.copiar_stats(metrics.singleflight_info, flight.stats())
+    metrics.copiar_stats(metrics.llm_cache_info, agent_llm.cache_llm.stats())
+    # Só exporta o que já existe - o /metrics não deve abrir navegador nem thread
+    backend, executor = service.backend, service.executor
+    if backend is not None:
+        metrics.copiar_stats(metrics.pool_info, backend.pool.stats())
+        if backend.tabs is not None:
+            metrics.copiar_stats(metrics.tabs_info, backend.tabs.stats())
+        if backend.limiter is not None:
+            metrics.copiar_stats(metrics.upstream_info, backend.limiter.stats())
+        if backend.hedger is not None:
+            metrics.copiar_stats(metrics.hedge_info, backend.hedger.stats())
+    if executor is not None:
+        metrics.copiar_stats(metrics.executor_info, executor.stats())
+    return PlainTextResponse(metrics.registry.render(), media_type="text/plain; version=0.0.4")
 
 # Pra rodar direto se quiser
 if __name__ == "__main__":
@@ -0,0 +1,234 @@
+"""
+Métricas no formato texto do Prometheus (GET /metrics)
+Implementação pequena de Counter/Gauge/Histogram pra não puxar dependência nova;
+cada observação é só um lock e umas somas, então dá pra usar no caminho quente
+"""
+
+import bisect
+import threading
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+# Buckets (segundos) pensados pro scraping: de milissegundos (parsing) até dezenas de segundos (Chrome)
+BUCKETS_PADRAO = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+Labels = Tuple[str, ...]
+
+
+def _escapar(valor: str) -> str:
+    return str(valor).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _formatar_labels(nomes: Sequence[str], valores: Sequence[str], extra: str = "") -> str:
+    pares = [f'{n}="{_escapar(v)}"' for n, v in zip(nomes, valores)]
+    if extra:
+        pares.append(extra)
+    return "{" + ",".join(pares) + "}" if pares else ""
+
+
+def _formatar_numero(valor: float) -> str:
+    if valor == float("inf"):
+        return "+Inf"
+    if float(valor).is_integer():
+        return str(int(valor))
+    return repr(float(valor))
+
+
+class _Metrica:
+    tipo = ""
+
+    def __init__(self, nome: str, ajuda: str, labels: Sequence[str] = ()):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _chave(self, valores: Sequence[str]) -> Labels:
+        if len(valores) != len(self.labels):
+            raise ValueError(f"{self.nome} espera os labels {self.labels}")
+        return tuple(str(v) for v in valores)
+
+    def _linhas(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.nome} {self.ajuda}", f"# TYPE {self.nome} {self.tipo}", *self._linhas()]
+
+
+class Counter(_Metrica):
+    """Contador que só aumenta"""
+    tipo = "counter"
+
+    def __init__(self, nome: str, ajuda: str, labels: Sequence[str] = ()):
+        super().__init__(nome, ajuda, labels)
+        self._valores: Dict[Labels, float] = {}
+
+    def inc(self, *labels: str, valor: float = 1.0):
+        chave = self._chave(labels)
+        with self._lock:
+            self._valores[chave] = self._valores.get(chave, 0.0) + valor
+
+    def get(self, *labels: str) -> float:
+        with self._lock:
+            return self._valores.get(self._chave(labels), 0.0)
+
+    def _linhas(self):
+        with self._lock:
+            itens = sorted(self._valores.items())
+        for chave, valor in itens:
+            yield f"{self.nome}{_formatar_labels(self.labels, chave)} {_formatar_numero(valor)}"
+
+
+class Gauge(Counter):
+    """Valor que sobe e desce (ou é definido na hora de exportar)"""
+    tipo = "gauge"
+
+    def dec(self, *labels: str, valor: float = 1.0):
+        self.inc(*labels, valor=-valor)
+
+    def set(self, *labels: str, valor: float):
+        chave = self._chave(labels)
+        with self._lock:
+            self._valores[chave] = float(valor)
+
+
+class Histogram(_Metrica):
+    """Histograma com buckets fixos (contagem, soma e buckets cumulativos na saída)"""
+    tipo = "histogram"
+
+    def __init__(self, nome: str, ajuda: str, labels: Sequence[str] = (),
+                 buckets: Sequence[float] = BUCKETS_PADRAO):
+        super().__init__(nome, ajuda, labels)
+        self.buckets = tuple(sorted(buckets))
+        # por label: [contagem por bucket (não cumulativa, último = +Inf), soma]
+        self._series: Dict[Labels, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, *labels: str, valor: float):
+        chave = self._chave(labels)
+        idx = bisect.bisect_left(self.buckets, valor)
+        with self._lock:
+            serie = self._series.get(chave)
+            if serie is None:
+                serie = self._series[chave] = ([0] * (len(self.buckets) + 1), [0.0])
+            serie[0][idx] += 1
+            serie[1][0] += valor
+
+    def count(self, *labels: str) -> int:
+        with self._lock:
+            serie = self._series.get(self._chave(labels))
+            return sum(serie[0]) if serie else 0
+
+    def _linhas(self):
+        with self._lock:
+            itens = sorted((chave, (list(contagens), soma[0])) for chave, (contagens, soma) in self._series.items())
+        for chave, (contagens, soma) in itens:
+            acumulado = 0
+            for limite, n in zip(self.buckets + (float("inf"),), contagens):
+                acumulado += n
+                le = f'le="{_formatar_numero(limite)}"'
+                yield f"{self.nome}_bucket{_formatar_labels(self.labels, chave, le)} {acumulado}"
+            yield f"{self.nome}_sum{_formatar_labels(self.labels, chave)} {_formatar_numero(soma)}"
+            yield f"{self.nome}_count{_formatar_labels(self.labels, chave)} {acumulado}"
+
+
+class MetricsRegistry:
+    """Guarda as métricas e monta o texto do /metrics"""
+
+    def __init__(self):
+        self._metricas: Dict[str, _Metrica] = {}
+        self._lock = threading.Lock()
+
+    def _registrar(self, metrica: _Metrica):
+        with self._lock:
+            if metrica.nome in self._metricas:
+                raise ValueError(f"Métrica {metrica.nome} já existe")
+            self._metricas[metrica.nome] = metrica
+        return metrica
+
+    def counter(self, nome: str, ajuda: str, labels: Sequence[str] = ()) -> Counter:
+        return self._registrar(Counter(nome, ajuda, labels))
+
+    def gauge(self, nome: str, ajuda: str, labels: Sequence[str] = ()) -> Gauge:
+        return self._registrar(Gauge(nome, ajuda, labels))
+
+    def histogram(self, nome: str, ajuda: str, labels: Sequence[str] = (),
+                  buckets: Sequence[float] = BUCKETS_PADRAO) -> Histogram:
+        return self._registrar(Histogram(nome, ajuda, labels, buckets))
+
+    def render(self) -> str:
+        with self._lock:
+            metricas = list(self._metricas.values())
+        linhas = []
+        for metrica in metricas:
+            linhas.extend(metrica.render())
+        return "\n".join(linhas) + "\n"
+
+
+# Métricas da API (uma instância só pro processo)
+registry = MetricsRegistry()
+
+scrape_stage_seconds = registry.histogram(
+    "oab_scrape_stage_seconds",
+    "Duração de cada etapa do scraping (driver_install, chrome_start, page_load, "
+    "form_fill, result_wait, extraction, http_search, tab_lookup, upstream_wait)",
+    ["stage"],
+)
+scrape_seconds = registry.histogram(
+    "oab_scrape_seconds", "Duração total de uma busca no site da OAB", ["uf"],
+)
+scrapes_total = registry.counter(
+    "oab_scrapes_total", "Buscas no site da OAB por UF e resultado (success, empty, error)", ["uf", "outcome"],
+)
+scrapes_in_flight = registry.gauge(
+    "oab_scrapes_in_flight", "Buscas no site da OAB acontecendo agora",
+)
+browser_requests_total = registry.counter(
+    "oab_browser_requests_total", "Requisições dos navegadores do scraper (blocked ou loaded)", ["status"],
+)
+browser_bytes_total = registry.counter(
+    "oab_browser_bytes_total", "Bytes baixados pelos navegadores do scraper (o que foi bloqueado não é baixado)",
+)
+startup_seconds = registry.gauge(
+    "oab_startup_seconds", "Tempo do start do processo até a API ficar pronta (pool aquecido)",
+)
+first_lookup_seconds = registry.gauge(
+    "oab_first_lookup_seconds", "Tempo do start do processo até a primeira busca no site terminar",
+)
+agent_path_total = registry.counter(
+    "oab_agent_path_total",
+    "Por onde saiu a resposta do agente: llm, llm_cache, parser (sem LLM), fallback (LLM passou do orçamento), "
+    "llm_error ou upgraded (LLM terminou depois do fallback)",
+    ["path"],
+)
+
+# Preenchidas na hora do /metrics a partir dos stats() de cada componente
+cache_info = registry.gauge("oab_cache", "Estatísticas do cache de resultados", ["stat"])
+pool_info = registry.gauge("oab_driver_pool", "Estatísticas do pool de navegadores", ["stat"])
+tabs_info = registry.gauge("oab_browser_tabs", "Buscas em abas de um navegador só", ["stat"])
+upstream_info = registry.gauge(
+    "oab_upstream", "Controle de vazão pro site da OAB (limit = buscas simultâneas permitidas agora)", ["stat"],
+)
+hedge_info = registry.gauge(
+    "oab_hedge", "Segundas tentativas nas buscas lentas do Selenium (hedges, hedge_wins, denied...)", ["stat"],
+)
+executor_info = registry.gauge("oab_executor", "Estatísticas do executor de scraping", ["stat"])
+singleflight_info = registry.gauge("oab_singleflight", "Buscas iguais coalescidas", ["stat"])
+llm_cache_info = registry.gauge("oab_llm_cache", "Cache das respostas do LLM do agente (hit_rate etc.)", ["stat"])
+
+
+def observar_etapa(etapa: str, duracao: float):
+    """Callback passado pros scrapers (on_stage)"""
+    scrape_stage_seconds.observe(etapa, valor=duracao)
+
+
+def observar_rede(bloqueadas: int, carregadas: int, baixados: int):
+    """Callback passado pro OABScraper (on_network) depois de cada busca"""
+    browser_requests_total.inc("blocked", valor=bloqueadas)
+    browser_requests_total.inc("loaded", valor=carregadas)
+    browser_bytes_total.inc(valor=baixados)
+
+
+def copiar_stats(gauge: Gauge, stats: Dict):
+    """Copia os valores numéricos de um stats() pro gauge"""
+    for nome, valor in stats.items():
+        if isinstance(valor, (int, float)) and not isinstance(valor, bool):
+            gauge.set(nome, valor=valor)
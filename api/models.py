@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 
 class FetchOABRequest(BaseModel):
     name: str = Field(..., description="Nome do advogado")
@@ -14,11 +14,67 @@ class FetchOABResponse(BaseModel):
     data_inscricao: Optional[str] = Field(None, description="Data de inscrição")
     situacao: Optional[str] = Field(None, description="Situação")
 
+# Todos os advogados de uma busca (nomes comuns voltam vários)
+class FetchOABMultiRequest(FetchOABRequest):
+    max_paginas: Optional[int] = Field(None, description="Quantas páginas de resultado seguir", ge=1)
+
+class FetchOABMultiResponse(BaseModel):
+    total: int = Field(..., description="Quantidade de advogados encontrados")
+    resultados: List[FetchOABResponse] = Field(default_factory=list)
+
+class AdvogadoRegistroResponse(FetchOABResponse):
+    """Resposta do GET /advogados/{uf}/{oab}"""
+    fonte: str = Field(..., description="local (registro salvo) ou scraping")
+    atualizado_em: float = Field(..., description="Quando o registro foi atualizado (epoch)")
+
+class AdvogadoBuscaItem(FetchOABResponse):
+    """Item da busca aproximada no registro local"""
+    score: float = Field(..., description="Similaridade do nome (0 a 1)")
+    atualizado_em: float
+
+# Busca em lote - cada item volta numa linha do NDJSON
+class FetchOABBatchRequest(BaseModel):
+    items: List[FetchOABRequest] = Field(..., description="Buscas (nome + UF)", min_length=1, max_length=1000)
+    concurrency: Optional[int] = Field(None, description="Buscas em paralelo", ge=1)
+
+class FetchOABBatchItem(BaseModel):
+    index: int = Field(..., description="Posição do item no pedido")
+    name: str
+    uf: str
+    status: str = Field(..., description="ok, not_found ou error")
+    elapsed_ms: float = Field(..., description="Tempo da busca em ms")
+    result: Optional[FetchOABResponse] = None
+    error: Optional[str] = None
+
+# Jobs assíncronos
+class JobRequest(FetchOABRequest):
+    callback_url: Optional[str] = Field(None, description="URL http(s) pública (ou liberada em OAB_CALLBACK_ALLOWED_HOSTS) que recebe um POST com o job quando terminar")
+
+class JobResponse(BaseModel):
+    id: str
+    status: str = Field(..., description="queued, running, done ou error")
+    name: str
+    uf: str
+    created_at: float
+    updated_at: float
+    result: Optional[FetchOABResponse] = None
+    error: Optional[str] = None
+    callback_url: Optional[str] = None
+    callback_status: Optional[int] = Field(None, description="Status HTTP do callback (0 = falhou)")
+
 # Modelos pro agente
 class AgentQueryRequest(BaseModel):
-    query: str = Field(..., description="Pergunta")
+    query: str = Field(..., description="Pergunta em linguagem natural")
+    stream: bool = Field(False, description="Responde em Server-Sent Events, token a token")
+    budget: Optional[float] = Field(None, description="Segundos até sair a resposta formatada se o LLM demorar", ge=0)
 
 class AgentQueryResponse(BaseModel):
-    response: str = Field(..., description="Resposta")
-    success: bool = True
+    response: str = Field(..., description="Resposta do agente")
+    success: bool = Field(True, description="Se a busca na OAB funcionou")
     error: Optional[str] = None
+    source: Optional[str] = Field(None, description="llm, llm_cache, parser ou fallback")
+    upgrade_id: Optional[str] = Field(None, description="Id pra buscar a resposta do LLM depois (GET /agent/upgrade/{id})")
+
+class AgentUpgradeResponse(BaseModel):
+    status: str = Field(..., description="pending ou done")
+    response: Optional[str] = Field(None, description="Resposta do LLM quando status = done")
@@ -0,0 +1,122 @@
+"""
+Registro local dos advogados já encontrados
+Tudo que o scraper acha fica salvo num SQLite, indexado por (UF, OAB) e
+pelo nome normalizado, pra responder sem ir no site da OAB de novo
+"""
+
+import time
+import sqlite3
+import threading
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from scraper.scraper_oab import AdvogadoData
+from .cache import normalizar_nome
+
+CAMPOS = ("oab", "nome", "uf", "categoria", "data_inscricao", "situacao")
+
+
+class AdvogadoRegistry:
+    """Banco local de advogados (SQLite)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        # Chamados a cada registro salvo (ex: índice de busca por nome)
+        self._listeners: List[Callable[[AdvogadoData, float], None]] = []
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS advogados (
+                    uf TEXT NOT NULL,
+                    oab TEXT NOT NULL,
+                    nome TEXT,
+                    nome_normalizado TEXT,
+                    categoria TEXT,
+                    data_inscricao TEXT,
+                    situacao TEXT,
+                    atualizado_em REAL NOT NULL,
+                    PRIMARY KEY (uf, oab)
+                )
+            """)
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_advogados_nome ON advogados (nome_normalizado, uf)"
+            )
+
+    def on_save(self, listener: Callable[[AdvogadoData, float], None]):
+        self._listeners.append(listener)
+
+    def salvar(self, advogados: Iterable[AdvogadoData]) -> int:
+        """Insere ou atualiza os registros; ignora os que não têm OAB/UF"""
+        agora = time.time()
+        linhas = []
+        validos = []
+        for adv in advogados:
+            if not adv.oab or not adv.uf:
+                continue
+            validos.append(adv)
+            linhas.append((
+                adv.uf.upper(), adv.oab, adv.nome, normalizar_nome(adv.nome or ""),
+                adv.categoria, adv.data_inscricao, adv.situacao, agora,
+            ))
+        if not linhas:
+            return 0
+        with self._lock, self._conn:
+            self._conn.executemany("""
+                INSERT INTO advogados (uf, oab, nome, nome_normalizado, categoria, data_inscricao, situacao, atualizado_em)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (uf, oab) DO UPDATE SET
+                    nome = excluded.nome,
+                    nome_normalizado = excluded.nome_normalizado,
+                    categoria = excluded.categoria,
+                    data_inscricao = COALESCE(excluded.data_inscricao, advogados.data_inscricao),
+                    situacao = excluded.situacao,
+                    atualizado_em = excluded.atualizado_em
+            """, linhas)
+        for adv in validos:
+            for listener in self._listeners:
+                listener(adv, agora)
+        return len(linhas)
+
+    @staticmethod
+    def _para_advogado(row: sqlite3.Row) -> AdvogadoData:
+        return AdvogadoData(**{campo: row[campo] for campo in CAMPOS})
+
+    def get(self, uf: str, oab: str) -> Optional[Tuple[AdvogadoData, float]]:
+        """Retorna (advogado, atualizado_em) ou None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM advogados WHERE uf = ? AND oab = ?", (uf.upper(), oab)
+            ).fetchone()
+        if row is None:
+            return None
+        return self._para_advogado(row), row["atualizado_em"]
+
+    def buscar_nome(self, name: str, uf: Optional[str] = None) -> List[Tuple[AdvogadoData, float]]:
+        """Busca exata pelo nome normalizado (sem acento/caixa)"""
+        sql = "SELECT * FROM advogados WHERE nome_normalizado = ?"
+        params: list = [normalizar_nome(name)]
+        if uf:
+            sql += " AND uf = ?"
+            params.append(uf.upper())
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [(self._para_advogado(row), row["atualizado_em"]) for row in rows]
+
+    def todos(self) -> Iterator[Tuple[AdvogadoData, float]]:
+        with self._lock:
+            rows = self._conn.execute("SELECT * FROM advogados").fetchall()
+        for row in rows:
+            yield self._para_advogado(row), row["atualizado_em"]
+
+    def contar(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM advogados").fetchone()[0]
+
+    def stats(self) -> Dict[str, int]:
+        return {"records": self.contar()}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,485 @@
+"""
+Camada de serviço da busca de advogados
+Aqui fica o estado da busca (cache, backend de scraping, executor, registro local e
+índice de nomes), a validação, a busca em si e a tradução dos erros pro status HTTP.
+A API (api.main) e o agente chamam daqui: no mesmo processo o agente usa o mesmo
+cache, registro e pool de navegadores da API, sem ida e volta por HTTP, e sem
+depender do FastAPI.
+Com OAB_API_URL o agente fala com uma API em outro host, por um requests.Session
+que reaproveita as conexões (keep-alive).
+"""
+
+import os
+import time
+import asyncio
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from scraper.scraper_oab import OABScraper, AdvogadoData, BLOQUEIOS_PADRAO
+from scraper.pool import DriverPool, PoolTimeout
+from scraper.http_scraper import OABHttpScraper, HttpScraperError, CNA_URL
+from scraper.backend import ScraperBackend
+from scraper.tabs import TabScraper
+from scraper.limiter import UpstreamLimiter, UpstreamBusy
+from scraper.hedge import Hedger
+from .models import FetchOABResponse
+from .cache import ResultCache
+from .singleflight import SingleFlight, ChamadaCancelada
+from .executor import ScrapeExecutor, ExecutorSaturated
+from .registry import AdvogadoRegistry
+from .fuzzy import FuzzyNameIndex
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class ServicoErro(Exception):
+    """A busca não deu certo - status_code (e headers) seguem o que a API responde"""
+
+    def __init__(self, status_code: int, detail: str, headers: Optional[Dict[str, str]] = None):
+        super().__init__(f"Erro HTTP {status_code}: {detail}")
+        self.status_code = status_code
+        self.detail = detail
+        self.headers = headers
+
+
+# Momento em que o processo subiu, pra medir o cold start
+INICIO_PROCESSO = time.monotonic()
+
+# Estado do startup - o /health/ready só responde 200 depois que o lifespan aquece tudo
+startup = {"ready": False, "startup_seconds": None, "first_lookup_seconds": None, "warm_error": None}
+
+# Cache dos resultados - evita scraping repetido pro mesmo (nome, UF)
+cache = ResultCache(
+    max_size=int(os.getenv("OAB_CACHE_SIZE", "1000")),
+    ttl=float(os.getenv("OAB_CACHE_TTL", "86400")),
+    negative_ttl=float(os.getenv("OAB_CACHE_NEGATIVE_TTL", "600")),
+)
+
+# Buscas iguais em andamento são feitas uma vez só
+flight = SingleFlight()
+
+# Backend de scraping (HTTP + pool de navegadores) - o lifespan da API cria no startup
+backend: Optional[ScraperBackend] = None
+
+def _lista_env(nome: str, padrao=()) -> tuple:
+    """Lista separada por vírgula numa variável de ambiente"""
+    valor = os.getenv(nome)
+    if valor is None:
+        return tuple(padrao)
+    return tuple(item.strip() for item in valor.split(",") if item.strip())
+
+def _criar_pool() -> DriverPool:
+    """Monta o pool com as configurações do .env"""
+    result_timeout = float(os.getenv("OAB_RESULT_TIMEOUT", "10"))
+    block_resources = os.getenv("OAB_BLOCK_RESOURCES", "1") != "0"
+    blocked_urls = _lista_env("OAB_BLOCKED_URLS", BLOQUEIOS_PADRAO)
+    allowed_urls = _lista_env("OAB_ALLOWED_URLS")
+    return DriverPool(
+        factory=lambda: OABScraper(headless=True, result_timeout=result_timeout,
+                                   on_stage=metrics.observar_etapa,
+                                   block_resources=block_resources,
+                                   blocked_urls=blocked_urls,
+                                   allowed_urls=allowed_urls,
+                                   on_network=metrics.observar_rede),
+        min_size=int(os.getenv("OAB_POOL_MIN", "1")),
+        max_size=int(os.getenv("OAB_POOL_MAX", "4")),
+        lease_timeout=float(os.getenv("OAB_POOL_LEASE_TIMEOUT", "30")),
+        max_uses=int(os.getenv("OAB_POOL_MAX_USES", "100")),
+    )
+
+def criar_backend() -> ScraperBackend:
+    """Escolhe o backend pelo OAB_SCRAPER_BACKEND (auto, http ou selenium)"""
+    modo = os.getenv("OAB_SCRAPER_BACKEND", "auto").strip().lower()
+    http = None
+    if modo != "selenium":
+        http = OABHttpScraper(
+            base_url=os.getenv("OAB_CNA_URL", CNA_URL),
+            timeout=float(os.getenv("OAB_HTTP_TIMEOUT", "10")),
+        )
+    pool = _criar_pool()
+    tabs = None
+    max_tabs = int(os.getenv("OAB_TABS_PER_BROWSER", "0"))
+    if max_tabs > 1 and modo != "http":
+        # Um Chrome só com várias abas no lugar de um Chrome por busca
+        tabs = TabScraper(factory=pool.factory, max_tabs=max_tabs,
+                          tab_timeout=float(os.getenv("OAB_TAB_TIMEOUT", "20")))
+    limiter = None
+    if os.getenv("OAB_UPSTREAM_LIMIT", "1") != "0":
+        max_limit = int(os.getenv("OAB_UPSTREAM_MAX", "8"))
+        limiter = UpstreamLimiter(
+            rate=float(os.getenv("OAB_UPSTREAM_RATE", "5")),
+            burst=float(os.getenv("OAB_UPSTREAM_BURST", "10")),
+            min_limit=int(os.getenv("OAB_UPSTREAM_MIN", "1")),
+            max_limit=max_limit,
+            initial_limit=int(os.getenv("OAB_UPSTREAM_INITIAL", "2")),
+            acquire_timeout=float(os.getenv("OAB_UPSTREAM_WAIT", "30")),
+        )
+    hedger = None
+    if os.getenv("OAB_HEDGE", "0") == "1" and tabs is None and modo != "http":
+        # Segunda tentativa em outro driver quando a busca passa do percentil das recentes
+        hedger = Hedger(
+            percentile=float(os.getenv("OAB_HEDGE_PERCENTILE", "95")),
+            budget=float(os.getenv("OAB_HEDGE_BUDGET", "0.1")),
+            min_samples=int(os.getenv("OAB_HEDGE_MIN_SAMPLES", "20")),
+            min_delay=float(os.getenv("OAB_HEDGE_MIN_DELAY", "2")),
+            max_workers=pool.max_size * 2,
+        )
+    return ScraperBackend(modo, pool, http, on_stage=metrics.observar_etapa, tabs=tabs, limiter=limiter,
+                          hedger=hedger)
+
+def get_backend() -> ScraperBackend:
+    """Retorna o backend, criando se o lifespan não rodou (ex: nos testes ou no agente sozinho)"""
+    global backend
+    if backend is None:
+        backend = criar_backend()
+    return backend
+
+# Threads dedicadas pro scraping, fora do loop do asyncio
+executor: Optional[ScrapeExecutor] = None
+
+def criar_executor() -> ScrapeExecutor:
+    return ScrapeExecutor(
+        max_workers=int(os.getenv("OAB_SCRAPE_WORKERS", "4")),
+        max_queue=int(os.getenv("OAB_SCRAPE_QUEUE", "16")),
+    )
+
+def get_executor() -> ScrapeExecutor:
+    global executor
+    if executor is None:
+        executor = criar_executor()
+    return executor
+
+# Pasta dos arquivos locais (SQLite dos jobs etc.)
+DATA_DIR = os.getenv("OAB_DATA_DIR", "data")
+
+# Registro local dos advogados já encontrados
+registry: Optional[AdvogadoRegistry] = None
+registry_lock = threading.Lock()
+
+def get_registry() -> AdvogadoRegistry:
+    global registry
+    with registry_lock:
+        if registry is None:
+            caminho = os.getenv("OAB_REGISTRY_DB", os.path.join(DATA_DIR, "advogados.db"))
+            os.makedirs(os.path.dirname(caminho) or ".", exist_ok=True)
+            registry = AdvogadoRegistry(caminho)
+        return registry
+
+# Índice de nomes aproximados em cima do registro local
+fuzzy: Optional[FuzzyNameIndex] = None
+
+def get_fuzzy() -> FuzzyNameIndex:
+    """Monta o índice com o que já está no registro e passa a receber os novos"""
+    global fuzzy
+    with registry_lock:
+        if fuzzy is not None:
+            return fuzzy
+    reg = get_registry()
+    indice = FuzzyNameIndex()
+    with registry_lock:
+        if fuzzy is not None:
+            return fuzzy
+        reg.on_save(indice.adicionar)
+        fuzzy = indice
+    for adv, atualizado_em in reg.todos():
+        indice.adicionar(adv, atualizado_em)
+    logger.info(f"Índice de nomes com {len(indice)} registros")
+    return indice
+
+def _buscar_local(name: str, uf: str) -> Optional[AdvogadoData]:
+    """
+    Tenta responder pelo índice local antes de fazer scraping
+    Só usa se o nome for bem parecido e o registro não estiver velho
+    """
+    threshold = float(os.getenv("OAB_FUZZY_LOCAL_THRESHOLD", "0.9"))
+    if threshold > 1:
+        return None
+    try:
+        encontrados = get_fuzzy().buscar(name, uf, limite=1, threshold=threshold)
+    except Exception as e:
+        logger.error(f"Erro no índice local: {e}")
+        return None
+    if not encontrados:
+        return None
+    adv, score, atualizado_em = encontrados[0]
+    if time.time() - atualizado_em >= float(os.getenv("OAB_REGISTRY_MAX_AGE", "604800")):
+        return None
+    logger.info(f"Resultado veio do registro local (score {score})")
+    return adv
+
+# Lista de UFs válidas - copiei da internet
+UFS_VALIDAS = [
+    "AC", "AL", "AP", "AM", "BA", "CE", "DF", "ES", "GO",
+    "MA", "MT", "MS", "MG", "PA", "PB", "PR", "PE", "PI",
+    "RJ", "RN", "RS", "RO", "RR", "SC", "SP", "SE", "TO"
+]
+
+def validar(name: str, uf: str) -> str:
+    """Validações básicas - aprendi que é importante fazer. Retorna a UF normalizada"""
+    if not name or not name.strip():
+        raise ServicoErro(400, "Nome é obrigatório")
+    return validar_uf(uf)
+
+def validar_uf(uf: str) -> str:
+    if not uf or len(uf.strip()) != 2:
+        raise ServicoErro(400, "UF deve ter 2 caracteres")
+
+    # Normaliza UF pra maiúscula
+    uf = uf.strip().upper()
+    if uf not in UFS_VALIDAS:
+        raise ServicoErro(400, f"UF '{uf}' não é válida")
+    return uf
+
+def _medir_scrape(uf: str, buscar: Callable[[], List[AdvogadoData]]) -> List[AdvogadoData]:
+    """Roda a busca contando em andamento, duração e resultado (success/empty/error) por UF"""
+    inicio = time.perf_counter()
+    metrics.scrapes_in_flight.inc()
+    try:
+        resultados = buscar()
+    except Exception:
+        metrics.scrapes_total.inc(uf, "error")
+        raise
+    finally:
+        metrics.scrapes_in_flight.dec()
+        metrics.scrape_seconds.observe(uf, valor=time.perf_counter() - inicio)
+    metrics.scrapes_total.inc(uf, "success" if any(r.oab for r in resultados) else "empty")
+    _marcar_primeira_busca()
+    return resultados
+
+def _marcar_primeira_busca():
+    """Loga uma vez quanto tempo levou do start do processo até a primeira busca no site"""
+    if startup["first_lookup_seconds"] is not None:
+        return
+    startup["first_lookup_seconds"] = round(time.monotonic() - INICIO_PROCESSO, 3)
+    metrics.first_lookup_seconds.set(valor=startup["first_lookup_seconds"])
+    logger.info(f"Primeira busca concluída {startup['first_lookup_seconds']:.2f}s depois do start")
+
+def _scrape(name: str, uf: str, max_paginas: int = 1) -> List[AdvogadoData]:
+    """
+    Faz a busca pelo backend configurado (HTTP, com o pool do Selenium de reserva)
+    Todos os advogados da página vão pro cache e pro registro local
+    """
+    resultados = _medir_scrape(uf, lambda: get_backend().search_advogados(name, uf, max_paginas=max_paginas))
+    cache.set_resultados(name, uf, resultados, max_paginas)
+    _registrar(resultados)
+    return resultados
+
+def _scrape_inscricao(oab: str, uf: str) -> AdvogadoData:
+    """Busca pelo número de inscrição - usado quando o registro local não tem ou está velho"""
+    resultados = _medir_scrape(uf, lambda: get_backend().search_advogados("", uf, insc=oab))
+    _registrar(resultados)
+    for resultado in resultados:
+        if resultado.oab == oab:
+            return resultado
+    return AdvogadoData()
+
+def _registrar(resultados: List[AdvogadoData]):
+    """Salva no registro local - erro aqui não pode derrubar a busca"""
+    if not any(r.oab for r in resultados):
+        return
+    try:
+        get_registry().salvar(resultados)
+    except Exception as e:
+        logger.error(f"Erro ao salvar no registro local: {e}")
+
+def _primeiro(resultados: List[AdvogadoData]) -> AdvogadoData:
+    return resultados[0] if resultados else AdvogadoData()
+
+def buscar_sync(name: str, uf: str) -> AdvogadoData:
+    """Mesma busca do buscar, pra quem já está numa thread (ex: jobs)"""
+    achou, resultado = cache.get_resultado(name, uf)
+    if achou:
+        return resultado
+    local = _buscar_local(name, uf)
+    if local is not None:
+        cache.set_resultado(name, uf, local)
+        return local
+    return _primeiro(flight.do(cache.chave_todos(name, uf), lambda: _scrape(name.strip(), uf)))
+
+async def _scrape_async(name: str, uf: str, max_paginas: int = 1) -> List[AdvogadoData]:
+    """Scraping no executor; buscas iguais em andamento esperam a mesma"""
+    fut = flight.submit(
+        cache.chave_todos(name, uf, max_paginas),
+        lambda: _scrape(name.strip(), uf, max_paginas),
+        get_executor().submit,
+    )
+    # shield: se o cliente desistir, a busca continua pra quem mais está esperando
+    return await asyncio.shield(asyncio.wrap_future(fut))
+
+async def buscar(name: str, uf: str) -> AdvogadoData:
+    """Cache primeiro, depois o registro local; se não tiver, scraping"""
+    achou, resultado = cache.get_resultado(name, uf)
+    if achou:
+        logger.info("Resultado veio do cache")
+        return resultado
+
+    local = _buscar_local(name, uf)
+    if local is not None:
+        cache.set_resultado(name, uf, local)
+        return local
+
+    return _primeiro(await _scrape_async(name, uf))
+
+async def buscar_todos(name: str, uf: str, max_paginas: int) -> List[AdvogadoData]:
+    """Lista completa de resultados (cache ou scraping)"""
+    achou, resultados = cache.get_resultados(name, uf, max_paginas)
+    if achou:
+        logger.info("Lista de resultados veio do cache")
+        return resultados
+    return await _scrape_async(name, uf, max_paginas)
+
+async def buscar_inscricao(oab: str, uf: str) -> AdvogadoData:
+    """Scraping pelo número da OAB no executor; pedidos iguais esperam o mesmo"""
+    fut = flight.submit(("insc", uf, oab), lambda: _scrape_inscricao(oab, uf), get_executor().submit)
+    return await asyncio.shield(asyncio.wrap_future(fut))
+
+def traduzir_erro(e: Exception) -> ServicoErro:
+    """Traduz os erros do scraping pro status HTTP certo"""
+    if isinstance(e, ServicoErro):
+        return e
+    if isinstance(e, ExecutorSaturated):
+        logger.warning(str(e))
+        return ServicoErro(503, "Muitas buscas em andamento, tente de novo daqui a pouco",
+                           headers={"Retry-After": str(e.retry_after)})
+    if isinstance(e, UpstreamBusy):
+        logger.warning(str(e))
+        return ServicoErro(503, "Muitas buscas indo pro site da OAB agora, tente de novo daqui a pouco",
+                           headers={"Retry-After": "5"})
+    if isinstance(e, ChamadaCancelada):
+        logger.warning(str(e))
+        return ServicoErro(503, "A API está reiniciando, tente de novo daqui a pouco",
+                           headers={"Retry-After": "5"})
+    if isinstance(e, PoolTimeout):
+        logger.warning(f"Pool de drivers ocupado: {e}")
+        return ServicoErro(503, "Todos os navegadores estão ocupados, tente de novo")
+    if isinstance(e, HttpScraperError):
+        logger.error(f"Erro no CNA: {e}")
+        return ServicoErro(502, "O site da OAB não respondeu direito")
+    logger.error(f"Erro: {str(e)}")
+    return ServicoErro(500, "Algo deu errado")
+
+def para_resposta(resultado: AdvogadoData) -> FetchOABResponse:
+    # Se não encontrou nada, retorna campos vazios
+    if not resultado.oab:
+        return FetchOABResponse()
+
+    return FetchOABResponse(
+        oab=resultado.oab,
+        nome=resultado.nome,
+        uf=resultado.uf,
+        categoria=resultado.categoria,
+        data_inscricao=resultado.data_inscricao,
+        situacao=resultado.situacao
+    )
+
+
+async def consultar(name: str, uf: str) -> FetchOABResponse:
+    """Valida e busca (cache, registro local ou scraping no executor) - usado pelo POST /fetch_oab"""
+    try:
+        uf = validar(name, uf)
+        return para_resposta(await buscar(name, uf))
+    except Exception as e:
+        raise traduzir_erro(e)
+
+
+def consultar_sync(name: str, uf: str) -> FetchOABResponse:
+    """Mesma consulta pra quem já está numa thread (agente, scripts)"""
+    try:
+        uf = validar(name, uf)
+        return para_resposta(buscar_sync(name, uf))
+    except Exception as e:
+        raise traduzir_erro(e)
+
+
+def fechar():
+    """Fecha o backend, o executor e o registro (o próximo uso cria de novo)"""
+    global backend, executor, registry, fuzzy
+    if executor is not None:
+        executor.shutdown()
+        executor = None
+    if backend is not None:
+        backend.close()
+        backend = None
+    if registry is not None:
+        registry.close()
+        registry = None
+    fuzzy = None
+
+
+class ClienteLocal:
+    """Chama a camada de serviço direto, no mesmo processo"""
+
+    def fetch_oab(self, name: str, uf: str) -> Dict[str, Any]:
+        return consultar_sync(name, uf).model_dump()
+
+    async def fetch_oab_async(self, name: str, uf: str) -> Dict[str, Any]:
+        """Pelo executor de scraping da API, sem travar o loop"""
+        return (await consultar(name, uf)).model_dump()
+
+    def close(self):
+        pass
+
+
+class ClienteRemoto:
+    """Fala com o POST /fetch_oab de uma API em outro lugar, reaproveitando as conexões"""
+
+    def __init__(self, base_url: str, timeout: float = 30.0, pool_size: int = 10):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def fetch_oab(self, name: str, uf: str) -> Dict[str, Any]:
+        resp = self.session.post(f"{self.base_url}/fetch_oab", json={"name": name, "uf": uf},
+                                 timeout=self.timeout)
+        if resp.status_code != 200:
+            try:
+                detail = resp.json().get("detail", resp.text)
+            except ValueError:
+                detail = resp.text
+            raise ServicoErro(resp.status_code, str(detail))
+        return resp.json()
+
+    async def fetch_oab_async(self, name: str, uf: str) -> Dict[str, Any]:
+        return await asyncio.to_thread(self.fetch_oab, name, uf)
+
+    def close(self):
+        self.session.close()
+
+
+_cliente = None
+_cliente_lock = threading.Lock()
+
+
+def get_cliente():
+    """Cliente do agente: remoto se OAB_API_URL estiver configurado, senão no próprio processo"""
+    global _cliente
+    with _cliente_lock:
+        if _cliente is None:
+            url = os.getenv("OAB_API_URL", "").strip()
+            if url:
+                logger.info(f"Agente vai buscar na API em {url}")
+                _cliente = ClienteRemoto(
+                    url,
+                    timeout=float(os.getenv("OAB_API_TIMEOUT", "30")),
+                    pool_size=int(os.getenv("OAB_API_POOL_SIZE", "10")),
+                )
+            else:
+                _cliente = ClienteLocal()
+        return _cliente
+
+
+def set_cliente(cliente: Optional[Any]):
+    """Troca o cliente (None volta pro padrão na próxima chamada)"""
+    global _cliente
+    with _cliente_lock:
+        antigo, _cliente = _cliente, cliente
+    if antigo is not None and antigo is not cliente:
+        antigo.close()
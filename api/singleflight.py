@@ -0,0 +1,93 @@
+"""
+Junta buscas iguais que chegam ao mesmo tempo
+Se 10 pessoas pedem o mesmo advogado juntas, só uma busca vai pro site
+da OAB e as outras esperam o resultado dela
+"""
+
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+
+class ChamadaCancelada(RuntimeError):
+    """O executor cancelou a chamada do líder antes dela rodar (ex: desligando)"""
+
+
+class SingleFlight:
+    """Deduplica chamadas em andamento com a mesma chave"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._em_voo: Dict[Hashable, Future] = {}
+
+        self.leaders = 0    # buscas que realmente rodaram
+        self.coalesced = 0  # buscas que pegaram carona numa já em andamento
+
+    def _entrar(self, key: Hashable) -> Tuple[Future, bool]:
+        """Retorna (future, é_líder)"""
+        with self._lock:
+            fut = self._em_voo.get(key)
+            if fut is not None:
+                self.coalesced += 1
+                return fut, False
+            fut = Future()
+            # Marca como rodando pra ninguém conseguir cancelar o resultado compartilhado
+            fut.set_running_or_notify_cancel()
+            self._em_voo[key] = fut
+            self.leaders += 1
+            return fut, True
+
+    def _executar(self, key: Hashable, fut: Future, fn: Callable[[], Any]):
+        try:
+            resultado = fn()
+        except BaseException as e:
+            # Erro também é compartilhado com quem estava esperando
+            fut.set_exception(e)
+        else:
+            fut.set_result(resultado)
+        finally:
+            with self._lock:
+                self._em_voo.pop(key, None)
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Roda fn() uma vez só por chave e devolve o mesmo resultado pra todos"""
+        fut, lider = self._entrar(key)
+        if lider:
+            self._executar(key, fut, fn)
+        return fut.result()
+
+    def submit(self, key: Hashable, fn: Callable[[], Any],
+               executar: Callable[[Callable[[], Any]], Any]) -> Future:
+        """
+        Versão que não bloqueia: o líder manda fn() pro executar (ex: um executor)
+        e todo mundo recebe o mesmo Future. Quem pega carona não ocupa thread
+        """
+        fut, lider = self._entrar(key)
+        if lider:
+            try:
+                agendado = executar(lambda: self._executar(key, fut, fn))
+            except BaseException as e:
+                # Não conseguiu nem enfileirar (ex: fila cheia) - avisa quem já estava esperando
+                self._abandonar(key, fut, e)
+                raise
+            if isinstance(agendado, Future):
+                def cancelado(agendado: Future):
+                    # Cancelado ainda na fila (ex: shutdown com cancel_futures): o _executar nunca vai rodar
+                    if agendado.cancelled():
+                        self._abandonar(key, fut, ChamadaCancelada(f"Chamada {key!r} cancelada antes de rodar"))
+                agendado.add_done_callback(cancelado)
+        return fut
+
+    def _abandonar(self, key: Hashable, fut: Future, erro: BaseException):
+        with self._lock:
+            if self._em_voo.get(key) is fut:
+                del self._em_voo[key]
+        fut.set_exception(erro)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "in_flight": len(self._em_voo),
+                "leaders": self.leaders,
+                "coalesced": self.coalesced,
+            }
@@ -0,0 +1 @@
+"""Micro-benchmarks offline (sem navegador e sem rede) dos caminhos quentes"""
@@ -0,0 +1,98 @@
+"""
+Corpus das consultas em linguagem natural e das respostas da API
+Gerado com seed fixa, então duas rodadas medem exatamente as mesmas entradas
+"""
+
+import glob
+import os
+import random
+from typing import Dict, List, Tuple
+
+from agent.agent_llm import UFS_BRASIL
+
+PASTA_FIXTURES = os.path.join(os.path.dirname(os.path.dirname(__file__)), "tests", "fixtures", "cna")
+
+NOMES = [
+    "João Silva", "Maria Santos", "Ana Rosa", "Pedro Costa", "Ana Carolina Guedes Rosa Cury",
+    "José Antônio Pereira", "Luíza Fernandes", "Carlos Eduardo Lima", "Fernanda Oliveira",
+    "Paulo Sérgio de Almeida", "Beatriz Nogueira", "Márcio Araújo",
+]
+
+MODELOS = [
+    "Busque o advogado {nome} em {uf}",
+    "Preciso dos dados da {nome} do {estado}",
+    "nome: {nome}, uf: {uf}",
+    "Consulte Dr. {nome} em {uf}",
+    "Consulte Dra. {nome} de {uf}",
+    "{nome} em {uf}",
+    "dados do advogado {nome} {uf}",
+    "Quero saber a OAB de {nome} no {estado}",
+]
+
+
+def consultas(total: int = 500, seed: int = 42) -> List[str]:
+    """Consultas variadas misturando modelos, nomes e UFs"""
+    rnd = random.Random(seed)
+    ufs = sorted(UFS_BRASIL.items())
+    resultado = []
+    for _ in range(total):
+        uf, estado = rnd.choice(ufs)
+        nome = rnd.choice(NOMES)
+        resultado.append(rnd.choice(MODELOS).format(nome=nome, uf=uf, estado=estado))
+    return resultado
+
+
+SILABAS = ["ba", "ri", "to", "lu", "ma", "ne", "so", "cal", "der", "fon", "gui", "mar", "tel", "vin", "zor"]
+
+
+def consultas_nomes_unicos(total: int = 2000, seed: int = 7) -> List[str]:
+    """
+    Mesmos modelos, mas cada consulta com um nome inventado que não se repete
+    (NOMES tem só 12 nomes, o que favorece qualquer cache por palavra)
+    """
+    rnd = random.Random(seed)
+    ufs = sorted(UFS_BRASIL.items())
+    vistos = set()
+    resultado = []
+    while len(resultado) < total:
+        nome = " ".join(
+            "".join(rnd.choice(SILABAS) for _ in range(3)).capitalize() for _ in range(rnd.choice((2, 3)))
+        )
+        if nome in vistos:
+            continue
+        vistos.add(nome)
+        uf, estado = rnd.choice(ufs)
+        resultado.append(rnd.choice(MODELOS).format(nome=nome, uf=uf, estado=estado))
+    return resultado
+
+
+def respostas(total: int = 200, seed: int = 42) -> List[Dict]:
+    """Dicionários no formato que o /fetch_oab devolve (achado, não achado e erro)"""
+    rnd = random.Random(seed)
+    resultado = []
+    for i in range(total):
+        sorteio = rnd.random()
+        if sorteio < 0.1:
+            resultado.append({"error": "Erro HTTP 503"})
+        elif sorteio < 0.3:
+            resultado.append({"oab": None, "nome": None, "uf": None})
+        else:
+            resultado.append({
+                "oab": str(rnd.randint(1000, 999999)),
+                "nome": rnd.choice(NOMES).upper(),
+                "uf": rnd.choice(sorted(UFS_BRASIL)),
+                "categoria": rnd.choice(["ADVOGADO", "ADVOGADA", "ESTAGIARIA"]),
+                "data_inscricao": "01/02/2015" if i % 2 else None,
+                "situacao": "Ativo",
+            })
+    return resultado
+
+
+def paginas(pasta: str = PASTA_FIXTURES) -> List[Tuple[str, str, str]]:
+    """(arquivo, UF, HTML) das páginas salvas; a UF vem do fim do nome do arquivo"""
+    resultado = []
+    for caminho in sorted(glob.glob(os.path.join(pasta, "*.html"))):
+        uf = os.path.splitext(os.path.basename(caminho))[0].rsplit("_", 1)[-1].upper()
+        with open(caminho, encoding="utf-8") as f:
+            resultado.append((os.path.basename(caminho), uf, f.read()))
+    return resultado
@@ -0,0 +1,92 @@
+"""
+O parse_oab_query como era antes do agent/query_parser.py (regex por padrão e as 27 UFs
+testadas como substring), só pra servir de referência no benchmark parse_nomes_unicos_antigo
+Não usar fora dos benchmarks: ele acha "SP" dentro de nomes e não tem os comandos novos
+"""
+
+import re
+from typing import Any, Dict
+
+from agent.query_parser import UFS_BRASIL
+
+
+def parse_oab_query(texto: str) -> Dict[str, Any]:
+    """
+    Extrai nome e UF de uma consulta
+    Função que mais me deu trabalho pra fazer
+    """
+    try:
+        # Normaliza o texto
+        texto = texto.strip().upper()
+
+        # Padrões que tentei e funcionaram
+        padroes = [
+            # "nome: João Silva, uf: SP"
+            r'NOME:\s*([^,]+),?\s*UF:\s*([A-Z]{2})',
+            # "João Silva em SP"
+            r'([A-ZÁÀÂÃÉÈÊÍÌÎÓÒÔÕÚÙÛÇ\s]+)\s+EM\s+([A-Z]{2})',
+            # "João Silva de SP"
+            r'([A-ZÁÀÂÃÉÈÊÍÌÎÓÒÔÕÚÙÛÇ\s]+)\s+DE\s+([A-Z]{2})',
+            # "João Silva do Rio de Janeiro"
+            r'([A-ZÁÀÂÃÉÈÊÍÌÎÓÒÔÕÚÙÛÇ\s]+)\s+D[AO]\s+([A-Z\s]+)',
+            # Palavras-chave
+            r'(?:BUSQUE|CONSULTE|DADOS|ADVOGADO|DR\.?|DRA\.?)\s+([A-ZÁÀÂÃÉÈÊÍÌÎÓÒÔÕÚÙÛÇ\s]+)',
+        ]
+
+        nome = None
+        uf = None
+
+        # Primeiro procura a UF
+        for sigla, nome_completo in UFS_BRASIL.items():
+            if sigla in texto:
+                uf = sigla
+                break
+            if nome_completo.upper() in texto:
+                uf = sigla
+                break
+
+        # Depois procura o nome
+        for padrao in padroes:
+            match = re.search(padrao, texto)
+            if match:
+                nome_encontrado = match.group(1).strip()
+
+                # Limpa o nome
+                nome_encontrado = re.sub(r'\b(?:BUSQUE|CONSULTE|DADOS|ADVOGADO|DR\.?|DRA\.?)\b', '', nome_encontrado)
+                nome_encontrado = re.sub(r'\s+', ' ', nome_encontrado).strip()
+
+                if len(nome_encontrado) >= 2:
+                    nome = nome_encontrado
+
+                    # Se achou UF no padrão, usa ela
+                    if len(match.groups()) >= 2:
+                        uf_encontrada = match.group(2).strip()
+                        if uf_encontrada in UFS_BRASIL:
+                            uf = uf_encontrada
+                    break
+
+        # Se não achou nome, tenta extrair da query toda
+        if not nome:
+            limpo = re.sub(r'\b(?:BUSQUE|CONSULTE|DADOS|ADVOGADO|DR\.?|DRA\.?|PRECISO|DOS|DA|DO|O|A|EM|DE)\b', '', texto)
+            limpo = re.sub(r'\b[A-Z]{2}\b', '', limpo)  # Remove UFs
+            limpo = re.sub(r'\s+', ' ', limpo).strip()
+
+            if len(limpo) >= 2:
+                nome = limpo
+
+        # Valores default
+        if not nome:
+            nome = "NOME_NAO_ENCONTRADO"
+        if not uf:
+            uf = "SP"  # Default SP
+
+        return {
+            'name': nome.title(),
+            'uf': uf
+        }
+
+    except Exception:
+        return {
+            'name': 'ERRO_PARSING',
+            'uf': 'SP'
+        }
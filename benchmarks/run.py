@@ -0,0 +1,226 @@
+"""
+Roda os micro-benchmarks e salva o resultado em JSON
+
+    python -m benchmarks.run --output bench.json
+    python -m benchmarks.run --compare bench.json   # compara com uma rodada anterior
+
+Mede ops/s, p50/p99 (em microssegundos) e memória alocada por chamada (tracemalloc).
+Com --compare, sai com código 1 se algum p50 piorou mais que --threshold %.
+"""
+
+import argparse
+import gc
+import itertools
+import json
+import logging
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from . import corpus
+
+# Quantas chamadas medir com o tracemalloc ligado (ele deixa tudo bem mais lento)
+CHAMADAS_MEMORIA = 200
+
+
+def _extract_data():
+    from scraper.scraper_oab import OABScraper
+    scraper = OABScraper.__new__(OABScraper)
+    entradas = [(html, uf) for _, uf, html in corpus.paginas()]
+    return [lambda html=html, uf=uf: scraper._extract_data(html, uf) for html, uf in entradas]
+
+
+def _parse_oab_query():
+    from agent.agent_llm import parse_oab_query
+    return [lambda c=c: parse_oab_query(c) for c in corpus.consultas()]
+
+
+def _parse_nomes_unicos():
+    from agent.agent_llm import parse_oab_query
+    return [lambda c=c: parse_oab_query(c) for c in corpus.consultas_nomes_unicos()]
+
+
+def _parse_nomes_unicos_antigo():
+    # Mesmas consultas com o parser de antes do query_parser, pra ver o ganho sem cache nenhum
+    from .parser_antigo import parse_oab_query
+    return [lambda c=c: parse_oab_query(c) for c in corpus.consultas_nomes_unicos()]
+
+
+def _parse_many():
+    from agent.agent_llm import parse_many
+    consultas = corpus.consultas()
+    # Lotes de 50, pra comparar o custo por consulta com o parse_oab_query
+    lotes = [consultas[i:i + 50] for i in range(0, len(consultas), 50)]
+    return [lambda lote=lote: parse_many(lote) for lote in lotes]
+
+
+def _formatar_resposta():
+    from agent.agent_llm import formatar_resposta
+    return [lambda d=d: formatar_resposta(d) for d in corpus.respostas()]
+
+
+# nome -> função que monta as chamadas (uma por entrada do corpus)
+BENCHMARKS: Dict[str, Callable[[], List[Callable[[], object]]]] = {
+    "extract_data": _extract_data,
+    "parse_oab_query": _parse_oab_query,
+    "parse_nomes_unicos": _parse_nomes_unicos,
+    "parse_nomes_unicos_antigo": _parse_nomes_unicos_antigo,
+    "parse_many": _parse_many,
+    "formatar_resposta": _formatar_resposta,
+}
+
+
+def _percentil(ordenados: List[float], p: float) -> float:
+    if not ordenados:
+        return 0.0
+    idx = min(len(ordenados) - 1, max(0, int(round(p / 100 * (len(ordenados) - 1)))))
+    return ordenados[idx]
+
+
+def medir(chamadas: List[Callable[[], object]], iteracoes: int, aquecimento: int = 50) -> Dict[str, float]:
+    """Roda as chamadas em ciclo e devolve as estatísticas"""
+    ciclo = itertools.cycle(chamadas)
+    for _ in range(min(aquecimento, iteracoes)):
+        next(ciclo)()
+
+    tempos = []
+    relogio = time.perf_counter_ns
+    for _ in range(iteracoes):
+        fn = next(ciclo)
+        inicio = relogio()
+        fn()
+        tempos.append((relogio() - inicio) / 1000)
+    tempos.sort()
+    total_s = sum(tempos) / 1_000_000
+
+    # Memória num passe separado pra não atrapalhar os tempos
+    alocado = []
+    tracemalloc.start()
+    try:
+        for _ in range(min(CHAMADAS_MEMORIA, iteracoes)):
+            fn = next(ciclo)
+            tracemalloc.reset_peak()
+            antes = tracemalloc.get_traced_memory()[0]
+            fn()
+            alocado.append(tracemalloc.get_traced_memory()[1] - antes)
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "iterations": iteracoes,
+        "ops_per_sec": round(iteracoes / total_s, 1) if total_s else 0.0,
+        "mean_us": round(sum(tempos) / len(tempos), 3),
+        "p50_us": round(_percentil(tempos, 50), 3),
+        "p99_us": round(_percentil(tempos, 99), 3),
+        "alloc_bytes_per_call": round(sum(alocado) / len(alocado), 1) if alocado else 0.0,
+    }
+
+
+def speedup_parser(rodadas: int = 20) -> float:
+    """
+    Quantas vezes o parser novo é mais rápido que o antigo nas consultas com nomes únicos.
+    Passa o corpus inteiro alternando os dois e fica com a melhor passada de cada: o p50 de
+    benchmarks rodados um depois do outro mistura o ruído da máquina na conta.
+    O gc fica desligado nas passadas, igual no timeit
+    """
+    novo, antigo = _parse_nomes_unicos(), _parse_nomes_unicos_antigo()
+    melhor = {"novo": float("inf"), "antigo": float("inf")}
+    relogio = time.perf_counter_ns
+    gc_ligado = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(rodadas):
+            for nome, chamadas in (("novo", novo), ("antigo", antigo)):
+                inicio = relogio()
+                for fn in chamadas:
+                    fn()
+                melhor[nome] = min(melhor[nome], relogio() - inicio)
+    finally:
+        if gc_ligado:
+            gc.enable()
+    return round(melhor["antigo"] / melhor["novo"], 1)
+
+
+def rodar(nomes: Optional[List[str]] = None, iteracoes: int = 2000, rodadas_speedup: int = 20) -> Dict:
+    resultados = {}
+    nomes = nomes or list(BENCHMARKS)
+    for nome in nomes:
+        resultados[nome] = medir(BENCHMARKS[nome](), iteracoes)
+    relatorio = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "results": resultados,
+    }
+    if rodadas_speedup and {"parse_nomes_unicos", "parse_nomes_unicos_antigo"} <= set(nomes):
+        relatorio["speedup_parser"] = speedup_parser(rodadas_speedup)
+    return relatorio
+
+
+def comparar(atual: Dict, anterior: Dict, threshold: float = 10.0) -> List[str]:
+    """Imprime a diferença de p50 e devolve os benchmarks que pioraram além do threshold"""
+    piorou = []
+    print(f"\n{'benchmark':26s} {'p50 antes':>12s} {'p50 agora':>12s} {'diferença':>10s}")
+    for nome, novo in atual["results"].items():
+        velho = anterior.get("results", {}).get(nome)
+        if not velho or not velho.get("p50_us"):
+            print(f"{nome:26s} {'-':>12s} {novo['p50_us']:12.3f} {'novo':>10s}")
+            continue
+        delta = (novo["p50_us"] - velho["p50_us"]) / velho["p50_us"] * 100
+        marca = "  <- REGRESSÃO" if delta > threshold else ""
+        print(f"{nome:26s} {velho['p50_us']:12.3f} {novo['p50_us']:12.3f} {delta:+9.1f}%{marca}")
+        if delta > threshold:
+            piorou.append(nome)
+    return piorou
+
+
+def _imprimir(relatorio: Dict):
+    print(f"{'benchmark':26s} {'ops/s':>12s} {'p50 (us)':>10s} {'p99 (us)':>10s} {'bytes/chamada':>14s}")
+    for nome, r in relatorio["results"].items():
+        print(f"{nome:26s} {r['ops_per_sec']:12.1f} {r['p50_us']:10.3f} {r['p99_us']:10.3f} "
+              f"{r['alloc_bytes_per_call']:14.1f}")
+
+    if "speedup_parser" in relatorio:
+        print(f"\nparser novo vs antigo (nomes únicos): {relatorio['speedup_parser']:.1f}x")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Micro-benchmarks offline do scraper e do agente")
+    parser.add_argument("--iterations", type=int, default=2000, help="chamadas medidas por benchmark")
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), help="roda só estes benchmarks")
+    parser.add_argument("--output", help="salva o resultado neste JSON")
+    parser.add_argument("--compare", help="JSON de uma rodada anterior pra comparar")
+    parser.add_argument("--rodadas-speedup", type=int, default=20,
+                        help="passadas do corpus na conta parser novo vs antigo (0 desliga)")
+    parser.add_argument("--threshold", type=float, default=10.0, help="piora máxima aceita no p50 (%%)")
+    args = parser.parse_args(argv)
+
+    # Os logs de cada chamada entrariam na medição e poluem a saída (volta ao normal no fim,
+    # senão quem chamou main() - ex: os testes - fica sem log nenhum)
+    logging.disable(logging.CRITICAL)
+    try:
+        relatorio = rodar(args.only, args.iterations, args.rodadas_speedup)
+    finally:
+        logging.disable(logging.NOTSET)
+    _imprimir(relatorio)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(relatorio, f, indent=2, ensure_ascii=False)
+        print(f"\nResultado salvo em {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            anterior = json.load(f)
+        if comparar(relatorio, anterior, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
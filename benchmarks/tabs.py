@@ -0,0 +1,198 @@
+"""
+Compara um Chrome por busca (DriverPool) com várias abas num Chrome só (TabScraper)
+Mede buscas por segundo e a memória (RSS) somada do Python + chromedriver + Chrome
+
+    python -m benchmarks.tabs --concurrency 4 --lookups 32 --fake
+    python -m benchmarks.tabs --concurrency 4 --lookups 16 --output tabs.json
+
+--fake sobe uma página local parecida com o CNA (resultados aparecem depois de
+--fake-delay ms), pra medir sem depender do site da OAB. Precisa de Chrome instalado.
+A memória é lida do /proc, então só funciona no Linux.
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+from scraper.pool import DriverPool
+from scraper.scraper_oab import OABScraper, CNA_SITE
+from scraper.tabs import TabScraper
+
+PAGINA_FAKE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>CNA</title></head>
+<body>
+<form onsubmit="return false">
+  <input name="NomeAdvo"><input name="Insc">
+  <select name="Uf"><option value="SP">SP</option><option value="MS">MS</option><option value="RJ">RJ</option></select>
+  <button type="button" onclick="pesquisar()">Pesquisar</button>
+</form>
+<div id="resultado"></div>
+<script>
+function pesquisar() {
+  const nome = document.querySelector('[name=NomeAdvo]').value.toUpperCase();
+  const uf = document.querySelector('[name=Uf]').value;
+  setTimeout(() => {
+    document.getElementById('resultado').innerHTML =
+      '<h3>RESULTADO</h3><div>Nome: ' + nome + '</div><div>Tipo: ADVOGADO</div>' +
+      '<div>Inscrição: ' + (100000 + nome.length) + '</div><div>UF: ' + uf + '</div>';
+  }, %(delay)d);
+}
+</script>
+</body></html>
+"""
+
+NOMES = ["Ana Rosa", "Joao Silva", "Maria Souza", "Pedro Costa", "Luiza Fernandes", "Carlos Lima"]
+
+
+def _servidor_fake(delay_ms: int) -> ThreadingHTTPServer:
+    pagina = (PAGINA_FAKE % {"delay": delay_ms}).encode("utf-8")
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(pagina)))
+            self.end_headers()
+            self.wfile.write(pagina)
+
+        def log_message(self, *args):
+            pass
+
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor
+
+
+def _filhos(pid: int) -> List[int]:
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            return [int(p) for p in f.read().split()]
+    except OSError:
+        return []
+
+
+def rss_total_mb() -> Optional[float]:
+    """RSS do processo atual e de todos os descendentes (chromedriver, Chrome e renderers)"""
+    if not os.path.isdir("/proc"):
+        return None
+    total_kb = 0
+    pendentes = [os.getpid()]
+    while pendentes:
+        pid = pendentes.pop()
+        try:
+            with open(f"/proc/{pid}/status") as f:
+                for linha in f:
+                    if linha.startswith("VmRSS:"):
+                        total_kb += int(linha.split()[1])
+                        break
+        except OSError:
+            continue
+        pendentes.extend(_filhos(pid))
+    return total_kb / 1024
+
+
+class _Amostrador:
+    """Lê o RSS de tempos em tempos numa thread e guarda o pico"""
+
+    def __init__(self, intervalo: float = 0.2):
+        self.intervalo = intervalo
+        self.pico = 0.0
+        self._parar = threading.Event()
+        self._thread = threading.Thread(target=self._rodar, daemon=True)
+
+    def _rodar(self):
+        while not self._parar.is_set():
+            self.pico = max(self.pico, rss_total_mb() or 0.0)
+            self._parar.wait(self.intervalo)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._parar.set()
+        self._thread.join()
+
+
+def _rodar(buscar, concorrencia: int, lookups: int) -> Dict:
+    erros = 0
+    with _Amostrador() as amostrador, ThreadPoolExecutor(max_workers=concorrencia) as pool:
+        inicio = time.perf_counter()
+        futuros = [pool.submit(buscar, NOMES[i % len(NOMES)], "SP") for i in range(lookups)]
+        for fut in futuros:
+            try:
+                fut.result()
+            except Exception:
+                erros += 1
+        duracao = time.perf_counter() - inicio
+    return {
+        "lookups": lookups,
+        "errors": erros,
+        "seconds": round(duracao, 3),
+        "lookups_per_sec": round(lookups / duracao, 3),
+        "peak_rss_mb": round(amostrador.pico, 1),
+        "rss_mb_per_concurrent_lookup": round(amostrador.pico / concorrencia, 1),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Um Chrome por busca x abas num Chrome só")
+    parser.add_argument("--concurrency", type=int, default=4, help="buscas ao mesmo tempo")
+    parser.add_argument("--lookups", type=int, default=16, help="total de buscas em cada modo")
+    parser.add_argument("--url", default=CNA_SITE, help="página de busca (padrão: CNA)")
+    parser.add_argument("--fake", action="store_true", help="usa uma página local parecida com o CNA")
+    parser.add_argument("--fake-delay", type=int, default=500, help="ms até o resultado aparecer na página local")
+    parser.add_argument("--output", help="salva o resultado neste JSON")
+    args = parser.parse_args(argv)
+
+    url = args.url
+    servidor = None
+    if args.fake:
+        servidor = _servidor_fake(args.fake_delay)
+        url = f"http://127.0.0.1:{servidor.server_address[1]}/"
+
+    def fabrica():
+        return OABScraper(headless=True, base_url=url, block_resources=True)
+
+    base = rss_total_mb()
+    resultado = {"concurrency": args.concurrency, "url": url, "baseline_rss_mb": base and round(base, 1)}
+
+    pool = DriverPool(factory=fabrica, min_size=args.concurrency, max_size=args.concurrency)
+    pool.start()
+
+    def buscar_pool(nome, uf):
+        with pool.lease() as scraper:
+            return scraper.search_advogados(nome, uf)
+
+    resultado["processes"] = _rodar(buscar_pool, args.concurrency, args.lookups)
+    pool.close()
+
+    tabs = TabScraper(factory=fabrica, max_tabs=args.concurrency)
+    tabs.start()
+    resultado["tabs"] = _rodar(tabs.search_advogados, args.concurrency, args.lookups)
+    tabs.close()
+
+    if servidor is not None:
+        servidor.shutdown()
+
+    print(f"{'modo':12s} {'buscas/s':>10s} {'erros':>6s} {'pico RSS (MB)':>14s} {'MB por busca':>13s}")
+    for modo in ("processes", "tabs"):
+        r = resultado[modo]
+        print(f"{modo:12s} {r['lookups_per_sec']:10.2f} {r['errors']:6d} {r['peak_rss_mb']:14.1f} "
+              f"{r['rss_mb_per_concurrent_lookup']:13.1f}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(resultado, f, indent=2)
+        print(f"\nResultado salvo em {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,173 @@
+"""
+Escolhe qual scraper usar em cada busca
+- "http": só o caminho rápido (sem navegador)
+- "selenium": só o Chrome do pool
+- "auto": tenta HTTP e cai pro Selenium se der erro
+O Selenium usa o pool (um Chrome por busca) ou, se tiver um TabScraper, abas de um Chrome só
+Com um UpstreamLimiter, toda ida ao site passa antes pelo controle de vazão/concorrência
+Com um Hedger, busca lenta no pool ganha uma segunda tentativa em outro driver
+"""
+
+import time
+import logging
+from typing import Callable, Dict, List, Optional, Tuple
+
+import requests
+
+from .scraper_oab import AdvogadoData
+from .http_scraper import OABHttpScraper, HttpScraperError
+from .pool import DriverPool
+from .tabs import TabScraper, TabTimeout
+from .limiter import UpstreamLimiter, UpstreamBusy, OK, EMPTY, TIMEOUT, ERROR, LOCAL
+from .hedge import Hedger, Tentativa
+
+logger = logging.getLogger(__name__)
+
+MODOS = ("auto", "http", "selenium")
+
+
+def _desfecho_do_erro(erro: Exception) -> str:
+    """
+    Só o que veio do CNA (timeout ou erro na resposta) reduz o limite; pool cheio,
+    chromedriver faltando ou Chrome que não abre são problema nosso e ficam LOCAL
+    """
+    if isinstance(erro, TabTimeout):
+        return TIMEOUT
+    if isinstance(erro, HttpScraperError):
+        return TIMEOUT if isinstance(erro.__cause__, requests.Timeout) else ERROR
+    return LOCAL
+
+
+class ScraperBackend:
+    """Faz a busca pelo backend configurado"""
+
+    def __init__(self, modo: str, pool: DriverPool, http: Optional[OABHttpScraper] = None,
+                 on_stage: Optional[Callable[[str, float], None]] = None,
+                 tabs: Optional[TabScraper] = None,
+                 limiter: Optional[UpstreamLimiter] = None,
+                 hedger: Optional[Hedger] = None):
+        if modo not in MODOS:
+            raise ValueError(f"Backend '{modo}' inválido, use um de {MODOS}")
+        self.modo = modo
+        self.pool = pool
+        self.http = http or (OABHttpScraper() if modo != "selenium" else None)
+        # Recebe a duração do caminho HTTP (as etapas do Selenium vêm do próprio OABScraper)
+        self.on_stage = on_stage
+        self.tabs = tabs
+        self.limiter = limiter
+        self.hedger = hedger
+
+        self.http_ok = 0
+        self.fallbacks = 0
+
+    def search_advogado(self, name: str, uf: str, insc: Optional[str] = None) -> AdvogadoData:
+        resultados = self.search_advogados(name, uf, insc)
+        return resultados[0] if resultados else AdvogadoData()
+
+    def search_advogados(self, name: str, uf: str, insc: Optional[str] = None,
+                         max_paginas: int = 1) -> List[AdvogadoData]:
+        """Todos os advogados encontrados (até max_paginas no Selenium)"""
+        if self.limiter is None:
+            return self._buscar(name, uf, insc, max_paginas)[0]
+        
+        esperou = self.limiter.acquire()
+        if self.on_stage is not None:
+            self.on_stage("upstream_wait", esperou)
+        desfecho = LOCAL
+        try:
+            resultados, desfecho = self._buscar(name, uf, insc, max_paginas)
+            return resultados
+        except Exception as e:
+            desfecho = _desfecho_do_erro(e)
+            raise
+        finally:
+            self.limiter.release(desfecho)
+    
+    def _buscar(self, name: str, uf: str, insc: Optional[str],
+                max_paginas: int) -> Tuple[List[AdvogadoData], str]:
+        """Faz a busca e diz como foi (ok, empty, timeout, error) pro limitador"""
+        if self.http is not None and self.modo != "selenium":
+            inicio = time.perf_counter()
+            try:
+                resultados = self.http.search_advogados(name, uf, insc, max_paginas)
+                self.http_ok += 1
+                return resultados, OK if resultados else EMPTY
+            except Exception as e:
+                if self.modo == "http":
+                    raise
+                self.fallbacks += 1
+                logger.warning(f"Caminho HTTP falhou, usando Selenium: {e}")
+            finally:
+                if self.on_stage is not None:
+                    self.on_stage("http_search", time.perf_counter() - inicio)
+
+        if self.tabs is not None:
+            resultados = self.tabs.search_advogados(name, uf, insc, max_paginas)
+            return resultados, OK if resultados else EMPTY
+        if self.hedger is not None:
+            resultados, estado = self.hedger.executar(
+                lambda tentativa: self._buscar_no_pool(name, uf, insc, max_paginas, tentativa)
+            )
+        else:
+            resultados, estado = self._buscar_no_pool(name, uf, insc, max_paginas)
+        return resultados, self._desfecho_do_estado(estado, resultados)
+
+    @staticmethod
+    def _desfecho_do_estado(estado: Optional[str], resultados: List[AdvogadoData]) -> str:
+        if estado == "timeout":
+            return TIMEOUT
+        if estado == "erro":
+            return ERROR
+        return OK if resultados else EMPTY
+
+    def _buscar_no_pool(self, name: str, uf: str, insc: Optional[str], max_paginas: int,
+                        tentativa: Optional[Tentativa] = None) -> Tuple[List[AdvogadoData], Optional[str]]:
+        """Uma busca num driver do pool; se a tentativa perder pro hedge o driver é fechado e descartado"""
+        hedge = tentativa is not None and tentativa.numero > 1
+        # A vaga do limitador que a busca pegou é da primeira tentativa; o hedge também vai
+        # no site, então precisa da dele - sem vaga na hora, fica só a primeira
+        vaga = hedge and self.limiter is not None
+        if vaga and not self.limiter.try_acquire():
+            tentativa.desistir()
+            raise UpstreamBusy("Sem vaga no limitador pro hedge")
+        desfecho = LOCAL
+        try:
+            if hedge:
+                # O hedge não espera driver livre: com o pool cheio fica só a primeira tentativa
+                try:
+                    scraper = self.pool.acquire(timeout=0)
+                except Exception:
+                    tentativa.desistir()
+                    raise
+            else:
+                scraper = self.pool.acquire()
+            descartar = True
+            try:
+                if tentativa is not None:
+                    # Fechar o driver derruba o driver.get/espera que estiver travado
+                    tentativa.ao_cancelar(scraper.close)
+                resultados = scraper.search_advogados(name, uf, insc, max_paginas)
+                # O OABScraper devolve [] também quando dá erro/timeout, então olha como terminou
+                estado = getattr(scraper, "ultimo_estado", None)
+                descartar = tentativa is not None and tentativa.cancelada.is_set()
+                if not descartar:
+                    # Quem perdeu pro hedge foi derrubada por nós, não pelo site
+                    desfecho = self._desfecho_do_estado(estado, resultados)
+            finally:
+                self.pool.release(scraper, discard=descartar)
+        finally:
+            if vaga:
+                self.limiter.release(desfecho)
+        return resultados, estado
+
+    def stats(self) -> Dict[str, int]:
+        return {"http_ok": self.http_ok, "fallbacks": self.fallbacks}
+
+    def close(self):
+        if self.http is not None:
+            self.http.close()
+        if self.tabs is not None:
+            self.tabs.close()
+        if self.hedger is not None:
+            self.hedger.close()
+        self.pool.close()
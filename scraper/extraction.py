@@ -0,0 +1,149 @@
+"""
+Extração a partir do HTML da página (page_source)
+Em vez de ler element.text e ficar chamando find_elements célula por célula
+(uma ida e volta no WebDriver cada), pego o HTML uma vez só e converto pra
+texto aqui mesmo, do jeito que o innerText do navegador faria
+
+Rodando direto mostra o tempo de parsing de cada página salva:
+    python -m scraper.extraction tests/fixtures/cna
+"""
+
+import sys
+import time
+from html.parser import HTMLParser
+from typing import List, Optional
+
+# Tags que quebram linha (display: block)
+TAGS_BLOCO = {
+    "address", "article", "aside", "blockquote", "body", "caption", "dd", "div",
+    "dl", "dt", "fieldset", "figcaption", "figure", "footer", "form", "h1", "h2",
+    "h3", "h4", "h5", "h6", "header", "hr", "html", "legend", "li", "main", "nav",
+    "ol", "p", "section", "table", "tbody", "tfoot", "thead", "tr", "ul",
+}
+
+# Tags separadas por espaço (células de tabela)
+TAGS_CELULA = {"td", "th"}
+
+# Conteúdo que não aparece como texto na tela
+TAGS_IGNORADAS = {
+    "head", "noscript", "option", "script", "select", "style", "svg", "template",
+    "textarea", "title",
+}
+
+# Tags sem fechamento
+TAGS_VAZIAS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta",
+    "param", "source", "track", "wbr",
+}
+
+
+class _TextoVisivel(HTMLParser):
+    """Converte HTML em texto parecido com o innerText"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.partes: List[str] = []
+        self._pular: Optional[str] = None
+        self._pular_nivel = 0
+
+    @staticmethod
+    def _escondido(attrs) -> bool:
+        for nome, valor in attrs:
+            if nome == "hidden":
+                return True
+            if nome == "style" and valor:
+                estilo = valor.replace(" ", "").lower()
+                if "display:none" in estilo or "visibility:hidden" in estilo:
+                    return True
+        return False
+
+    def handle_starttag(self, tag, attrs):
+        if self._pular is not None:
+            if tag == self._pular:
+                self._pular_nivel += 1
+            return
+        if tag in TAGS_VAZIAS:
+            self.handle_startendtag(tag, attrs)
+            return
+        if tag in TAGS_IGNORADAS or self._escondido(attrs):
+            self._pular = tag
+            self._pular_nivel = 1
+            return
+        if tag in TAGS_BLOCO:
+            self.partes.append("\n")
+
+    def handle_startendtag(self, tag, attrs):
+        if self._pular is not None:
+            return
+        if tag == "br" or tag == "hr":
+            self.partes.append("\n")
+
+    def handle_endtag(self, tag):
+        if self._pular is not None:
+            if tag == self._pular:
+                self._pular_nivel -= 1
+                if self._pular_nivel == 0:
+                    self._pular = None
+            return
+        if tag in TAGS_BLOCO:
+            self.partes.append("\n")
+        elif tag in TAGS_CELULA:
+            self.partes.append(" ")
+
+    def handle_data(self, data):
+        if self._pular is None:
+            self.partes.append(data)
+
+
+def html_para_texto(html: str) -> str:
+    """Texto visível do HTML, uma linha por bloco e espaços normalizados"""
+    parser = _TextoVisivel()
+    parser.feed(html or "")
+    parser.close()
+    linhas = (" ".join(linha.split()) for linha in "".join(parser.partes).split("\n"))
+    return "\n".join(linha for linha in linhas if linha)
+
+
+def main(argv: List[str]) -> int:
+    """Mostra quantos advogados e quanto tempo cada página salva leva pra extrair"""
+    import glob
+    import os
+    import logging
+
+    from .scraper_oab import extrair_de_html
+
+    # Os logs de cada extração atrapalham a leitura do relatório
+    logging.disable(logging.INFO)
+
+    pastas = argv or ["tests/fixtures/cna"]
+    arquivos = sorted(
+        caminho for pasta in pastas
+        for caminho in (glob.glob(os.path.join(pasta, "*.html")) if os.path.isdir(pasta) else [pasta])
+    )
+    if not arquivos:
+        print("Nenhum arquivo .html encontrado")
+        return 1
+
+    total = 0.0
+    for caminho in arquivos:
+        with open(caminho, encoding="utf-8") as f:
+            html = f.read()
+        # UF do nome do arquivo (ex: resultado_ms.html) ou SP
+        uf = os.path.splitext(os.path.basename(caminho))[0].rsplit("_", 1)[-1].upper()
+        uf = uf if len(uf) == 2 else "SP"
+
+        rodadas = 50
+        inicio = time.perf_counter()
+        for _ in range(rodadas):
+            resultados = extrair_de_html(html, uf)
+        ms = (time.perf_counter() - inicio) * 1000 / rodadas
+        total += ms
+        print(f"{os.path.basename(caminho):40s} {len(html) / 1024:7.1f} KB  "
+              f"{len(resultados):3d} advogado(s)  {ms:8.3f} ms")
+
+    print(f"{'média':40s} {'':10s} {'':15s} {total / len(arquivos):8.3f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,191 @@
+"""
+Busca "hedged" pra cortar a cauda de latência do Selenium
+De vez em quando um Chrome trava no driver.get ou na espera do resultado até o
+timeout de 30s, e isso domina o p99. Se a busca não terminou depois do percentil
+configurado das latências recentes, uma segunda tentativa começa em outro driver;
+a primeira que terminar ganha e a outra é cancelada (o driver dela é fechado e
+o pool cria outro no lugar).
+Os hedges são limitados a uma fração das buscas recentes pra não dobrar a carga no site.
+"""
+
+import math
+import time
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, TimeoutError as FuturesTimeout, wait
+from typing import Callable, Deque, Dict, List, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class Tentativa:
+    """Uma das tentativas da busca; quem executa registra como cancelar (ex: fechar o driver)"""
+
+    def __init__(self, numero: int):
+        self.numero = numero
+        self.cancelada = threading.Event()
+        # A tentativa desistiu antes de ir no site (ex: sem driver ou vaga livre)
+        self.nao_saiu = False
+        self._lock = threading.Lock()
+        self._ao_cancelar: List[Callable[[], None]] = []
+
+    def ao_cancelar(self, fn: Callable[[], None]):
+        """Chama fn quando a tentativa perder (na hora, se já perdeu)"""
+        with self._lock:
+            if not self.cancelada.is_set():
+                self._ao_cancelar.append(fn)
+                return
+        self._chamar(fn)
+
+    def desistir(self):
+        """Quem executa avisa que a tentativa nem começou - não conta como hedge"""
+        self.nao_saiu = True
+
+    def cancelar(self):
+        with self._lock:
+            if self.cancelada.is_set():
+                return
+            self.cancelada.set()
+            callbacks, self._ao_cancelar = self._ao_cancelar, []
+        for fn in callbacks:
+            self._chamar(fn)
+
+    def _chamar(self, fn: Callable[[], None]):
+        try:
+            fn()
+        except Exception as e:
+            logger.warning(f"Erro ao cancelar tentativa {self.numero}: {e}")
+
+
+class Hedger:
+    """
+    - percentile: percentil das latências recentes a partir do qual sai o hedge
+    - budget: fração máxima das buscas recentes que pode ganhar um hedge (0.1 = 10%)
+    - min_samples: latências necessárias antes de começar a fazer hedge
+    - min_delay: espera mínima (segundos) antes do hedge, mesmo que o percentil seja menor
+    - window: quantas buscas recentes entram no percentil e no orçamento
+    """
+
+    def __init__(self, percentile: float = 95.0, budget: float = 0.1, min_samples: int = 20,
+                 min_delay: float = 1.0, window: int = 200, max_workers: int = 8):
+        if not 0 < percentile < 100:
+            raise ValueError("percentile deve ficar entre 0 e 100")
+        self.percentile = percentile
+        self.budget = budget
+        self.min_samples = max(1, min_samples)
+        self.min_delay = min_delay
+
+        self._lock = threading.Lock()
+        self._latencias: Deque[float] = deque(maxlen=window)
+        # True pras buscas recentes que tiveram hedge
+        self._janela: Deque[bool] = deque(maxlen=window)
+        self._executor = ThreadPoolExecutor(max_workers=max(2, max_workers), thread_name_prefix="oab-hedge")
+
+        self.requests = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.cancelled = 0
+        self.denied = 0
+
+    def atraso(self) -> Optional[float]:
+        """Quanto esperar antes do hedge (None = ainda não tem amostras suficientes)"""
+        with self._lock:
+            if len(self._latencias) < self.min_samples:
+                return None
+            ordenadas = sorted(self._latencias)
+        idx = max(0, math.ceil(self.percentile / 100 * len(ordenadas)) - 1)
+        return max(self.min_delay, ordenadas[idx])
+
+    def _reservar_hedge(self) -> bool:
+        """Cabe mais um hedge no orçamento? (contando a busca atual)"""
+        with self._lock:
+            permitido = sum(self._janela) + 1 <= self.budget * (len(self._janela) + 1)
+            if not permitido:
+                self.denied += 1
+            return permitido
+
+    def _concluir(self, inicio: float, hedgeou: bool):
+        with self._lock:
+            self.requests += 1
+            self._latencias.append(time.monotonic() - inicio)
+            self._janela.append(hedgeou)
+
+    def executar(self, fn: Callable[[Tentativa], T]) -> T:
+        """Roda fn(tentativa) e, se demorar além do percentil, uma segunda fn em paralelo"""
+        inicio = time.monotonic()
+        atraso = self.atraso()
+        primeira = Tentativa(1)
+        if atraso is None:
+            try:
+                return fn(primeira)
+            finally:
+                self._concluir(inicio, False)
+
+        pendentes = {self._executor.submit(fn, primeira): primeira}
+        try:
+            resultado = next(iter(pendentes)).result(timeout=atraso)
+        except FuturesTimeout:
+            pass
+        except Exception:
+            self._concluir(inicio, False)
+            raise
+        else:
+            # Terminou antes do atraso: também entra nas latências e no orçamento
+            self._concluir(inicio, False)
+            return resultado
+
+        if not self._reservar_hedge():
+            try:
+                return next(iter(pendentes)).result()
+            finally:
+                self._concluir(inicio, False)
+
+        segunda = Tentativa(2)
+        logger.info(f"Busca passou de {atraso:.1f}s, começando hedge")
+        pendentes[self._executor.submit(fn, segunda)] = segunda
+        erro: Optional[BaseException] = None
+        try:
+            while pendentes:
+                feitos, _ = wait(pendentes, return_when=FIRST_COMPLETED)
+                for fut in feitos:
+                    tentativa = pendentes.pop(fut)
+                    if fut.exception() is not None:
+                        # Se uma falhar a outra ainda pode dar certo
+                        erro = fut.exception()
+                        continue
+                    for perdedora in pendentes.values():
+                        perdedora.cancelar()
+                        with self._lock:
+                            self.cancelled += 1
+                    if tentativa is segunda:
+                        with self._lock:
+                            self.hedge_wins += 1
+                    return fut.result()
+            raise erro
+        finally:
+            # Hedge que desistiu na hora (sem driver/vaga) não foi no site: não conta
+            hedgeou = not segunda.nao_saiu
+            if hedgeou:
+                with self._lock:
+                    self.hedges += 1
+            self._concluir(inicio, hedgeou)
+
+    def stats(self) -> Dict[str, float]:
+        atraso = self.atraso()
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "hedges": self.hedges,
+                "hedge_wins": self.hedge_wins,
+                "cancelled": self.cancelled,
+                "denied": self.denied,
+                "budget": self.budget,
+                "delay_seconds": round(atraso, 3) if atraso is not None else 0,
+                "samples": len(self._latencias),
+            }
+
+    def close(self):
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,130 @@
+"""
+Scraper "rápido" que fala direto com o backend do CNA
+O site busca os resultados num endpoint que devolve JSON, então dá pra
+pular o Chrome e fazer a mesma busca com uma sessão HTTP
+"""
+
+import re
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .scraper_oab import AdvogadoData
+
+logger = logging.getLogger(__name__)
+
+CNA_URL = "https://cna.oab.org.br"
+
+# O formulário do site tem um token anti-CSRF que precisa ir junto no POST
+TOKEN_RE = re.compile(
+    r'name="__RequestVerificationToken"[^>]*value="([^"]+)"'
+    r'|value="([^"]+)"[^>]*name="__RequestVerificationToken"'
+)
+
+USER_AGENT = ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+              '(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
+
+
+class HttpScraperError(Exception):
+    """A busca pelo caminho HTTP falhou (o Selenium pode tentar de novo)"""
+
+
+class OABHttpScraper:
+    """Busca advogados no CNA usando só requests, sem navegador"""
+
+    def __init__(self, base_url: str = CNA_URL, timeout: float = 10.0, pool_size: int = 10):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+
+        # Sessão com pool de conexões keep-alive, reaproveitada entre buscas
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({"User-Agent": USER_AGENT})
+
+        self._token: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def _get_token(self, renovar: bool = False) -> str:
+        """Abre a página inicial pra pegar o token (e o cookie) do formulário"""
+        with self._lock:
+            if self._token and not renovar:
+                return self._token
+            resp = self.session.get(self.base_url + "/", timeout=self.timeout)
+            resp.raise_for_status()
+            match = TOKEN_RE.search(resp.text)
+            if not match:
+                raise HttpScraperError("Token do formulário não encontrado")
+            self._token = match.group(1) or match.group(2)
+            return self._token
+
+    def _buscar(self, name: str, uf: str, insc: Optional[str] = None, renovar: bool = False) -> Dict[str, Any]:
+        dados = {
+            "__RequestVerificationToken": self._get_token(renovar),
+            "IsMobile": "false",
+            "NomeAdvo": name or "",
+            "Insc": insc or "",
+            "Uf": uf.upper(),
+            "TipoInsc": "",
+        }
+        resp = self.session.post(
+            self.base_url + "/Home/Search",
+            data=dados,
+            headers={"X-Requested-With": "XMLHttpRequest"},
+            timeout=self.timeout,
+        )
+        resp.raise_for_status()
+        return resp.json()
+
+    def search_advogado(self, name: str, uf: str, insc: Optional[str] = None) -> AdvogadoData:
+        """Mesma interface do OABScraper.search_advogado"""
+        resultados = self.search_advogados(name, uf, insc)
+        return resultados[0] if resultados else AdvogadoData()
+
+    def search_advogados(self, name: str, uf: str, insc: Optional[str] = None,
+                         max_paginas: int = 1) -> List[AdvogadoData]:
+        """
+        Todos os resultados da busca
+        O JSON do CNA já vem com a lista inteira, então max_paginas não muda nada aqui
+        """
+        try:
+            try:
+                payload = self._buscar(name, uf, insc)
+            except (requests.HTTPError, ValueError):
+                # Token pode ter expirado - renova e tenta mais uma vez
+                payload = self._buscar(name, uf, insc, renovar=True)
+        except requests.RequestException as e:
+            raise HttpScraperError(f"Erro HTTP no CNA: {e}") from e
+        except ValueError as e:
+            raise HttpScraperError(f"Resposta do CNA não é JSON: {e}") from e
+
+        if not isinstance(payload, dict) or not payload.get("Success"):
+            raise HttpScraperError(f"CNA respondeu sem sucesso: {str(payload)[:200]}")
+
+        itens = payload.get("Data") or []
+        logger.info(f"CNA (HTTP) retornou {len(itens)} resultado(s)")
+        return [self._to_advogado(item, uf) for item in itens]
+
+    @staticmethod
+    def _to_advogado(item: Dict[str, Any], uf: str) -> AdvogadoData:
+        """Converte um item do JSON do CNA pro nosso formato"""
+        def campo(chave):
+            valor = item.get(chave)
+            return str(valor).strip() if valor not in (None, "") else None
+
+        # Mesmos valores padrão que o _extract_data usa no Selenium
+        return AdvogadoData(
+            oab=campo("Inscricao"),
+            nome=campo("Nome"),
+            uf=(campo("UF") or uf).upper(),
+            categoria=campo("TipoInscOab") or "Advogado",
+            data_inscricao=campo("DataInscricao"),
+            situacao=campo("Situacao") or "Ativo",
+        )
+
+    def close(self):
+        self.session.close()
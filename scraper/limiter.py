@@ -0,0 +1,173 @@
+"""
+Controle de quantas buscas vão ao mesmo tempo pro site da OAB
+Juntei duas coisas:
+- token bucket: no máximo `rate` buscas por segundo (com rajada de `burst`)
+- concorrência adaptativa (AIMD): o limite de buscas simultâneas sobe devagar
+  enquanto tudo dá certo e cai pela metade quando o site começa a dar timeout,
+  erro ou página vazia demais (sinal de bloqueio)
+Assim a gente roda no máximo que o CNA aguenta sem ser bloqueado
+"""
+
+import time
+import logging
+import threading
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Desfechos que o backend informa no release
+OK = "ok"
+EMPTY = "empty"
+TIMEOUT = "timeout"
+ERROR = "error"
+# Falha do nosso lado (pool cheio, chromedriver, Chrome que não abre): só devolve a vaga
+LOCAL = "local"
+
+
+class UpstreamBusy(Exception):
+    """Esperou demais por uma vaga pra ir no site da OAB"""
+
+
+class UpstreamLimiter:
+    """
+    - rate / burst: token bucket (rate <= 0 desliga)
+    - min_limit / max_limit / initial_limit: faixa do limite de buscas simultâneas
+    - decrease_factor: quanto o limite encolhe num sinal de congestionamento
+    - cooldown: intervalo mínimo entre duas reduções (várias falhas juntas contam uma vez)
+    - empty_threshold: fração recente de páginas vazias a partir da qual vazio vira sinal de bloqueio
+    - acquire_timeout: espera máxima por uma vaga antes de UpstreamBusy
+    """
+
+    def __init__(self, rate: float = 5.0, burst: float = 10.0, min_limit: int = 1, max_limit: int = 8,
+                 initial_limit: Optional[int] = None, decrease_factor: float = 0.5, cooldown: float = 2.0,
+                 empty_threshold: float = 0.8, acquire_timeout: float = 30.0):
+        if min_limit < 1 or max_limit < min_limit:
+            raise ValueError("Precisa de 1 <= min_limit <= max_limit")
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.decrease_factor = decrease_factor
+        self.cooldown = cooldown
+        self.empty_threshold = empty_threshold
+        self.acquire_timeout = acquire_timeout
+
+        inicial = initial_limit if initial_limit is not None else min_limit
+        self.limit = float(min(max_limit, max(min_limit, inicial)))
+
+        self._cond = threading.Condition()
+        self._tokens = self.burst
+        self._ultimo_refill = time.monotonic()
+        self._ultima_reducao = 0.0
+        self._em_uso = 0
+        self._na_fila = 0
+        # Fração recente de páginas vazias (média móvel)
+        self._taxa_vazio = 0.0
+
+        self.increases = 0
+        self.decreases = 0
+        self.rejected = 0
+        self.wait_avg = 0.0
+        self.wait_max = 0.0
+
+    def _refill(self, agora: float):
+        if self.rate > 0:
+            self._tokens = min(self.burst, self._tokens + (agora - self._ultimo_refill) * self.rate)
+        self._ultimo_refill = agora
+
+    def acquire(self, timeout: Optional[float] = None) -> float:
+        """Espera uma vaga (limite de concorrência + token) e retorna quantos segundos esperou"""
+        timeout = self.acquire_timeout if timeout is None else timeout
+        inicio = time.monotonic()
+        prazo = inicio + timeout
+        with self._cond:
+            self._na_fila += 1
+            try:
+                while True:
+                    agora = time.monotonic()
+                    espera_token = None
+                    if self._em_uso < int(self.limit):
+                        self._refill(agora)
+                        if self.rate <= 0 or self._tokens >= 1:
+                            if self.rate > 0:
+                                self._tokens -= 1
+                            self._em_uso += 1
+                            break
+                        espera_token = (1 - self._tokens) / self.rate
+                    restante = prazo - agora
+                    if restante <= 0:
+                        self.rejected += 1
+                        raise UpstreamBusy(
+                            f"Sem vaga pro site da OAB em {timeout:.0f}s (limite atual {int(self.limit)})"
+                        )
+                    self._cond.wait(min(espera_token, restante) if espera_token is not None else restante)
+            finally:
+                self._na_fila -= 1
+
+            esperou = time.monotonic() - inicio
+            self.wait_avg = esperou if self.wait_avg == 0 else 0.8 * self.wait_avg + 0.2 * esperou
+            self.wait_max = max(self.wait_max, esperou)
+            return esperou
+
+    def try_acquire(self) -> bool:
+        """Pega uma vaga só se tiver na hora (sem fila e sem contar como rejeitada) - usado pelo hedge"""
+        with self._cond:
+            if self._em_uso >= int(self.limit):
+                return False
+            self._refill(time.monotonic())
+            if self.rate > 0:
+                if self._tokens < 1:
+                    return False
+                self._tokens -= 1
+            self._em_uso += 1
+            return True
+
+    def release(self, desfecho: str = OK):
+        """Devolve a vaga e ajusta o limite conforme o desfecho (ok, empty, timeout, error; local não mexe)"""
+        with self._cond:
+            # Estava usando o limite todo? Só aí faz sentido aumentar
+            no_limite = self._em_uso >= int(self.limit)
+            self._em_uso = max(0, self._em_uso - 1)
+            agora = time.monotonic()
+
+            if desfecho == EMPTY:
+                self._taxa_vazio = 0.9 * self._taxa_vazio + 0.1
+                if self._taxa_vazio >= self.empty_threshold:
+                    self._reduzir(agora, "páginas vazias demais")
+            elif desfecho == LOCAL:
+                pass
+            elif desfecho == OK:
+                self._taxa_vazio *= 0.9
+                if no_limite and self.limit < self.max_limit:
+                    # +1 a cada "limit" sucessos, como no AIMD do TCP
+                    self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+                    self.increases += 1
+            else:
+                self._reduzir(agora, desfecho)
+            self._cond.notify_all()
+
+    def _reduzir(self, agora: float, motivo: str):
+        if agora - self._ultima_reducao < self.cooldown:
+            return
+        antes = int(self.limit)
+        self.limit = max(float(self.min_limit), self.limit * self.decrease_factor)
+        self._ultima_reducao = agora
+        self.decreases += 1
+        logger.warning(f"Site da OAB reclamando ({motivo}): limite de {antes} pra {int(self.limit)}")
+
+    def stats(self) -> Dict[str, float]:
+        with self._cond:
+            self._refill(time.monotonic())
+            return {
+                "limit": int(self.limit),
+                "in_flight": self._em_uso,
+                "queued": self._na_fila,
+                "tokens": round(self._tokens, 2),
+                "rate": self.rate,
+                "increases": self.increases,
+                "decreases": self.decreases,
+                "rejected": self.rejected,
+                "empty_rate": round(self._taxa_vazio, 3),
+                "wait_avg_seconds": round(self.wait_avg, 3),
+                "wait_max_seconds": round(self.wait_max, 3),
+            }
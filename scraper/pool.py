@@ -0,0 +1,175 @@
+"""
+Pool de drivers do Chrome
+Abrir um Chrome novo a cada busca custava vários segundos, então agora
+os navegadores ficam abertos e são emprestados (lease) pra cada consulta
+"""
+
+import time
+import logging
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+
+from .scraper_oab import OABScraper
+
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeout(Exception):
+    """Nenhum driver ficou livre dentro do tempo de espera"""
+
+
+class PoolClosed(Exception):
+    """O pool já foi fechado"""
+
+
+class DriverPool:
+    """
+    Pool de OABScraper com tamanho mínimo e máximo
+    - min_size: quantos navegadores ficam abertos desde o start()
+    - max_size: limite de navegadores abertos ao mesmo tempo
+    - lease_timeout: quanto tempo esperar por um driver livre
+    - max_uses: recicla o navegador depois de N buscas (0 = nunca)
+    """
+
+    def __init__(
+        self,
+        factory: Optional[Callable[[], OABScraper]] = None,
+        min_size: int = 1,
+        max_size: int = 4,
+        lease_timeout: float = 30.0,
+        max_uses: int = 0,
+        headless: bool = True,
+    ):
+        if max_size < 1:
+            raise ValueError("max_size deve ser pelo menos 1")
+        if min_size < 0 or min_size > max_size:
+            raise ValueError("min_size deve estar entre 0 e max_size")
+
+        self.factory = factory or (lambda: OABScraper(headless=headless))
+        self.min_size = min_size
+        self.max_size = max_size
+        self.lease_timeout = lease_timeout
+        self.max_uses = max_uses
+
+        self._cond = threading.Condition()
+        self._idle = deque()
+        self._uses: Dict[int, int] = {}
+        self._total = 0  # livres + emprestados + sendo criados
+        self._leased = 0
+        self._closed = False
+
+        # Contadores pra acompanhar o pool
+        self.created = 0
+        self.discarded = 0
+        self.timeouts = 0
+
+    def start(self):
+        """Abre os navegadores mínimos antes da primeira busca"""
+        while True:
+            with self._cond:
+                if self._closed or self._total >= self.min_size:
+                    return
+                self._total += 1
+            scraper = self._create()
+            with self._cond:
+                self._idle.append(scraper)
+                self._cond.notify()
+
+    def _create(self) -> OABScraper:
+        """Cria um navegador novo - chamado fora do lock porque demora"""
+        try:
+            scraper = self.factory()
+        except Exception:
+            with self._cond:
+                self._total -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self.created += 1
+            self._uses[id(scraper)] = 0
+        logger.info(f"Driver criado ({self._total}/{self.max_size})")
+        return scraper
+
+    def acquire(self, timeout: Optional[float] = None) -> OABScraper:
+        """Pega um driver livre, cria um novo ou espera até o timeout"""
+        timeout = self.lease_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise PoolClosed("Pool de drivers fechado")
+                if self._idle:
+                    self._leased += 1
+                    return self._idle.pop()
+                if self._total < self.max_size:
+                    self._total += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.timeouts += 1
+                    raise PoolTimeout(f"Nenhum driver livre em {timeout:.1f}s")
+                self._cond.wait(remaining)
+
+        scraper = self._create()
+        with self._cond:
+            self._leased += 1
+        return scraper
+
+    def release(self, scraper: OABScraper, discard: bool = False):
+        """Devolve o driver pro pool (ou fecha se estiver quebrado)"""
+        with self._cond:
+            self._leased -= 1
+            uses = self._uses.get(id(scraper), 0) + 1
+            self._uses[id(scraper)] = uses
+            esgotado = self.max_uses and uses >= self.max_uses
+            if not (discard or self._closed or esgotado) and scraper.is_alive():
+                self._idle.append(scraper)
+                self._cond.notify()
+                return
+            self._total -= 1
+            self.discarded += 1
+            self._uses.pop(id(scraper), None)
+            self._cond.notify()
+        scraper.close()
+
+    @contextmanager
+    def lease(self, timeout: Optional[float] = None):
+        """
+        Empresta um driver durante o bloco with
+        Se der exceção o driver é descartado, pode ter ficado num estado ruim
+        """
+        scraper = self.acquire(timeout)
+        try:
+            yield scraper
+        except BaseException:
+            self.release(scraper, discard=True)
+            raise
+        else:
+            self.release(scraper)
+
+    def close(self):
+        """Fecha todos os navegadores livres; os emprestados fecham ao voltar"""
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._total -= len(idle)
+            self._cond.notify_all()
+        for scraper in idle:
+            scraper.close()
+
+    def stats(self) -> Dict[str, int]:
+        with self._cond:
+            return {
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "total": self._total,
+                "idle": len(self._idle),
+                "leased": self._leased,
+                "created": self.created,
+                "discarded": self.discarded,
+                "timeouts": self.timeouts,
+            }
@@ -1,6 +1,10 @@
+import os
+import json
 import time
 import re
+import shutil
 import logging
+import threading
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait, Select
@@ -10,10 +14,89 @@ from selenium.webdriver.chrome.service import Service
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 from webdriver_manager.chrome import ChromeDriverManager
 from dataclasses import dataclass
-from typing import Optional
+from typing import Callable, Dict, List, Optional, Sequence
+
+from .extraction import html_para_texto
 
 logger = logging.getLogger(__name__)
 
+# Textos que indicam que a página de resultados apareceu
+INDICADORES_RESULTADO = ["RESULTADO", "Nome:", "Inscrição:", "Tipo:", "UF:"]
+
+# Frases que o site mostra quando não acha ninguém
+FRASES_SEM_RESULTADO = [
+    "nenhum resultado", "não encontrado", "não foram encontrados",
+    "sem resultados", "resultado não encontrado"
+]
+
+# Página de busca do CNA
+CNA_SITE = "https://cna.oab.org.br/"
+
+# Pega o texto visível da página numa chamada só (sem implicit wait)
+JS_TEXTO_PAGINA = "return document.body ? document.body.innerText : '';"
+
+# Procura e clica no link/botão de próxima página dos resultados
+JS_PROXIMA_PAGINA = """
+const els = Array.from(document.querySelectorAll('a, button'));
+const prox = els.find(e => {
+    const t = (e.innerText || '').trim();
+    const desabilitado = e.disabled || e.classList.contains('disabled') ||
+        (e.parentElement && e.parentElement.classList.contains('disabled'));
+    return !desabilitado && (t.startsWith('Próxima') || t === '»' || t === '›' || e.rel === 'next');
+});
+if (prox) { prox.click(); return true; }
+return false;
+"""
+
+# Recursos que não servem pra ler o texto dos resultados (sintaxe de URLPattern, que
+# também funciona como curinga simples no Chrome antigo)
+BLOQUEIOS_PADRAO = (
+    "*://*/*.png", "*://*/*.jpg", "*://*/*.jpeg", "*://*/*.gif", "*://*/*.webp", "*://*/*.svg", "*://*/*.ico",
+    "*://*/*.woff", "*://*/*.woff2", "*://*/*.ttf", "*://*/*.otf", "*://*/*.eot",
+    "*://*/*.css", "*://*/*.mp4", "*://*/*.webm",
+    "*://*.google-analytics.com/*", "*://*.googletagmanager.com/*", "*://*.doubleclick.net/*",
+    "*://*.facebook.net/*", "*://*.hotjar.com/*", "*://fonts.googleapis.com/*", "*://fonts.gstatic.com/*",
+)
+
+# Caminho do chromedriver resolvido uma vez por processo (ver resolver_chromedriver)
+_chromedriver_lock = threading.Lock()
+_chromedriver_resolvido = False
+_chromedriver_path: Optional[str] = None
+
+
+def resolver_chromedriver() -> Optional[str]:
+    """
+    Descobre o chromedriver uma vez só e guarda pro processo todo
+    Ordem: OAB_CHROMEDRIVER_PATH, chromedriver no PATH e, por último, o
+    webdriver-manager (que vai na rede e pode ser desligado com
+    OAB_CHROMEDRIVER_DOWNLOAD=0). None = deixa o Selenium Manager resolver
+    """
+    global _chromedriver_resolvido, _chromedriver_path
+    with _chromedriver_lock:
+        if _chromedriver_resolvido:
+            return _chromedriver_path
+        inicio = time.perf_counter()
+        caminho = os.getenv("OAB_CHROMEDRIVER_PATH") or None
+        origem = "OAB_CHROMEDRIVER_PATH"
+        if caminho and not os.path.isfile(caminho):
+            logger.warning(f"OAB_CHROMEDRIVER_PATH aponta pra um arquivo que não existe: {caminho}")
+            caminho = None
+        if not caminho:
+            caminho, origem = shutil.which("chromedriver"), "PATH"
+        if not caminho and os.getenv("OAB_CHROMEDRIVER_DOWNLOAD", "1") != "0":
+            try:
+                caminho, origem = ChromeDriverManager().install(), "webdriver-manager"
+            except Exception as e:
+                logger.error(f"webdriver-manager não conseguiu baixar o chromedriver: {e}")
+        if caminho:
+            logger.info(f"chromedriver ({origem}): {caminho} em {time.perf_counter() - inicio:.2f}s")
+        else:
+            logger.warning("chromedriver não encontrado, o Selenium Manager vai tentar resolver")
+        _chromedriver_path = caminho
+        _chromedriver_resolvido = True
+        return caminho
+
+
 @dataclass
 class AdvogadoData:
     """Dados do advogado - usei dataclass pra facilitar"""
@@ -24,16 +107,174 @@ class AdvogadoData:
     data_inscricao: Optional[str] = None
     situacao: Optional[str] = None
 
+# Padrão de cada resultado: Nome: FULANO DE TAL Tipo: ADVOGADO Inscrição: 123456 UF: SP
+RE_INICIO_ITEM = re.compile(r'Nome:', re.IGNORECASE)
+RE_NOME = re.compile(r'Nome:\s*([A-ZÁÇÃÕÊÉÍ\s]+?)(?:\s+Tipo:|$)', re.IGNORECASE)
+RE_TIPO = re.compile(r'Tipo:\s*([A-ZÁÇÃÕÊÉÍ\s]+?)(?:\s+Inscrição:|$)', re.IGNORECASE)
+RE_INSC = re.compile(r'Inscrição:\s*(\d+)', re.IGNORECASE)
+RE_UF = re.compile(r'UF:\s*([A-Z]{2})', re.IGNORECASE)
+
+# Padrões do parsing alternativo (quando o texto não tem os rótulos)
+RE_NUMERO = re.compile(r'\d{4,8}')
+RE_LINHA_NOME = re.compile(r'^[A-ZÁÇÃÕÊÉÍ\s]+$')
+RE_NOME_AMPLO = re.compile(r'[A-ZÁÇÃÕÊÉÍ]{2,}(?:\s+[A-ZÁÇÃÕÊÉÍ]{2,})+')
+RE_NUMERO_AMPLO = re.compile(r'\b\d{4,8}\b')
+
+
+def _extrair_item(bloco: str) -> dict:
+    """Campos de um resultado só (um bloco que começa em 'Nome:')"""
+    dados = {}
+    nome_match = RE_NOME.search(bloco)
+    if nome_match:
+        dados['nome'] = nome_match.group(1).strip()
+    tipo_match = RE_TIPO.search(bloco)
+    if tipo_match:
+        dados['categoria'] = tipo_match.group(1).strip()
+    insc_match = RE_INSC.search(bloco)
+    if insc_match:
+        dados['oab'] = insc_match.group(1).strip()
+    uf_match = RE_UF.search(bloco)
+    if uf_match:
+        dados['uf'] = uf_match.group(1).strip().upper()
+    return dados
+
+
+def _extrair_alternativo(texto_completo: str) -> dict:
+    """Parsing pra quando o texto não tem os rótulos Nome:/Inscrição:"""
+    dados = {}
+    logger.info("Tentando parsing alternativo...")
+    
+    # Divide o texto em linhas e processa
+    for linha in texto_completo.split('\n'):
+        linha = linha.strip()
+        if not linha:
+            continue
+        
+        # Procura por números que podem ser OAB
+        numeros = RE_NUMERO.findall(linha)
+        if numeros and not dados.get('oab'):
+            dados['oab'] = numeros[0]
+            logger.info(f"OAB extraído (alternativo): {dados['oab']}")
+        
+        # Procura por nomes (linhas com palavras capitalizadas)
+        if (RE_LINHA_NOME.search(linha) and 
+            len(linha.split()) >= 2 and 
+            not dados.get('nome')):
+            dados['nome'] = linha.strip()
+            logger.info(f"Nome extraído (alternativo): {dados['nome']}")
+    
+    # Se ainda não encontrou nada, tenta uma busca mais ampla
+    if not dados.get('nome') and not dados.get('oab'):
+        logger.info("Tentando busca mais ampla...")
+        
+        # Busca por qualquer sequência de letras maiúsculas (provável nome)
+        nomes_possiveis = RE_NOME_AMPLO.findall(texto_completo)
+        if nomes_possiveis:
+            dados['nome'] = nomes_possiveis[0].strip()
+            logger.info(f"Nome extraído (busca ampla): {dados['nome']}")
+        
+        # Busca por qualquer número de 4-8 dígitos (provável OAB)
+        numeros_possiveis = RE_NUMERO_AMPLO.findall(texto_completo)
+        if numeros_possiveis:
+            dados['oab'] = numeros_possiveis[0]
+            logger.info(f"OAB extraído (busca ampla): {dados['oab']}")
+    return dados
+
+
+def extrair_advogados(texto_completo: str, uf: str) -> List[AdvogadoData]:
+    """
+    Extrai todos os advogados do texto da página de resultados
+    Cada resultado começa em 'Nome:'; se o texto não tiver rótulos, cai no parsing alternativo
+    """
+    logger.info(f"Texto extraído: {texto_completo[:500]}...")
+    
+    # Verifica se há indicação de "nenhum resultado"
+    if any(phrase in texto_completo.lower() for phrase in FRASES_SEM_RESULTADO):
+        logger.info("Nenhum resultado encontrado no texto")
+        return []
+    
+    # Divide o texto num bloco por resultado
+    inicios = [m.start() for m in RE_INICIO_ITEM.finditer(texto_completo)]
+    if inicios:
+        blocos = [texto_completo[a:b] for a, b in zip(inicios, inicios[1:] + [len(texto_completo)])]
+    else:
+        blocos = [texto_completo]
+    
+    itens = [dados for dados in map(_extrair_item, blocos) if dados.get('nome') or dados.get('oab')]
+    if not itens:
+        alternativo = _extrair_alternativo(texto_completo)
+        if alternativo.get('nome') or alternativo.get('oab'):
+            itens = [alternativo]
+    
+    resultados = []
+    for dados in itens:
+        # Define valores padrão se não encontrados
+        resultados.append(AdvogadoData(
+            oab=dados.get('oab'),
+            nome=dados.get('nome'),
+            uf=dados.get('uf') or uf.upper(),
+            categoria=dados.get('categoria') or 'Advogado',
+            data_inscricao=dados.get('data_inscricao'),
+            situacao=dados.get('situacao') or 'Ativo'
+        ))
+    
+    logger.info(f"{len(resultados)} advogado(s) extraído(s): {resultados[:3]}")
+    return resultados
+
+
+def extrair_de_html(html: str, uf: str) -> List[AdvogadoData]:
+    """Extrai os advogados direto do page_source (sem nenhuma chamada ao WebDriver)"""
+    texto = html_para_texto(html)
+    if not any(indicador in texto for indicador in INDICADORES_RESULTADO):
+        logger.warning("Nenhum indicador de resultado encontrado")
+        return []
+    return extrair_advogados(texto, uf)
+
+
 class OABScraper:
     """
     Scraper pra buscar advogados na OAB
     Foi um trabalho configurar o Chrome direitinho
     """
-    def __init__(self, headless: bool = True):
+    def __init__(self, headless: bool = True, result_timeout: float = 10.0,
+                 on_stage: Optional[Callable[[str, float], None]] = None,
+                 block_resources: bool = False,
+                 blocked_urls: Sequence[str] = BLOQUEIOS_PADRAO,
+                 allowed_urls: Sequence[str] = (),
+                 on_network: Optional[Callable[[int, int, int], None]] = None,
+                 base_url: str = CNA_SITE):
         self.headless = headless
+        self.base_url = base_url
+        # Tempo máximo esperando os resultados depois de clicar em Pesquisar
+        self.result_timeout = result_timeout
+        # Quanto tempo a última busca realmente esperou pelos resultados
+        self.last_wait: Optional[float] = None
+        # Como a última busca terminou: "resultado", "vazio", "timeout" ou "erro"
+        self.ultimo_estado: Optional[str] = None
+        # Duração (s) de cada etapa da última vez que rodou, e quem mais quer saber (métricas)
+        self.tempos: Dict[str, float] = {}
+        self.on_stage = on_stage
+        # Bloqueio de imagens/fontes/CSS/terceiros; allowed_urls passa na frente do bloqueio
+        self.block_resources = block_resources
+        self.blocked_urls = tuple(blocked_urls)
+        self.allowed_urls = tuple(allowed_urls)
+        # Requisições bloqueadas/carregadas e bytes baixados (total e da última busca)
+        self.rede = {"requests_blocked": 0, "requests_loaded": 0, "bytes_loaded": 0}
+        self.rede_ultima_busca = dict(self.rede)
+        self.on_network = on_network
         self.driver = None
         self._setup_driver()
     
+    def _etapa(self, nome: str, inicio: float):
+        """Registra quanto a etapa levou desde inicio (time.perf_counter)"""
+        duracao = time.perf_counter() - inicio
+        self.tempos[nome] = duracao
+        if self.on_stage is not None:
+            try:
+                self.on_stage(nome, duracao)
+            except Exception as e:
+                logger.warning(f"Erro ao registrar etapa {nome}: {e}")
+    
     def _setup_driver(self):
         """Configura o Chrome - a parte mais chata"""
         options = Options()
@@ -59,15 +300,28 @@ class OABScraper:
         options.add_experimental_option('useAutomationExtension', False)
         options.add_experimental_option("excludeSwitches", ["enable-automation"])
         
+        if self.block_resources:
+            # Imagens nem chegam a ser pedidas; o resto é bloqueado pelo DevTools em _configurar_bloqueio
+            options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+            options.add_argument('--blink-settings=imagesEnabled=false')
+            # Log de rede pra contar o que foi bloqueado e quanto foi baixado
+            options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+        
         try:
-            # WebDriverManager baixa o driver automaticamente
-            service = Service(ChromeDriverManager().install())
+            # Resolvido uma vez por processo (só a primeira instância paga esse tempo)
+            inicio = time.perf_counter()
+            service = Service(resolver_chromedriver())
+            self._etapa("driver_install", inicio)
+            
+            inicio = time.perf_counter()
             self.driver = webdriver.Chrome(service=service, options=options)
             self.driver.set_page_load_timeout(30)
             self.driver.implicitly_wait(10)
             
             # Remove indicadores de automação
             self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+            self._configurar_bloqueio()
+            self._etapa("chrome_start", inicio)
             
             logger.info("Chrome configurado")
             
@@ -82,28 +336,100 @@ class OABScraper:
                 options_simple.add_argument('--disable-dev-shm-usage')
                 options_simple.add_argument('--window-size=1920,1080')
                 
-                service_simple = Service(ChromeDriverManager().install())
+                service_simple = Service(resolver_chromedriver())
+                inicio = time.perf_counter()
                 self.driver = webdriver.Chrome(service=service_simple, options=options_simple)
                 self.driver.set_page_load_timeout(30)
+                self._configurar_bloqueio()
+                self._etapa("chrome_start", inicio)
                 logger.info("ChromeDriver configurado com configuração simplificada")
                 
             except Exception as e2:
                 logger.error(f"Erro na configuração alternativa: {e2}")
                 raise
     
-    def search_advogado(self, name: str, uf: str) -> AdvogadoData:
-        """Busca dados de um advogado no site da OAB"""
+    def search_advogado(self, name: str, uf: str, insc: Optional[str] = None) -> AdvogadoData:
+        """Busca dados de um advogado no site da OAB (pelo nome ou pelo número de inscrição)"""
+        resultados = self.search_advogados(name, uf, insc=insc)
+        return resultados[0] if resultados else AdvogadoData()
+    
+    def _configurar_bloqueio(self):
+        """
+        Bloqueia os recursos pelo DevTools (Network.setBlockedURLs)
+        urlPatterns (Chrome novo) respeita a ordem, então os permitidos vão antes com block=False;
+        o Chrome antigo ignora esse campo e usa só a lista simples de urls
+        """
+        if not self.block_resources or not self.driver:
+            return
+        padroes = ([{"urlPattern": p, "block": False} for p in self.allowed_urls] +
+                   [{"urlPattern": p, "block": True} for p in self.blocked_urls])
+        try:
+            self.driver.execute_cdp_cmd("Network.enable", {})
+            self.driver.execute_cdp_cmd("Network.setBlockedURLs", {
+                "urls": list(self.blocked_urls),
+                "urlPatterns": padroes,
+            })
+            logger.info(f"Bloqueando {len(self.blocked_urls)} padrões de URL ({len(self.allowed_urls)} liberados)")
+        except Exception as e:
+            logger.warning(f"Não deu pra configurar o bloqueio de recursos: {e}")
+    
+    def _coletar_rede(self):
+        """Lê o log de rede do Chrome e soma requisições bloqueadas, carregadas e bytes baixados"""
+        if not self.block_resources or not self.driver:
+            return
+        try:
+            entradas = self.driver.get_log("performance")
+        except Exception as e:
+            logger.debug(f"Sem log de rede: {e}")
+            return
+        bloqueadas = carregadas = baixados = 0
+        for entrada in entradas:
+            try:
+                mensagem = json.loads(entrada["message"])["message"]
+            except (KeyError, TypeError, ValueError):
+                continue
+            metodo = mensagem.get("method")
+            params = mensagem.get("params", {})
+            if metodo == "Network.loadingFailed" and params.get("blockedReason"):
+                bloqueadas += 1
+            elif metodo == "Network.loadingFinished":
+                carregadas += 1
+                baixados += int(params.get("encodedDataLength") or 0)
+        self.rede_ultima_busca = {
+            "requests_blocked": bloqueadas, "requests_loaded": carregadas, "bytes_loaded": baixados,
+        }
+        for chave, valor in self.rede_ultima_busca.items():
+            self.rede[chave] += valor
+        if self.on_network is not None:
+            try:
+                self.on_network(bloqueadas, carregadas, baixados)
+            except Exception as e:
+                logger.warning(f"Erro ao registrar rede: {e}")
+    
+    def search_advogados(self, name: str, uf: str, insc: Optional[str] = None,
+                         max_paginas: int = 1) -> List[AdvogadoData]:
+        """Busca e devolve todos os advogados da página de resultados, seguindo até max_paginas"""
+        # Vira o estado da espera; se sair por exceção no meio do caminho fica "erro"
+        self.ultimo_estado = "erro"
+        try:
+            return self._search_advogados(name, uf, insc, max_paginas)
+        finally:
+            self._coletar_rede()
+    
+    def _search_advogados(self, name: str, uf: str, insc: Optional[str],
+                          max_paginas: int) -> List[AdvogadoData]:
         try:
-            logger.info(f"Iniciando busca para: {name} - UF: {uf}")
+            logger.info(f"Iniciando busca para: {name or insc} - UF: {uf}")
             
             # Verifica se o driver está funcionando
             if not self.driver:
                 logger.error("Driver não inicializado")
-                return AdvogadoData()
+                return []
             
             # Navega para o site
             logger.info("Navegando para o site da OAB...")
-            self.driver.get("https://cna.oab.org.br/")
+            inicio = time.perf_counter()
+            self.driver.get(self.base_url)
             
             # Aguarda a página carregar
             wait = WebDriverWait(self.driver, 20)
@@ -113,10 +439,19 @@ class OABScraper:
             nome_input = wait.until(
                 EC.presence_of_element_located((By.NAME, "NomeAdvo"))
             )
+            self._etapa("page_load", inicio)
+            
+            inicio = time.perf_counter()
             nome_input.clear()
-            nome_input.send_keys(name)
+            nome_input.send_keys(name or "")
             logger.info(f"Nome '{name}' inserido")
             
+            if insc:
+                insc_input = self.driver.find_element(By.NAME, "Insc")
+                insc_input.clear()
+                insc_input.send_keys(insc)
+                logger.info(f"Inscrição '{insc}' inserida")
+            
             logger.info("Selecionando UF...")
             # Seleciona a UF - usando o seletor correto
             uf_select = Select(wait.until(
@@ -130,38 +465,60 @@ class OABScraper:
             buscar_btn = wait.until(
                 EC.element_to_be_clickable((By.XPATH, "//button[contains(text(), 'Pesquisar')]"))
             )
+            texto_antes = self._texto_pagina()
             buscar_btn.click()
+            self._etapa("form_fill", inicio)
             
-            # Aguarda os resultados carregarem
+            # Espera os resultados ou o "nenhum resultado" aparecer, o que vier primeiro
             logger.info("Aguardando resultados...")
-            time.sleep(7)  # Aumenta tempo de espera
+            estado = self._esperar_resultado(texto_antes)
+            self.ultimo_estado = estado
+            logger.info(f"Resultado '{estado}' depois de {self.last_wait:.2f}s")
+            
+            if estado == "vazio":
+                return []
             
             try:
-                # Como o site não usa IDs/classes específicas, vamos pegar o body inteiro
-                logger.info("Aguardando carregamento da página de resultados...")
-                
-                # Aguarda um pouco mais para garantir que a página carregou
-                time.sleep(3)
-                
-                # Pega o body inteiro
-                body_element = self.driver.find_element(By.TAG_NAME, "body")
-                body_text = body_element.text
-                
-                logger.info(f"Texto da página capturado: {len(body_text)} caracteres")
+                resultados = []
+                vistos = set()
+                espera_total = self.last_wait
+                pagina = 1
+                while True:
+                    # Um snapshot do HTML só e o resto é parsing local
+                    inicio = time.perf_counter()
+                    html = self.driver.page_source
+                    logger.info(f"HTML da página {pagina} capturado: {len(html)} caracteres")
+                    
+                    pagina_resultados = self._extract_all(html, uf)
+                    self._etapa("extraction", inicio)
+                    if not pagina_resultados:
+                        break
+                    
+                    for adv in pagina_resultados:
+                        chave = (adv.uf, adv.oab, adv.nome)
+                        if chave not in vistos:
+                            vistos.add(chave)
+                            resultados.append(adv)
+                    
+                    if pagina >= max_paginas:
+                        break
+                    texto_antes = self._texto_pagina()
+                    if not self._proxima_pagina():
+                        break
+                    if self._esperar_resultado(texto_antes) != "resultado":
+                        espera_total += self.last_wait
+                        break
+                    espera_total += self.last_wait
+                    pagina += 1
                 
-                # Verifica se há resultados
-                if any(indicator in body_text for indicator in [
-                    "RESULTADO", "Nome:", "Inscrição:", "Tipo:", "UF:"
-                ]):
-                    logger.info("Indicadores de resultado encontrados")
-                    return self._extract_data(body_element, uf)
-                else:
-                    logger.warning("Nenhum indicador de resultado encontrado")
-                    return AdvogadoData()
+                self.last_wait = espera_total
+                logger.info(f"{len(resultados)} resultado(s) em {pagina} página(s)")
+                return resultados
                 
             except Exception as e:
                 logger.error(f"Erro ao buscar resultados: {e}")
-                return AdvogadoData()
+                self.ultimo_estado = "erro"
+                return []
                 
         except Exception as e:
             logger.error(f"Erro durante scraping: {e}")
@@ -173,142 +530,71 @@ class OABScraper:
                     logger.info("Screenshot salvo: debug_error.png")
                 except:
                     pass
-            return AdvogadoData()
+            return []
     
-    def _extract_data(self, resultado_element, uf: str) -> AdvogadoData:
-        """Extrai os dados do elemento de resultado baseado na estrutura real do site OAB"""
+    def _proxima_pagina(self) -> bool:
+        """Clica no link de próxima página, se tiver (tudo em JS pra não cair no implicit wait)"""
         try:
-            dados = {}
-            
-            # Obtém o texto completo do elemento
-            texto_completo = resultado_element.text
-            
-            # Se o texto está vazio, tenta buscar em elementos filhos
-            if not texto_completo.strip():
-                try:
-                    # Busca em células de tabela
-                    cells = resultado_element.find_elements(By.TAG_NAME, "td")
-                    if cells:
-                        texto_completo = " ".join([cell.text for cell in cells])
-                    else:
-                        # Busca em divs
-                        divs = resultado_element.find_elements(By.TAG_NAME, "div")
-                        texto_completo = " ".join([div.text for div in divs if div.text.strip()])
-                except:
-                    pass
-            
-            logger.info(f"Texto extraído: {texto_completo[:500]}...")
-            
-            # Verifica se há indicação de "nenhum resultado"
-            if any(phrase in texto_completo.lower() for phrase in [
-                "nenhum resultado", "não encontrado", "não foram encontrados", 
-                "sem resultados", "resultado não encontrado"
-            ]):
-                logger.info("Nenhum resultado encontrado no texto")
-                return AdvogadoData()
-            
-            # Busca por padrões específicos da estrutura da OAB
-            # Padrão: Nome: FULANO DE TAL Tipo: ADVOGADO Inscrição: 123456 UF: SP
-            
-            # Extrai dados usando regex mais específico
-            import re
-            
-            # Busca por Nome seguido de Tipo/Inscrição
-            nome_pattern = r'Nome:\s*([A-ZÁÇÃÕÊÉÍ\s]+?)(?:\s+Tipo:|$)'
-            nome_match = re.search(nome_pattern, texto_completo, re.IGNORECASE)
-            if nome_match:
-                dados['nome'] = nome_match.group(1).strip()
-                logger.info(f"Nome extraído: {dados['nome']}")
-            
-            # Busca por Tipo
-            tipo_pattern = r'Tipo:\s*([A-ZÁÇÃÕÊÉÍ\s]+?)(?:\s+Inscrição:|$)'
-            tipo_match = re.search(tipo_pattern, texto_completo, re.IGNORECASE)
-            if tipo_match:
-                dados['categoria'] = tipo_match.group(1).strip()
-                logger.info(f"Categoria extraída: {dados['categoria']}")
-            
-            # Busca por Inscrição (número OAB)
-            insc_pattern = r'Inscrição:\s*(\d+)'
-            insc_match = re.search(insc_pattern, texto_completo, re.IGNORECASE)
-            if insc_match:
-                dados['oab'] = insc_match.group(1).strip()
-                logger.info(f"OAB extraído: {dados['oab']}")
-            
-            # Busca por UF
-            uf_pattern = r'UF:\s*([A-Z]{2})'
-            uf_match = re.search(uf_pattern, texto_completo, re.IGNORECASE)
-            if uf_match:
-                dados['uf'] = uf_match.group(1).strip().upper()
-                logger.info(f"UF extraída: {dados['uf']}")
-            
-            # Se não encontrou dados estruturados, tenta parsing alternativo
-            if not dados.get('nome') and not dados.get('oab'):
-                logger.info("Tentando parsing alternativo...")
-                
-                # Divide o texto em linhas e processa
-                linhas = texto_completo.split('\n')
-                
-                for linha in linhas:
-                    linha = linha.strip()
-                    if not linha:
-                        continue
-                    
-                    # Procura por números que podem ser OAB
-                    if re.search(r'\d{4,8}', linha):
-                        numeros = re.findall(r'\d{4,8}', linha)
-                        if numeros and not dados.get('oab'):
-                            dados['oab'] = numeros[0]
-                            logger.info(f"OAB extraído (alternativo): {dados['oab']}")
-                    
-                    # Procura por nomes (linhas com palavras capitalizadas)
-                    if (re.search(r'^[A-ZÁÇÃÕÊÉÍ\s]+$', linha) and 
-                        len(linha.split()) >= 2 and 
-                        not dados.get('nome')):
-                        dados['nome'] = linha.strip()
-                        logger.info(f"Nome extraído (alternativo): {dados['nome']}")
-            
-            # Se ainda não encontrou nada, tenta uma busca mais ampla
-            if not dados.get('nome') and not dados.get('oab'):
-                logger.info("Tentando busca mais ampla...")
-                
-                # Busca por qualquer sequência de letras maiúsculas (provável nome)
-                nomes_possiveis = re.findall(r'[A-ZÁÇÃÕÊÉÍ]{2,}(?:\s+[A-ZÁÇÃÕÊÉÍ]{2,})+', texto_completo)
-                if nomes_possiveis:
-                    dados['nome'] = nomes_possiveis[0].strip()
-                    logger.info(f"Nome extraído (busca ampla): {dados['nome']}")
-                
-                # Busca por qualquer número de 4-8 dígitos (provável OAB)
-                numeros_possiveis = re.findall(r'\b\d{4,8}\b', texto_completo)
-                if numeros_possiveis:
-                    dados['oab'] = numeros_possiveis[0]
-                    logger.info(f"OAB extraído (busca ampla): {dados['oab']}")
-            
-            # Define valores padrão se não encontrados
-            if not dados.get('categoria'):
-                dados['categoria'] = 'Advogado'
-            
-            if not dados.get('situacao'):
-                dados['situacao'] = 'Ativo'
-            
-            if not dados.get('uf'):
-                dados['uf'] = uf.upper()
-            
-            # Log final dos dados extraídos
-            logger.info(f"Dados finais extraídos: {dados}")
-            
-            return AdvogadoData(
-                oab=dados.get('oab'),
-                nome=dados.get('nome'),
-                uf=dados.get('uf'),
-                categoria=dados.get('categoria'),
-                data_inscricao=dados.get('data_inscricao'),
-                situacao=dados.get('situacao')
-            )
-            
+            return bool(self.driver.execute_script(JS_PROXIMA_PAGINA))
+        except Exception as e:
+            logger.warning(f"Erro ao ir pra próxima página: {e}")
+            return False
+    
+    def _texto_pagina(self) -> str:
+        """Texto visível da página atual"""
+        try:
+            return self.driver.execute_script(JS_TEXTO_PAGINA) or ""
+        except Exception:
+            return ""
+    
+    def _esperar_resultado(self, texto_antes: str = "") -> str:
+        """
+        Espera a página de resultados em vez de dormir um tempo fixo
+        Retorna "resultado", "vazio" ou "timeout" e guarda o tempo em self.last_wait
+        """
+        def pronto(driver):
+            texto = self._texto_pagina()
+            # Ainda é a mesma página de antes do clique
+            if not texto or texto == texto_antes:
+                return False
+            if any(frase in texto.lower() for frase in FRASES_SEM_RESULTADO):
+                return "vazio"
+            if any(indicador in texto for indicador in INDICADORES_RESULTADO):
+                return "resultado"
+            return False
+        
+        inicio = time.perf_counter()
+        try:
+            estado = WebDriverWait(self.driver, self.result_timeout, poll_frequency=0.1).until(pronto)
+        except TimeoutException:
+            estado = "timeout"
+        self._etapa("result_wait", inicio)
+        self.last_wait = self.tempos["result_wait"]
+        return estado
+    
+    def _extract_data(self, html: str, uf: str) -> AdvogadoData:
+        """Extrai o primeiro advogado do HTML da página de resultados"""
+        resultados = self._extract_all(html, uf)
+        return resultados[0] if resultados else AdvogadoData()
+    
+    def _extract_all(self, html: str, uf: str) -> List[AdvogadoData]:
+        """Extrai todos os advogados do HTML da página de resultados"""
+        try:
+            return extrair_de_html(html, uf)
         except Exception as e:
             logger.error(f"Erro ao extrair dados: {e}")
-            return AdvogadoData()
+            return []
     
+    def is_alive(self) -> bool:
+        """Verifica se o navegador ainda responde (usado pelo pool)"""
+        if not self.driver:
+            return False
+        try:
+            self.driver.current_url
+            return True
+        except Exception:
+            return False
+
     def close(self):
         """Fecha o driver"""
         try:
@@ -0,0 +1,310 @@
+"""
+Várias buscas ao mesmo tempo em abas de um Chrome só
+Um Chrome por busca custa algumas centenas de MB; aqui um navegador atende
+até max_tabs buscas, cada uma na sua aba e com o seu prazo.
+
+O WebDriver só controla uma janela por vez, então uma thread só cuida de todas
+as abas: navega sem bloquear (JS), e vai passando de aba em aba avançando cada
+busca (formulário pronto -> preenche e pesquisa -> resultado -> extrai).
+Enquanto isso o navegador carrega as outras abas em paralelo.
+"""
+
+import time
+import logging
+import threading
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Callable, Deque, Dict, List, Optional, Set, Tuple
+
+from .scraper_oab import (
+    OABScraper, AdvogadoData, extrair_de_html,
+    FRASES_SEM_RESULTADO, INDICADORES_RESULTADO, JS_TEXTO_PAGINA, JS_PROXIMA_PAGINA,
+)
+
+logger = logging.getLogger(__name__)
+
+# Navega sem esperar a página carregar (o driver.get bloquearia a thread)
+JS_NAVEGAR = "window.location.href = arguments[0];"
+
+# O formulário de busca já está na página
+JS_FORM_PRONTO = "return document.readyState !== 'loading' && !!document.querySelector('[name=NomeAdvo]');"
+
+# Preenche nome, inscrição e UF e clica em Pesquisar
+JS_PESQUISAR = """
+const [nome, insc, uf] = arguments;
+const preencher = (seletor, valor) => {
+    const el = document.querySelector(seletor);
+    if (!el) return false;
+    el.value = valor;
+    el.dispatchEvent(new Event('input', {bubbles: true}));
+    el.dispatchEvent(new Event('change', {bubbles: true}));
+    return true;
+};
+if (!preencher('[name=NomeAdvo]', nome) || !preencher('[name=Uf]', uf)) return false;
+preencher('[name=Insc]', insc);
+const botao = Array.from(document.querySelectorAll('button')).find(b => (b.innerText || '').includes('Pesquisar'));
+if (!botao) return false;
+botao.click();
+return true;
+"""
+
+
+class TabTimeout(Exception):
+    """A busca da aba passou do prazo"""
+
+
+@dataclass
+class _Aba:
+    future: Future
+    name: str
+    uf: str
+    insc: Optional[str]
+    max_paginas: int
+    handle: Optional[str] = None
+    estado: str = "carregando"
+    prazo: float = 0.0
+    inicio: float = 0.0
+    texto_antes: str = ""
+    pagina: int = 1
+    resultados: List[AdvogadoData] = field(default_factory=list)
+    vistos: Set[Tuple] = field(default_factory=set)
+
+
+class TabScraper:
+    """
+    Mesma interface do OABScraper (search_advogados), mas as buscas de várias
+    threads viram abas de um navegador só
+    - max_tabs: buscas ao mesmo tempo no navegador (o resto espera na fila)
+    - tab_timeout: prazo de cada busca, contado de quando a aba abre
+    """
+
+    def __init__(self, factory: Optional[Callable[[], OABScraper]] = None, max_tabs: int = 4,
+                 tab_timeout: float = 20.0, poll_interval: float = 0.05):
+        if max_tabs < 1:
+            raise ValueError("max_tabs deve ser pelo menos 1")
+        self.factory = factory or (lambda: OABScraper(headless=True))
+        self.max_tabs = max_tabs
+        self.tab_timeout = tab_timeout
+        self.poll_interval = poll_interval
+
+        self._cond = threading.Condition()
+        self._fila: Deque[_Aba] = deque()
+        self._abas: List[_Aba] = []
+        self._scraper: Optional[OABScraper] = None
+        self._base: Optional[str] = None
+        self._thread: Optional[threading.Thread] = None
+        self._navegador_lock = threading.Lock()
+        self._fechado = False
+
+        self.completed = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.browsers_started = 0
+
+    def start(self):
+        """Sobe a thread das abas, que já abre o navegador (chamado sozinho na primeira busca)"""
+        with self._cond:
+            if self._fechado:
+                raise RuntimeError("TabScraper já foi fechado")
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._loop, name="oab-tabs", daemon=True)
+            self._thread.start()
+
+    def aquecer(self):
+        """Abre o navegador aqui mesmo (erro sobe pra quem chamou) e depois sobe a thread das abas"""
+        self._garantir_navegador()
+        self.start()
+
+    def submit(self, name: str, uf: str, insc: Optional[str] = None, max_paginas: int = 1) -> Future:
+        self.start()
+        aba = _Aba(future=Future(), name=name or "", uf=uf.upper(), insc=insc, max_paginas=max(1, max_paginas))
+        with self._cond:
+            self._fila.append(aba)
+            self._cond.notify()
+        return aba.future
+
+    def search_advogados(self, name: str, uf: str, insc: Optional[str] = None,
+                         max_paginas: int = 1) -> List[AdvogadoData]:
+        return self.submit(name, uf, insc, max_paginas).result()
+
+    def search_advogado(self, name: str, uf: str, insc: Optional[str] = None) -> AdvogadoData:
+        resultados = self.search_advogados(name, uf, insc)
+        return resultados[0] if resultados else AdvogadoData()
+
+    # --- thread das abas ---
+
+    def _loop(self):
+        try:
+            self._garantir_navegador()
+        except Exception as e:
+            logger.error(f"Erro ao abrir o navegador das abas: {e}")
+        while True:
+            with self._cond:
+                while not self._fechado and not self._fila and not self._abas:
+                    self._cond.wait()
+                if self._fechado:
+                    break
+            try:
+                self._garantir_navegador()
+                self._abrir_abas()
+                andou = False
+                for aba in list(self._abas):
+                    try:
+                        andou = self._passo(aba) or andou
+                    except Exception as e:
+                        # Erro numa aba só não derruba as outras, a não ser que o navegador tenha morrido
+                        if not self._scraper.is_alive():
+                            raise
+                        self.errors += 1
+                        self._finalizar(aba, erro=e)
+                        andou = True
+            except Exception as e:
+                logger.error(f"Erro no navegador das abas: {e}")
+                self._reiniciar(e)
+                andou = True
+            if not andou:
+                time.sleep(self.poll_interval)
+        self._reiniciar(RuntimeError("TabScraper fechado"))
+
+    def _garantir_navegador(self):
+        # aquecer() roda na thread de quem chamou; o lock evita abrir dois navegadores
+        with self._navegador_lock:
+            if self._scraper is not None:
+                return
+            try:
+                self._scraper = self.factory()
+            except Exception as e:
+                # Sem navegador não tem como atender quem está na fila
+                with self._cond:
+                    pendentes = list(self._fila)
+                    self._fila.clear()
+                for aba in pendentes:
+                    if aba.future.set_running_or_notify_cancel():
+                        aba.future.set_exception(e)
+                raise
+            self._base = self._scraper.driver.current_window_handle
+            self.browsers_started += 1
+            logger.info(f"Navegador das abas aberto (até {self.max_tabs} abas)")
+
+    def _abrir_abas(self):
+        driver = self._scraper.driver
+        while len(self._abas) < self.max_tabs:
+            with self._cond:
+                if not self._fila:
+                    return
+                aba = self._fila.popleft()
+            if not aba.future.set_running_or_notify_cancel():
+                continue
+            # Entra na lista antes de abrir, assim um erro aqui também é entregue pra quem espera
+            self._abas.append(aba)
+            driver.switch_to.new_window("tab")
+            aba.handle = driver.current_window_handle
+            # O bloqueio do DevTools vale só pro alvo em que foi ligado (a janela base), cada aba liga o seu
+            self._scraper._configurar_bloqueio()
+            aba.inicio = time.perf_counter()
+            aba.prazo = time.monotonic() + self.tab_timeout
+            driver.execute_script(JS_NAVEGAR, self._scraper.base_url)
+
+    def _passo(self, aba: _Aba) -> bool:
+        """Avança a busca da aba um passo; True se algo mudou"""
+        driver = self._scraper.driver
+        if time.monotonic() > aba.prazo:
+            self.timeouts += 1
+            self._finalizar(aba, erro=TabTimeout(f"Busca passou de {self.tab_timeout}s ({aba.estado})"))
+            return True
+        driver.switch_to.window(aba.handle)
+
+        if aba.estado == "carregando":
+            if not driver.execute_script(JS_FORM_PRONTO):
+                return False
+            aba.texto_antes = driver.execute_script(JS_TEXTO_PAGINA) or ""
+            if not driver.execute_script(JS_PESQUISAR, aba.name, aba.insc or "", aba.uf):
+                self.errors += 1
+                self._finalizar(aba, erro=RuntimeError("Formulário de busca não encontrado"))
+                return True
+            aba.estado = "esperando"
+            return True
+
+        texto = driver.execute_script(JS_TEXTO_PAGINA) or ""
+        # Ainda é a mesma página de antes do clique
+        if not texto or texto == aba.texto_antes:
+            return False
+        if any(frase in texto.lower() for frase in FRASES_SEM_RESULTADO):
+            self._finalizar(aba)
+            return True
+        if not any(indicador in texto for indicador in INDICADORES_RESULTADO):
+            return False
+
+        for adv in extrair_de_html(driver.page_source, aba.uf):
+            chave = (adv.uf, adv.oab, adv.nome)
+            if chave not in aba.vistos:
+                aba.vistos.add(chave)
+                aba.resultados.append(adv)
+        if aba.pagina < aba.max_paginas and driver.execute_script(JS_PROXIMA_PAGINA):
+            aba.pagina += 1
+            aba.texto_antes = texto
+            return True
+        self._finalizar(aba)
+        return True
+
+    def _finalizar(self, aba: _Aba, erro: Optional[Exception] = None):
+        """Fecha a aba e entrega o resultado (ou o erro) pra quem está esperando"""
+        self._abas.remove(aba)
+        try:
+            driver = self._scraper.driver
+            driver.switch_to.window(aba.handle)
+            driver.close()
+            driver.switch_to.window(self._base)
+        except Exception as e:
+            logger.warning(f"Erro ao fechar aba: {e}")
+        if erro is None:
+            self.completed += 1
+            self._scraper._etapa("tab_lookup", aba.inicio)
+            self._scraper._coletar_rede()
+            aba.future.set_result(aba.resultados)
+        else:
+            aba.future.set_exception(erro)
+
+    def _reiniciar(self, erro: Exception):
+        """Falha todas as abas abertas e descarta o navegador (o próximo passo abre outro)"""
+        abas, self._abas = self._abas, []
+        for aba in abas:
+            self.errors += 1
+            if not aba.future.done():
+                aba.future.set_exception(erro)
+        if self._scraper is not None:
+            try:
+                self._scraper.close()
+            except Exception:
+                pass
+            self._scraper = None
+
+    def is_alive(self) -> bool:
+        return self._scraper is not None and self._scraper.is_alive()
+
+    def stats(self) -> Dict[str, int]:
+        with self._cond:
+            return {
+                "max_tabs": self.max_tabs,
+                "open_tabs": len(self._abas),
+                "queued": len(self._fila),
+                "completed": self.completed,
+                "timeouts": self.timeouts,
+                "errors": self.errors,
+                "browsers_started": self.browsers_started,
+            }
+
+    def close(self):
+        with self._cond:
+            self._fechado = True
+            pendentes = list(self._fila)
+            self._fila.clear()
+            self._cond.notify_all()
+            thread = self._thread
+        for aba in pendentes:
+            if aba.future.set_running_or_notify_cancel():
+                aba.future.set_exception(RuntimeError("TabScraper fechado"))
+        if thread is not None:
+            thread.join(timeout=10)
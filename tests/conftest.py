@@ -0,0 +1,5 @@
+import os
+import tempfile
+
+# Os SQLite locais (jobs, registro) vão pra uma pasta temporária durante os testes
+os.environ.setdefault("OAB_DATA_DIR", tempfile.mkdtemp(prefix="oab-tests-"))
@@ -69,3 +69,248 @@ def test_fetch_oab_tool():
     assert isinstance(resultado, dict)  # Deve retornar um dict
     # Pelo menos deve ter as chaves básicas
     assert "oab" in resultado
+
+def test_cache_endpoint():
+    from api.main import cache
+    from scraper.scraper_oab import AdvogadoData
+
+    cache.clear()
+    cache.set_resultado("Ana Rosa", "MS", AdvogadoData(oab="19051", nome="ANA ROSA", uf="MS"))
+
+    # Com o resultado no cache a busca nem chega no scraper
+    resp = client.post("/fetch_oab", json={"name": "ana rosa", "uf": "ms"})
+    assert resp.status_code == 200
+    assert resp.json()["oab"] == "19051"
+
+    resp = client.get("/cache")
+    assert resp.json()["stats"]["size"] == 1
+    assert resp.json()["entries"][0]["oab"] == "19051"
+
+    resp = client.delete("/cache", params={"name": "Ana Rosa", "uf": "MS"})
+    assert resp.json() == {"removed": 1}
+
+def test_fetch_oab_fila_cheia_retorna_503():
+    import threading
+    import api.main as main
+    from api import service
+    from api.executor import ScrapeExecutor
+
+    main.cache.clear()
+    antigo = service.executor
+    service.executor = ScrapeExecutor(max_workers=1, max_queue=0)
+    liberar = threading.Event()
+    try:
+        # Ocupa a única thread de scraping
+        service.executor.submit(liberar.wait, 5)
+        resp = client.post("/fetch_oab", json={"name": "Maria Silva", "uf": "SP"})
+        assert resp.status_code == 503
+        assert int(resp.headers["Retry-After"]) >= 1
+        # O /health continua respondendo normalmente
+        assert client.get("/health").status_code == 200
+    finally:
+        liberar.set()
+        service.executor.shutdown()
+        service.executor = antigo
+
+def test_fetch_oab_batch_ndjson():
+    import json
+    from api.main import cache
+    from scraper.scraper_oab import AdvogadoData
+
+    cache.clear()
+    cache.set_resultado("Ana Rosa", "MS", AdvogadoData(oab="19051", nome="ANA ROSA", uf="MS"))
+    cache.set_resultado("Fulano", "SP", AdvogadoData())
+
+    resp = client.post("/fetch_oab/batch", json={"items": [
+        {"name": "Ana Rosa", "uf": "MS"},
+        {"name": "Fulano", "uf": "SP"},
+        {"name": "Beltrano", "uf": "XX"},
+    ]})
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+
+    linhas = {item["index"]: item for item in map(json.loads, resp.text.splitlines())}
+    assert linhas[0]["status"] == "ok"
+    assert linhas[0]["result"]["oab"] == "19051"
+    assert linhas[1]["status"] == "not_found"
+    assert linhas[2]["status"] == "error"
+    assert all("elapsed_ms" in item for item in linhas.values())
+    cache.clear()
+
+def test_jobs_endpoint(tmp_path):
+    import time
+    import api.main as main
+    from api.jobs import JobRunner, JobStore
+    from scraper.scraper_oab import AdvogadoData
+
+    antigo = main.jobs
+    main.jobs = JobRunner(JobStore(str(tmp_path / "jobs.db")),
+                          processar=lambda name, uf: AdvogadoData(oab="19051", nome="ANA ROSA", uf=uf))
+    main.jobs.start()
+    try:
+        resp = client.post("/jobs", json={"name": "Ana Rosa", "uf": "MS"})
+        assert resp.status_code == 202
+        job_id = resp.json()["id"]
+
+        for _ in range(200):
+            resp = client.get(f"/jobs/{job_id}")
+            if resp.json()["status"] == "done":
+                break
+            time.sleep(0.01)
+        assert resp.json()["result"]["oab"] == "19051"
+
+        assert client.get("/jobs/nao-existe").status_code == 404
+
+        # callback_url pra rede interna é recusado antes de criar o job
+        resp = client.post("/jobs", json={"name": "Ana Rosa", "uf": "MS",
+                                          "callback_url": "http://169.254.169.254/latest/meta-data"})
+        assert resp.status_code == 400 and "interno" in resp.json()["detail"]
+    finally:
+        main.jobs.stop()
+        main.jobs = antigo
+
+def test_advogado_por_numero_do_registro_local(tmp_path):
+    import api.main as main
+    from api import service
+    from api.registry import AdvogadoRegistry
+    from scraper.scraper_oab import AdvogadoData
+
+    antigo = service.registry
+    service.registry = AdvogadoRegistry(str(tmp_path / "advogados.db"))
+    try:
+        service.registry.salvar([AdvogadoData(oab="19051", nome="ANA ROSA", uf="MS")])
+        resp = client.get("/advogados/ms/19051")
+        assert resp.status_code == 200
+        assert resp.json()["nome"] == "ANA ROSA"
+        assert resp.json()["fonte"] == "local"
+
+        assert client.get("/advogados/MS/abc").status_code == 400
+    finally:
+        service.registry.close()
+        service.registry = antigo
+
+def test_busca_aproximada_no_registro_local():
+    import api.main as main
+    from api import service
+    from api.fuzzy import FuzzyNameIndex
+    from scraper.scraper_oab import AdvogadoData
+
+    antigo = service.fuzzy
+    service.fuzzy = FuzzyNameIndex()
+    service.fuzzy.adicionar(AdvogadoData(oab="19051", nome="ANA CAROLINA ROSA CURY", uf="MS"))
+    main.cache.clear()
+    try:
+        resp = client.get("/advogados/busca", params={"name": "ana carolina rosa curi", "uf": "MS"})
+        assert resp.status_code == 200
+        assert resp.json()[0]["oab"] == "19051"
+
+        # Nome quase igual responde pelo índice sem precisar do scraper
+        resp = client.post("/fetch_oab", json={"name": "Ana Carolina Rosa Cury", "uf": "MS"})
+        assert resp.json()["oab"] == "19051"
+    finally:
+        service.fuzzy = antigo
+        main.cache.clear()
+
+def test_fetch_oab_all_devolve_todos():
+    from api.main import cache
+    from scraper.scraper_oab import AdvogadoData
+
+    cache.clear()
+    cache.set_resultados("Maria Silva", "SP", [
+        AdvogadoData(oab="1", nome="MARIA SILVA", uf="SP"),
+        AdvogadoData(oab="2", nome="MARIA DA SILVA", uf="SP"),
+    ], max_paginas=2)
+    try:
+        resp = client.post("/fetch_oab/all", json={"name": "Maria Silva", "uf": "SP", "max_paginas": 2})
+        assert resp.status_code == 200
+        assert resp.json()["total"] == 2
+        assert [r["oab"] for r in resp.json()["resultados"]] == ["1", "2"]
+
+        # O /fetch_oab aproveita o primeiro da lista
+        assert client.post("/fetch_oab", json={"name": "Maria Silva", "uf": "SP"}).json()["oab"] == "1"
+    finally:
+        cache.clear()
+
+def test_metrics_prometheus():
+    import api.main as main
+    from api import service
+    from api import metrics
+    from scraper.pool import DriverPool
+    from scraper.scraper_oab import AdvogadoData
+
+    class BackendFake:
+        pool = DriverPool(factory=lambda: None, min_size=0, max_size=1)
+        tabs = None
+        limiter = None
+        hedger = None
+
+        def search_advogados(self, name, uf, insc=None, max_paginas=1):
+            metrics.observar_etapa("result_wait", 0.2)
+            if name.startswith("Erro"):
+                raise RuntimeError("site fora do ar")
+            return [AdvogadoData(oab="777", nome="ZACARIAS METRICAS", uf=uf)] if name.startswith("Zacarias") else []
+
+    antigo = service.backend
+    service.backend = BackendFake()
+    main.cache.clear()
+    try:
+        sucesso_antes = metrics.scrapes_total.get("AC", "success")
+        assert client.post("/fetch_oab", json={"name": "Zacarias Metricas", "uf": "AC"}).json()["oab"] == "777"
+        assert client.post("/fetch_oab", json={"name": "Ninguém Aqui", "uf": "AC"}).status_code == 200
+        assert client.post("/fetch_oab", json={"name": "Erro Proposital", "uf": "AC"}).status_code == 500
+
+        resp = client.get("/metrics")
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("text/plain")
+        texto = resp.text
+        assert "# TYPE oab_scrape_stage_seconds histogram" in texto
+        assert 'oab_scrape_stage_seconds_bucket{stage="result_wait",le="0.25"}' in texto
+        assert 'oab_scrapes_total{uf="AC",outcome="empty"}' in texto
+        assert 'oab_scrapes_total{uf="AC",outcome="error"}' in texto
+        assert metrics.scrapes_total.get("AC", "success") == sucesso_antes + 1
+        assert "oab_scrapes_in_flight 0" in texto
+        assert 'oab_cache{stat="hits"}' in texto
+        assert 'oab_driver_pool{stat="max_size"} 1' in texto
+    finally:
+        service.backend = antigo
+        main.cache.clear()
+
+def test_health_live_e_ready(monkeypatch):
+    monkeypatch.setenv("OAB_SCRAPER_BACKEND", "http")
+    # Sem o lifespan o pool não foi aquecido, então ainda não está pronto
+    assert client.get("/health/live").json() == {"status": "alive"}
+    assert client.get("/health/ready").status_code == 503
+
+    with TestClient(app) as c:
+        resp = c.get("/health/ready")
+        assert resp.status_code == 200
+        assert resp.json()["status"] == "ready"
+        assert resp.json()["startup_seconds"] is not None
+        assert c.get("/health").json() == {"status": "healthy"}
+    assert client.get("/health/ready").status_code == 503
+
+
+def test_ready_com_abas_espera_o_navegador(monkeypatch):
+    import api.main as main
+    from api import service
+    from scraper.tabs import TabScraper
+
+    class AbasSemChrome(TabScraper):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.factory = self._quebrado
+
+        @staticmethod
+        def _quebrado():
+            raise RuntimeError("chrome não abriu")
+
+    monkeypatch.setenv("OAB_SCRAPER_BACKEND", "selenium")
+    monkeypatch.setenv("OAB_TABS_PER_BROWSER", "2")
+    monkeypatch.setenv("OAB_POOL_MIN", "0")
+    monkeypatch.setattr(service, "TabScraper", AbasSemChrome)
+    monkeypatch.setattr(main, "resolver_chromedriver", lambda: "chromedriver")
+    # Com abas o navegador abre durante o aquecimento: se não abrir, não fica pronto
+    with TestClient(app) as c:
+        resp = c.get("/health/ready")
+        assert resp.status_code == 503
+        assert "chrome não abriu" in main.startup["warm_error"]
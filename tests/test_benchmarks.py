@@ -0,0 +1,29 @@
+import json
+import logging
+
+from benchmarks import corpus
+from benchmarks.run import comparar, main, rodar
+
+
+def test_corpus_e_deterministico():
+    assert corpus.consultas(50) == corpus.consultas(50)
+    assert len(corpus.paginas()) >= 1
+
+
+def test_rodada_curta_gera_json_e_compara(tmp_path):
+    saida = tmp_path / "bench.json"
+    assert main(["--iterations", "20", "--rodadas-speedup", "1", "--output", str(saida)]) == 0
+    # Os logs ficam desligados só durante a medição
+    assert logging.root.manager.disable == logging.NOTSET
+
+    relatorio = json.loads(saida.read_text(encoding="utf-8"))
+    for nome in ("extract_data", "parse_oab_query", "parse_many", "formatar_resposta"):
+        r = relatorio["results"][nome]
+        assert r["ops_per_sec"] > 0 and r["p99_us"] >= r["p50_us"] > 0
+    # Parser novo vs o antigo nas mesmas consultas (o número de verdade sai com mais rodadas)
+    assert relatorio["speedup_parser"] > 1
+
+    # Rodada anterior bem mais rápida -> acusa regressão
+    anterior = rodar(["formatar_resposta"], 20)
+    anterior["results"]["formatar_resposta"]["p50_us"] /= 100
+    assert comparar(rodar(["formatar_resposta"], 20), anterior) == ["formatar_resposta"]
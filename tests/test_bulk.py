@@ -0,0 +1,113 @@
+import json
+import threading
+import time
+
+import pytest
+
+from agent import bulk
+
+
+@pytest.fixture
+def busca_fake(monkeypatch):
+    """fetch_oab_tool sem scraping: conta as chamadas e quantas rodaram ao mesmo tempo"""
+    estado = {"chamadas": [], "agora": 0, "maximo": 0}
+    lock = threading.Lock()
+
+    def fetch(nome, uf):
+        with lock:
+            estado["chamadas"].append((nome, uf))
+            estado["agora"] += 1
+            estado["maximo"] = max(estado["maximo"], estado["agora"])
+        time.sleep(0.02)
+        with lock:
+            estado["agora"] -= 1
+        return {"oab": "19051", "nome": nome.upper(), "uf": uf, "categoria": "ADVOGADO",
+                "data_inscricao": None, "situacao": "REGULAR", "error": None}
+
+    monkeypatch.setattr(bulk, "fetch_oab_tool", fetch)
+    return estado
+
+
+def _entrada(tmp_path, total=20):
+    linhas = [json.dumps({"request_id": f"r-{i}", "title": "x", "body": f"Busque Ana Rosa {i} em MS"})
+              for i in range(total)]
+    linhas[3] = ""                          # em branco: pula
+    linhas[5] = "{quebrado"                 # JSON inválido: vira erro
+    linhas[7] = json.dumps("nome: Ana Rosa, uf: MS")
+    caminho = tmp_path / "consultas.jsonl"
+    caminho.write_text("\n".join(linhas) + "\n", encoding="utf-8")
+    return str(caminho)
+
+
+def _saida(caminho):
+    with open(caminho, encoding="utf-8") as f:
+        return [json.loads(linha) for linha in f]
+
+
+def test_roda_em_paralelo_e_grava_jsonl(tmp_path, busca_fake):
+    entrada, saida = _entrada(tmp_path), str(tmp_path / "saida.jsonl")
+    resumo = bulk.rodar(entrada, saida, workers=4, report_every=0)
+
+    registros = _saida(saida)
+    assert sorted(r["line"] for r in registros) == [i for i in range(20) if i != 3]
+    assert resumo["processed"] == 19 and resumo["errors"] == 1 and resumo["next_line"] == 20
+    assert busca_fake["maximo"] > 1
+
+    por_linha = {r["line"]: r for r in registros}
+    assert por_linha[0]["request_id"] == "r-0" and por_linha[0]["parsed"]["uf"] == "MS"
+    assert por_linha[0]["success"] and "19051" in por_linha[0]["response"]
+    assert not por_linha[5]["success"] and "JSONDecodeError" in por_linha[5]["error"]
+    assert por_linha[7]["parsed"] == {"name": "Ana Rosa", "uf": "MS"}
+
+
+def test_continua_de_onde_parou_sem_repetir(tmp_path, busca_fake):
+    entrada, saida = _entrada(tmp_path), str(tmp_path / "saida.jsonl")
+    primeira = bulk.rodar(entrada, saida, workers=3, checkpoint_every=1, report_every=0, limite=6)
+    assert primeira["processed"] == 6
+
+    # Simula uma queda depois de escrever e antes de gravar o checkpoint
+    with open(saida, "a", encoding="utf-8") as f:
+        f.write('{"line": 999, "meio escrito"\n')
+
+    segunda = bulk.rodar(entrada, saida, workers=3, report_every=0)
+    assert segunda["resumed"] and segunda["processed"] == 13
+    assert segunda["total_processed"] == 19
+
+    linhas = sorted(r["line"] for r in _saida(saida))
+    assert linhas == [i for i in range(20) if i != 3]
+    # Linha inválida não chega na busca; as outras 18 foram buscadas uma vez só
+    assert len(busca_fake["chamadas"]) == 18
+
+    # Rodar de novo com tudo feito não faz nada
+    assert bulk.rodar(entrada, saida, report_every=0)["processed"] == 0
+
+
+def test_checkpoint_de_outro_arquivo(tmp_path, busca_fake, capsys):
+    entrada, saida = _entrada(tmp_path, 8), str(tmp_path / "saida.jsonl")
+    assert bulk.main([entrada, "--output", saida, "--report-every", "0"]) == 0
+    assert json.loads(capsys.readouterr().out)["processed"] == 7
+
+    outra = tmp_path / "outra.jsonl"
+    outra.write_text(json.dumps({"query": "Ana Rosa em MS"}) + "\n", encoding="utf-8")
+    assert bulk.main([str(outra), "--output", saida, "--checkpoint", saida + ".ckpt"]) == 2
+    assert bulk.main([str(outra), "--output", saida, "--checkpoint", saida + ".ckpt", "--restart",
+                      "--report-every", "0"]) == 0
+    assert [r["query"] for r in _saida(saida)] == ["Ana Rosa em MS"]
+
+
+def test_nao_apaga_saida_sem_checkpoint(tmp_path, busca_fake, monkeypatch):
+    from api import service
+
+    fechados = []
+    monkeypatch.setattr(service, "fechar", lambda: fechados.append(1))
+    entrada, saida = _entrada(tmp_path, 8), tmp_path / "saida.jsonl"
+    saida.write_text('{"resultado": "de outra rodada"}\n', encoding="utf-8")
+
+    assert bulk.main([entrada, "--output", str(saida), "--report-every", "0"]) == 2
+    assert saida.read_text(encoding="utf-8") == '{"resultado": "de outra rodada"}\n'
+    assert busca_fake["chamadas"] == []
+
+    assert bulk.main([entrada, "--output", str(saida), "--report-every", "0", "--restart"]) == 0
+    assert len(_saida(saida)) == 7
+    # O backend do processo é fechado no fim, dando certo ou não
+    assert fechados == [1, 1]
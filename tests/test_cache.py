@@ -0,0 +1,43 @@
+import time
+
+from api.cache import ResultCache, TTLCache, normalizar_nome
+from scraper.scraper_oab import AdvogadoData
+
+
+def test_normalizar_nome():
+    assert normalizar_nome("  João   SILVA ") == "joao silva"
+    assert normalizar_nome("JOAO silva") == normalizar_nome("joão Silva")
+
+
+def test_cache_lru_descarta_o_mais_antigo():
+    cache = TTLCache(max_size=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")  # "a" fica como mais recente
+    cache.set("c", 3)
+
+    assert cache.get("b") == (False, None)
+    assert cache.get("a") == (True, 1)
+    assert cache.stats()["evictions"] == 1
+
+
+def test_cache_expira():
+    cache = TTLCache(max_size=10, ttl=0.05)
+    cache.set("a", 1)
+    time.sleep(0.1)
+    assert cache.get("a") == (False, None)
+    assert cache.stats()["expired"] == 1
+
+
+def test_result_cache_normaliza_chave_e_ttl_negativo():
+    cache = ResultCache(max_size=10, ttl=60, negative_ttl=0.05)
+    cache.set_resultado("José Souza", "sp", AdvogadoData(oab="123", nome="JOSE SOUZA"))
+    cache.set_resultado("Fulano", "SP", AdvogadoData())
+
+    achou, resultado = cache.get_resultado("JOSE  souza", "SP")
+    assert achou and resultado.oab == "123"
+
+    time.sleep(0.1)
+    assert cache.get_resultado("Fulano", "SP") == (False, None)
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1
@@ -0,0 +1,112 @@
+import glob
+import json
+import os
+import re
+from dataclasses import asdict
+
+import pytest
+
+from scraper.extraction import html_para_texto
+from scraper.scraper_oab import AdvogadoData, extrair_de_html
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "cna")
+PAGINAS = sorted(glob.glob(os.path.join(FIXTURES, "*.html")))
+
+
+@pytest.mark.parametrize("pagina", PAGINAS, ids=os.path.basename)
+def test_paginas_salvas_extraem_o_esperado(pagina):
+    # UF vem do nome do arquivo (resultado_unico_sp.html -> SP)
+    uf = os.path.splitext(pagina)[0].rsplit("_", 1)[-1].upper()
+    with open(pagina, encoding="utf-8") as f:
+        html = f.read()
+    with open(pagina[:-len(".html")] + ".json", encoding="utf-8") as f:
+        esperado = json.load(f)
+    assert [asdict(adv) for adv in extrair_de_html(html, uf)] == esperado
+
+
+def _extrair_como_antes(texto: str, uf: str) -> AdvogadoData:
+    """
+    O OABScraper._extract_data de antes da extração sair do Selenium (sem os logs),
+    recebendo o texto no lugar de resultado_element.text
+    """
+    dados = {}
+    if any(phrase in texto.lower() for phrase in [
+        "nenhum resultado", "não encontrado", "não foram encontrados",
+        "sem resultados", "resultado não encontrado"
+    ]):
+        return AdvogadoData()
+
+    nome_match = re.search(r'Nome:\s*([A-ZÁÇÃÕÊÉÍ\s]+?)(?:\s+Tipo:|$)', texto, re.IGNORECASE)
+    if nome_match:
+        dados['nome'] = nome_match.group(1).strip()
+    tipo_match = re.search(r'Tipo:\s*([A-ZÁÇÃÕÊÉÍ\s]+?)(?:\s+Inscrição:|$)', texto, re.IGNORECASE)
+    if tipo_match:
+        dados['categoria'] = tipo_match.group(1).strip()
+    insc_match = re.search(r'Inscrição:\s*(\d+)', texto, re.IGNORECASE)
+    if insc_match:
+        dados['oab'] = insc_match.group(1).strip()
+    uf_match = re.search(r'UF:\s*([A-Z]{2})', texto, re.IGNORECASE)
+    if uf_match:
+        dados['uf'] = uf_match.group(1).strip().upper()
+
+    if not dados.get('nome') and not dados.get('oab'):
+        for linha in texto.split('\n'):
+            linha = linha.strip()
+            if not linha:
+                continue
+            if re.search(r'\d{4,8}', linha):
+                numeros = re.findall(r'\d{4,8}', linha)
+                if numeros and not dados.get('oab'):
+                    dados['oab'] = numeros[0]
+            if (re.search(r'^[A-ZÁÇÃÕÊÉÍ\s]+$', linha) and
+                    len(linha.split()) >= 2 and
+                    not dados.get('nome')):
+                dados['nome'] = linha.strip()
+
+    if not dados.get('nome') and not dados.get('oab'):
+        nomes_possiveis = re.findall(r'[A-ZÁÇÃÕÊÉÍ]{2,}(?:\s+[A-ZÁÇÃÕÊÉÍ]{2,})+', texto)
+        if nomes_possiveis:
+            dados['nome'] = nomes_possiveis[0].strip()
+        numeros_possiveis = re.findall(r'\b\d{4,8}\b', texto)
+        if numeros_possiveis:
+            dados['oab'] = numeros_possiveis[0]
+
+    return AdvogadoData(
+        oab=dados.get('oab'),
+        nome=dados.get('nome'),
+        uf=dados.get('uf') or uf.upper(),
+        categoria=dados.get('categoria') or 'Advogado',
+        data_inscricao=dados.get('data_inscricao'),
+        situacao=dados.get('situacao') or 'Ativo'
+    )
+
+
+@pytest.mark.parametrize("pagina", PAGINAS, ids=os.path.basename)
+def test_extracao_nova_igual_a_antiga_nas_paginas_salvas(pagina):
+    # A antiga devolvia um advogado só (o primeiro) e AdvogadoData() vazio quando não achava
+    uf = os.path.splitext(pagina)[0].rsplit("_", 1)[-1].upper()
+    with open(pagina, encoding="utf-8") as f:
+        html = f.read()
+    novos = extrair_de_html(html, uf)
+    assert (novos[0] if novos else AdvogadoData()) == _extrair_como_antes(html_para_texto(html), uf)
+
+
+def test_texto_ignora_script_select_e_elementos_escondidos():
+    html = (
+        "<html><head><title>CNA</title></head><body>"
+        "<script>var x = 'Nome: SCRIPT';</script>"
+        "<select><option>SP</option></select>"
+        "<div style='display:none'><div>Nome: ESCONDIDO</div></div>"
+        "<div>Nome: <b>JOÃO</b> SILVA</div><p>Inscrição:&nbsp;123</p>"
+        "</body></html>"
+    )
+    assert html_para_texto(html) == "Nome: JOÃO SILVA\nInscrição: 123"
+
+
+def test_scraper_extrai_do_page_source():
+    from scraper.scraper_oab import OABScraper
+
+    scraper = OABScraper.__new__(OABScraper)
+    with open(PAGINAS[0], encoding="utf-8") as f:
+        assert scraper._extract_data(f.read(), "SP").oab == "123456"
+    assert scraper._extract_all("<html><body>Carregando...</body></html>", "SP") == []
@@ -0,0 +1,37 @@
+from api.fuzzy import FuzzyNameIndex
+from scraper.scraper_oab import AdvogadoData
+
+
+def _indice():
+    indice = FuzzyNameIndex()
+    indice.adicionar(AdvogadoData(oab="19051", nome="ANA CAROLINA GUEDES ROSA CURY", uf="MS"))
+    indice.adicionar(AdvogadoData(oab="1234", nome="JOÃO DA SILVA", uf="SP"))
+    indice.adicionar(AdvogadoData(oab="5678", nome="JOÃO DA SILVA", uf="RJ"))
+    indice.adicionar(AdvogadoData(oab="9999", nome="MARIA SANTOS", uf="SP"))
+    return indice
+
+
+def test_busca_sem_acento_e_com_erro_de_digitacao():
+    indice = _indice()
+    adv, score, _ = indice.buscar("joao da silva", "SP")[0]
+    assert adv.oab == "1234"
+    assert score == 1.0
+
+    adv, score, _ = indice.buscar("Joao da Silv", "SP")[0]
+    assert adv.oab == "1234"
+    assert score > 0.7
+
+
+def test_busca_nome_parcial_e_separada_por_uf():
+    indice = _indice()
+    assert indice.buscar("Ana Cury", "MS")[0][0].oab == "19051"
+    assert indice.buscar("Ana Cury", "SP") == []
+    # Sem UF procura em todas
+    assert {r[0].oab for r in indice.buscar("joao da silva")} == {"1234", "5678"}
+
+
+def test_atualizacao_incremental_troca_o_nome():
+    indice = _indice()
+    indice.adicionar(AdvogadoData(oab="9999", nome="MARIA SANTOS OLIVEIRA", uf="SP"))
+    assert len(indice) == 4
+    assert indice.buscar("maria santos oliveira", "SP")[0][1] == 1.0
@@ -0,0 +1,195 @@
+import threading
+import time
+
+from scraper.hedge import Hedger
+
+
+def _aquecer(hedger, duracao=0.01, vezes=20):
+    for _ in range(vezes):
+        hedger._concluir(time.monotonic() - duracao, False)
+
+
+def test_sem_amostras_nao_faz_hedge():
+    hedger = Hedger(min_samples=5, min_delay=0)
+    assert hedger.atraso() is None
+    assert hedger.executar(lambda t: t.numero) == 1
+    assert hedger.stats()["hedges"] == 0
+    hedger.close()
+
+
+def test_hedge_ganha_e_cancela_a_lenta():
+    hedger = Hedger(percentile=50, budget=1.0, min_samples=5, min_delay=0.01)
+    _aquecer(hedger)
+    liberar = threading.Event()
+    canceladas = []
+
+    def buscar(tentativa):
+        if tentativa.numero == 1:
+            # Primeira "trava" até alguém fechar o driver dela
+            tentativa.ao_cancelar(lambda: (canceladas.append(1), liberar.set()))
+            liberar.wait(5)
+            return "lenta"
+        return "rapida"
+
+    inicio = time.monotonic()
+    assert hedger.executar(buscar) == "rapida"
+    assert time.monotonic() - inicio < 1
+    assert canceladas == [1]
+    stats = hedger.stats()
+    assert stats["hedges"] == 1 and stats["hedge_wins"] == 1 and stats["cancelled"] == 1
+    hedger.close()
+
+
+def test_hedge_que_falha_espera_a_primeira():
+    hedger = Hedger(percentile=50, budget=1.0, min_samples=5, min_delay=0.01)
+    _aquecer(hedger)
+
+    def buscar(tentativa):
+        if tentativa.numero == 2:
+            raise RuntimeError("sem driver livre")
+        time.sleep(0.1)
+        return "primeira"
+
+    assert hedger.executar(buscar) == "primeira"
+    assert hedger.stats()["hedge_wins"] == 0
+    hedger.close()
+
+
+def test_orcamento_limita_hedges():
+    hedger = Hedger(percentile=50, budget=0.1, min_samples=5, min_delay=0.01, window=20)
+    _aquecer(hedger, vezes=20)
+    tentativas = []
+
+    def buscar(tentativa):
+        tentativas.append(tentativa.numero)
+        time.sleep(0.05)
+        return tentativa.numero
+
+    for _ in range(5):
+        hedger.executar(buscar)
+    # 10% de 20 buscas recentes: só cabem 2 hedges
+    assert tentativas.count(2) == 2
+    assert hedger.stats()["denied"] == 3
+    hedger.close()
+
+
+def test_backend_descarta_driver_da_tentativa_perdedora():
+    from scraper.backend import ScraperBackend
+    from scraper.pool import DriverPool
+    from scraper.scraper_oab import AdvogadoData
+
+    criados = []
+
+    class ScraperTravado:
+        def __init__(self):
+            self.fechado = threading.Event()
+            self.travar = not criados
+            criados.append(self)
+
+        def is_alive(self):
+            return not self.fechado.is_set()
+
+        def close(self):
+            self.fechado.set()
+
+        def search_advogados(self, name, uf, insc=None, max_paginas=1):
+            if self.travar:
+                # Como um driver.get pendurado: só sai quando o driver é fechado
+                self.fechado.wait(5)
+                self.ultimo_estado = "erro"
+                return []
+            self.ultimo_estado = "resultado"
+            return [AdvogadoData(oab="1", nome=name, uf=uf)]
+
+    hedger = Hedger(percentile=50, budget=1.0, min_samples=5, min_delay=0.01)
+    _aquecer(hedger)
+    pool = DriverPool(factory=ScraperTravado, min_size=0, max_size=2)
+    backend = ScraperBackend("selenium", pool, hedger=hedger)
+
+    assert backend.search_advogado("Ana", "SP").oab == "1"
+    assert criados[0].fechado.is_set()
+    # O driver travado volta pro pool só pra ser descartado
+    for _ in range(50):
+        if pool.stats()["discarded"] == 1:
+            break
+        time.sleep(0.01)
+    assert pool.stats()["discarded"] == 1
+    backend.close()
+
+
+def test_hedge_precisa_de_vaga_no_limitador():
+    from scraper.backend import ScraperBackend
+    from scraper.limiter import UpstreamLimiter
+    from scraper.pool import DriverPool
+    from scraper.scraper_oab import AdvogadoData
+
+    criados = []
+
+    class ScraperLento:
+        def __init__(self):
+            self.fechado = threading.Event()
+            self.travar = not criados
+            criados.append(self)
+
+        def is_alive(self):
+            return not self.fechado.is_set()
+
+        def close(self):
+            self.fechado.set()
+
+        def search_advogados(self, name, uf, insc=None, max_paginas=1):
+            if self.travar:
+                self.fechado.wait(0.2)
+            self.ultimo_estado = "resultado"
+            return [AdvogadoData(oab=str(len(criados)), nome=name, uf=uf)]
+
+    def rodar(limite):
+        criados.clear()
+        hedger = Hedger(percentile=50, budget=1.0, min_samples=5, min_delay=0.01)
+        _aquecer(hedger)
+        limiter = UpstreamLimiter(rate=0, max_limit=limite, initial_limit=limite, cooldown=0)
+        backend = ScraperBackend("selenium", DriverPool(factory=ScraperLento, min_size=0, max_size=2),
+                                 hedger=hedger, limiter=limiter)
+        assert backend.search_advogado("Ana", "SP").oab
+        stats = limiter.stats()
+        backend.close()
+        return stats
+
+    # Limite 1: a primeira tentativa já ocupa a vaga, então o hedge não sai
+    stats = rodar(1)
+    assert len(criados) == 1 and stats["in_flight"] == 0 and stats["rejected"] == 0
+    # Com vaga sobrando o hedge sai, e a tentativa derrubada não conta como erro do site
+    stats = rodar(2)
+    assert len(criados) == 2 and stats["in_flight"] == 0 and stats["decreases"] == 0
+
+
+def test_buscas_rapidas_entram_nas_amostras():
+    hedger = Hedger(percentile=50, budget=1.0, min_samples=3, min_delay=0.05)
+    _aquecer(hedger, duracao=0.01, vezes=3)
+    atraso = hedger.atraso()
+    for _ in range(20):
+        assert hedger.executar(lambda t: t.numero) == 1
+    stats = hedger.stats()
+    # As 20 que terminaram antes do atraso também contam, senão o percentil só veria as lentas
+    assert stats["requests"] == 23 and stats["samples"] == 23 and stats["hedges"] == 0
+    assert hedger.atraso() == atraso
+    hedger.close()
+
+
+def test_hedge_que_nem_saiu_nao_conta():
+    hedger = Hedger(percentile=50, budget=1.0, min_samples=5, min_delay=0.01)
+    _aquecer(hedger)
+
+    def buscar(tentativa):
+        if tentativa.numero == 2:
+            # Como o backend sem driver livre: desiste antes de ir no site
+            tentativa.desistir()
+            raise RuntimeError("sem driver livre")
+        time.sleep(0.05)
+        return "primeira"
+
+    assert hedger.executar(buscar) == "primeira"
+    assert hedger.stats()["hedges"] == 0
+    # E não ocupa o orçamento: a janela segue sem nenhum hedge
+    assert not any(hedger._janela)
+    hedger.close()
@@ -0,0 +1,127 @@
+import time
+
+import pytest
+
+from api.jobs import JobRunner, JobStore, DONE, ERROR, QUEUED
+from scraper.scraper_oab import AdvogadoData
+
+
+def _esperar(store, job_id, status, timeout=2.0):
+    fim = time.monotonic() + timeout
+    while time.monotonic() < fim:
+        job = store.get(job_id)
+        if job["status"] == status:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"Job {job_id} não chegou em {status}: {store.get(job_id)}")
+
+
+def test_job_processa_em_background(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    runner = JobRunner(store, processar=lambda name, uf: AdvogadoData(oab="123", nome=name.upper(), uf=uf))
+    runner.start()
+
+    job = runner.submit("Ana Rosa", "MS")
+    assert job["status"] == QUEUED
+    job = _esperar(store, job["id"], DONE)
+    assert job["result"]["oab"] == "123"
+    runner.stop()
+
+
+def test_job_com_erro(tmp_path):
+    def quebra(name, uf):
+        raise RuntimeError("CNA fora do ar")
+
+    store = JobStore(str(tmp_path / "jobs.db"))
+    runner = JobRunner(store, processar=quebra)
+    runner.start()
+    job = _esperar(store, runner.submit("Ana", "MS")["id"], ERROR)
+    assert "CNA fora do ar" in job["error"]
+    runner.stop()
+
+
+def test_job_pendente_volta_depois_do_restart(tmp_path):
+    caminho = str(tmp_path / "jobs.db")
+    # Job criado mas o processo "caiu" antes de processar
+    store = JobStore(caminho)
+    job_id = store.criar("Ana Rosa", "MS")["id"]
+    store.close()
+
+    store = JobStore(caminho)
+    runner = JobRunner(store, processar=lambda name, uf: AdvogadoData(oab="999"))
+    runner.start()
+    assert _esperar(store, job_id, DONE)["result"]["oab"] == "999"
+    runner.stop()
+
+
+def test_callback_so_pra_endereco_publico():
+    from api.jobs import CallbackInvalido, validar_callback
+
+    validar_callback("https://8.8.8.8/retorno")
+    for url in ("ftp://8.8.8.8/x", "http:///sem-host", "http://127.0.0.1:8000/jobs", "http://localhost/x",
+                "http://169.254.169.254/latest/meta-data", "http://10.0.0.5/", "http://192.168.0.1/",
+                "http://[::1]/", "http://0.0.0.0/"):
+        with pytest.raises(CallbackInvalido):
+            validar_callback(url)
+
+    # Com a lista de hosts liberados, só eles (mesmo na rede interna)
+    validar_callback("http://LocalHost:9000/retorno", ("localhost",))
+    with pytest.raises(CallbackInvalido):
+        validar_callback("https://8.8.8.8/retorno", ("localhost",))
+
+
+def test_callback_interno_nao_e_chamado(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    runner = JobRunner(store, processar=lambda name, uf: AdvogadoData(oab="123"))
+    chamadas = []
+    runner._session.post = lambda *args, **kwargs: chamadas.append(args)
+    runner.start()
+    # Passou direto pelo store (sem o 400 do POST /jobs): na hora de chamar confere de novo
+    job = _esperar(store, runner.submit("Ana", "MS", "http://127.0.0.1:8000/cache")["id"], DONE)
+    for _ in range(100):
+        if store.get(job["id"])["callback_status"] is not None:
+            break
+        time.sleep(0.01)
+    assert store.get(job["id"])["callback_status"] == 0 and chamadas == []
+    runner.stop()
+
+
+def test_stop_nao_processa_a_fila_e_espera_os_workers(tmp_path):
+    import threading
+
+    liberar = threading.Event()
+    rodando = threading.Event()
+    processados = []
+
+    def demorado(name, uf):
+        rodando.set()
+        liberar.wait(2)
+        processados.append(name)
+        return AdvogadoData(oab="123")
+
+    caminho = str(tmp_path / "jobs.db")
+    store = JobStore(caminho)
+    runner = JobRunner(store, processar=demorado, workers=1)
+    runner.start()
+    primeiro = runner.submit("Ana", "MS")["id"]
+    assert rodando.wait(2)
+    fila = [runner.submit(f"Fila {i}", "MS")["id"] for i in range(5)]
+
+    # Worker preso no job: o stop desiste no timeout e avisa que o store não pode fechar
+    assert runner.stop(timeout=0.05) is False
+    liberar.set()
+    assert runner.stop() is True
+    store.close()
+
+    # Terminou só o que já estava rodando; a fila ficou pro próximo start
+    assert processados == ["Ana"]
+    store = JobStore(caminho)
+    assert store.get(primeiro)["status"] == DONE
+    assert [store.get(job_id)["status"] for job_id in fila] == [QUEUED] * 5
+
+    runner = JobRunner(store, processar=lambda name, uf: AdvogadoData(oab="999"), workers=1)
+    runner.start()
+    for job_id in fila:
+        assert _esperar(store, job_id, DONE)["result"]["oab"] == "999"
+    assert runner.stop() is True
+    store.close()
@@ -0,0 +1,125 @@
+import threading
+import time
+
+import pytest
+
+from scraper.backend import ScraperBackend
+from scraper.http_scraper import HttpScraperError
+from scraper.limiter import UpstreamLimiter, UpstreamBusy, OK, EMPTY, TIMEOUT, LOCAL
+from scraper.pool import PoolTimeout
+
+
+def test_limite_sobe_com_sucesso_e_cai_com_timeout():
+    limiter = UpstreamLimiter(rate=0, min_limit=1, max_limit=8, initial_limit=2, cooldown=0)
+    for _ in range(20):
+        # Usa o limite todo, senão não tem por que aumentar
+        for _ in range(int(limiter.limit)):
+            limiter.acquire()
+        for _ in range(int(limiter.stats()["in_flight"])):
+            limiter.release(OK)
+    assert limiter.stats()["limit"] > 2
+
+    antes = limiter.limit
+    limiter.acquire()
+    limiter.release(TIMEOUT)
+    assert limiter.limit == pytest.approx(max(1, antes / 2))
+    assert limiter.stats()["decreases"] == 1
+
+
+def test_nao_aumenta_se_nao_usou_o_limite():
+    limiter = UpstreamLimiter(rate=0, min_limit=1, max_limit=8, initial_limit=4)
+    for _ in range(50):
+        limiter.acquire()
+        limiter.release(OK)
+    assert limiter.stats()["limit"] == 4
+
+
+def test_varias_falhas_juntas_reduzem_uma_vez_so():
+    limiter = UpstreamLimiter(rate=0, max_limit=8, initial_limit=8, cooldown=60)
+    for _ in range(4):
+        limiter.acquire()
+    for _ in range(4):
+        limiter.release(TIMEOUT)
+    assert limiter.stats()["limit"] == 4
+
+
+def test_muita_pagina_vazia_vira_sinal_de_bloqueio():
+    limiter = UpstreamLimiter(rate=0, max_limit=8, initial_limit=8, cooldown=0, empty_threshold=0.5)
+    limiter.acquire()
+    limiter.release(EMPTY)
+    assert limiter.stats()["limit"] == 8  # um "não encontrado" é normal
+    for _ in range(10):
+        limiter.acquire()
+        limiter.release(EMPTY)
+    assert limiter.stats()["limit"] < 8
+
+
+def test_concorrencia_respeita_o_limite_e_fila_expira():
+    limiter = UpstreamLimiter(rate=0, max_limit=2, initial_limit=2, acquire_timeout=0.1)
+    limiter.acquire()
+    limiter.acquire()
+    with pytest.raises(UpstreamBusy):
+        limiter.acquire()
+    assert limiter.stats()["rejected"] == 1
+
+    # Quem está na fila entra assim que uma vaga é devolvida
+    entrou = threading.Event()
+    t = threading.Thread(target=lambda: (limiter.acquire(timeout=2), entrou.set()))
+    t.start()
+    time.sleep(0.05)
+    assert limiter.stats()["queued"] == 1
+    limiter.release(OK)
+    assert entrou.wait(1)
+    t.join()
+
+
+def test_token_bucket_limita_a_vazao():
+    limiter = UpstreamLimiter(rate=20, burst=1, max_limit=8, initial_limit=8)
+    inicio = time.monotonic()
+    for _ in range(5):
+        limiter.acquire()
+        limiter.release(OK)
+    # 1 de rajada + 4 tokens a 20/s = pelo menos 0.2s
+    assert time.monotonic() - inicio >= 0.18
+    assert limiter.stats()["wait_max_seconds"] > 0
+
+
+class _PoolQuebrado:
+    max_size = 1
+
+    def __init__(self, erro):
+        self.erro = erro
+
+    def acquire(self, timeout=None):
+        raise self.erro
+
+    def close(self):
+        pass
+
+
+class _HttpQuebrado:
+    def search_advogados(self, *args):
+        raise HttpScraperError("Erro HTTP no CNA: 503")
+
+    def close(self):
+        pass
+
+
+def test_falha_local_nao_reduz_o_limite():
+    limiter = UpstreamLimiter(rate=0, max_limit=8, initial_limit=4, cooldown=0)
+    limiter.acquire()
+    limiter.release(LOCAL)
+    assert limiter.stats()["limit"] == 4 and limiter.stats()["in_flight"] == 0
+
+    # Pool sem driver livre e Chrome/chromedriver que não abre são problema nosso
+    for erro in (PoolTimeout("sem driver"), RuntimeError("Unable to obtain driver for chrome")):
+        backend = ScraperBackend("selenium", _PoolQuebrado(erro), limiter=limiter)
+        with pytest.raises(type(erro)):
+            backend.search_advogados("Ana Rosa", "MS")
+    assert limiter.stats()["limit"] == 4 and limiter.stats()["decreases"] == 0
+
+    # Erro que veio do CNA continua reduzindo
+    backend = ScraperBackend("http", _PoolQuebrado(PoolTimeout()), http=_HttpQuebrado(), limiter=limiter)
+    with pytest.raises(HttpScraperError):
+        backend.search_advogados("Ana Rosa", "MS")
+    assert limiter.stats()["limit"] == 2
@@ -0,0 +1,285 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from fastapi.testclient import TestClient
+
+from agent import agent_llm
+from agent.llm_cache import LLMCache
+from agent.llm_client import ClienteLLM, ErroLLM
+from api.main import app
+from scraper.scraper_oab import AdvogadoData
+
+TOKENS = ["Ana ", "Rosa ", "está ", "regular."]
+
+
+@pytest.fixture
+def cloudflare():
+    """Servidor local no lugar da API da Cloudflare (com e sem stream)"""
+    estado = {"conexoes": set(), "atraso": 0.0, "auth": [], "chamadas": 0, "corpo": None}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            estado["conexoes"].add(self.client_address)
+            estado["auth"].append(self.headers.get("Authorization"))
+            estado["chamadas"] += 1
+            corpo = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            time.sleep(estado["atraso"])
+            if not corpo.get("stream"):
+                resposta = estado["corpo"] or json.dumps({"result": {"response": "".join(TOKENS)}, "success": True}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(resposta)))
+                self.end_headers()
+                self.wfile.write(resposta)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            for token in TOKENS:
+                self.wfile.write(f"data: {json.dumps({'response': token})}\n\n".encode())
+                self.wfile.flush()
+                time.sleep(estado["atraso"])
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+            self.close_connection = True
+
+        def log_message(self, *args):
+            pass
+
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    estado["url"] = f"http://127.0.0.1:{servidor.server_address[1]}/client/v4"
+    yield estado
+    servidor.shutdown()
+
+
+def test_completar_reaproveita_conexao(cloudflare):
+    cliente = ClienteLLM("conta", "token", base_url=cloudflare["url"], timeout=5)
+    try:
+        assert cliente.completar("oi") == "Ana Rosa está regular."
+        assert cliente.completar("oi de novo") == "Ana Rosa está regular."
+        assert len(cloudflare["conexoes"]) == 1
+        assert cloudflare["auth"][0] == "Bearer token"
+    finally:
+        cliente.close()
+
+
+def test_stream_e_prazo(cloudflare):
+    cliente = ClienteLLM("conta", "token", base_url=cloudflare["url"], timeout=5)
+
+    async def rodar():
+        tokens = [t async for t in cliente.stream("oi")]
+        assert tokens == TOKENS
+        assert await cliente.completar_async("oi") == "".join(TOKENS)
+
+        cloudflare["atraso"] = 0.3
+        with pytest.raises(ErroLLM):
+            await cliente.completar_async("oi", timeout=0.1)
+        with pytest.raises(ErroLLM):
+            async for _ in cliente.stream("oi", timeout=0.5):
+                pass
+        await cliente.aclose()
+
+    asyncio.run(rodar())
+
+
+@pytest.fixture
+def agente_com_llm(cloudflare, monkeypatch):
+    import api.main as main
+
+    agente = agent_llm.AgenteLLM(token="token", account_id="conta", base_url=cloudflare["url"])
+    monkeypatch.setattr(agent_llm, "agente", agente)
+    monkeypatch.setattr(agent_llm, "cache_llm", LLMCache())
+    main.cache.clear()
+    main.cache.set_resultado("Ana Rosa", "MS", AdvogadoData(oab="19051", nome="ANA ROSA", uf="MS"))
+    yield agente
+    main.cache.clear()
+    agente.cliente.close()
+
+
+def _eventos(texto):
+    eventos = []
+    for bloco in texto.strip().split("\n\n"):
+        linhas = dict(linha.split(": ", 1) for linha in bloco.splitlines())
+        eventos.append((linhas["event"], json.loads(linhas["data"])))
+    return eventos
+
+
+def test_agent_responde_json_com_llm(agente_com_llm):
+    client = TestClient(app)
+    resp = client.post("/agent", json={"query": "nome: Ana Rosa, uf: MS"})
+    assert resp.status_code == 200
+    assert resp.json() == {"response": "Ana Rosa está regular.", "success": True, "error": None, "source": "llm",
+                           "upgrade_id": None}
+
+
+def test_agent_stream_sse(agente_com_llm):
+    client = TestClient(app)
+    resp = client.post("/agent", json={"query": "nome: Ana Rosa, uf: MS", "stream": True})
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/event-stream")
+
+    eventos = _eventos(resp.text)
+    assert eventos[0][0] == "result" and eventos[0][1]["data"]["oab"] == "19051"
+    assert [corpo["text"] for nome, corpo in eventos if nome == "token"] == TOKENS
+    assert eventos[-1] == ("done", {"response": "".join(TOKENS), "success": True, "source": "llm"})
+
+
+def test_agent_stream_sem_llm_usa_resposta_formatada(monkeypatch):
+    import api.main as main
+
+    monkeypatch.setattr(agent_llm, "agente", agent_llm.AgenteLLM(token="", account_id=""))
+    main.cache.clear()
+    main.cache.set_resultado("Ana Rosa", "MS", AdvogadoData(oab="19051", nome="ANA ROSA", uf="MS"))
+    try:
+        client = TestClient(app)
+        resp = client.post("/agent", json={"query": "nome: Ana Rosa, uf: MS"},
+                           headers={"Accept": "text/event-stream"})
+        eventos = _eventos(resp.text)
+        assert eventos[-1][0] == "done" and eventos[-1][1]["source"] == "parser"
+        assert "19051" in eventos[-1][1]["response"]
+    finally:
+        main.cache.clear()
+
+
+def test_cache_do_llm_pela_consulta_interpretada(agente_com_llm, cloudflare):
+    client = TestClient(app)
+    primeira = client.post("/agent", json={"query": "nome: Ana Rosa, uf: MS"}).json()
+    # Outra forma de perguntar a mesma coisa: mesmo (nome, UF) e mesmos dados
+    segunda = client.post("/agent", json={"query": "NOME: ana rosa,uf: ms"}).json()
+    assert primeira["response"] == segunda["response"]
+    assert segunda["source"] == "llm_cache"
+    assert cloudflare["chamadas"] == 1
+
+    resp = client.post("/agent", json={"query": "nome: Ana Rosa, uf: MS", "stream": True})
+    assert _eventos(resp.text)[-1][1]["source"] == "llm_cache"
+    assert cloudflare["chamadas"] == 1
+    assert agent_llm.cache_llm.stats()["hit_rate"] > 0.5
+
+
+def test_cache_do_llm_chave_canonica_e_disco(tmp_path):
+    caminho = str(tmp_path / "llm.json")
+    dados = {"oab": "19051", "nome": "ANA ROSA", "uf": "MS", "error": None}
+    cache = LLMCache(path=caminho)
+    cache.set_resposta({"name": "Ana Rosa", "uf": "ms"}, dados, "resposta")
+    # Acento, caixa e ordem dos campos não mudam a chave
+    assert cache.get_resposta({"uf": "MS", "name": "ANA  rosa"}, dict(reversed(list(dados.items())))) == "resposta"
+    assert cache.get_resposta({"name": "Ana Rosa", "uf": "MS"}, {**dados, "situacao": "REGULAR"}) is None
+    # Erro na busca não vai pro cache
+    cache.set_resposta({"name": "Joao", "uf": "SP"}, {"error": "timeout"}, "texto")
+    assert len(cache) == 1
+
+    cache.flush()
+    recarregado = LLMCache(path=caminho)
+    assert recarregado.get_resposta({"name": "Ana Rosa", "uf": "MS"}, dados) == "resposta"
+    recarregado.clear()
+    recarregado.flush()
+    assert len(LLMCache(path=caminho)) == 0
+
+
+def test_cache_do_llm_grava_depois_e_junta(tmp_path, monkeypatch):
+    caminho = tmp_path / "llm.json"
+    cache = LLMCache(path=str(caminho), flush_interval=0.1)
+    gravacoes = []
+    salvar = cache.salvar
+    monkeypatch.setattr(cache, "salvar", lambda: (gravacoes.append(1), salvar()))
+
+    for i in range(20):
+        cache.set_resposta({"name": f"Ana {i}", "uf": "MS"}, {"oab": str(i)}, f"resposta {i}")
+    # Quem guardou a resposta não espera o disco
+    assert not caminho.exists() and gravacoes == []
+
+    for _ in range(100):
+        if gravacoes:
+            break
+        time.sleep(0.01)
+    time.sleep(0.05)
+    assert gravacoes == [1]
+    assert len(LLMCache(path=str(caminho))) == 20
+
+
+def test_orcamento_estourado_devolve_formatada_e_melhora_depois(agente_com_llm, cloudflare):
+    from api import metrics
+
+    cloudflare["atraso"] = 0.3
+    antes = metrics.agent_path_total.get("fallback")
+
+    async def rodar():
+        inicio = time.monotonic()
+        resultado = await agent_llm.run_agent_async("nome: Ana Rosa, uf: MS", budget=0.05)
+        assert time.monotonic() - inicio < 0.3
+        assert resultado["source"] == "fallback" and "19051" in resultado["response"]
+        assert agent_llm.estado_melhoria(resultado["upgrade_id"])["status"] == "pending"
+        # O LLM termina sozinho e a versão dele fica disponível
+        await agent_llm._melhorias[resultado["upgrade_id"]]
+        assert agent_llm.estado_melhoria(resultado["upgrade_id"]) == {
+            "status": "done", "response": "Ana Rosa está regular."}
+        await agente_com_llm.cliente.aclose()
+
+    asyncio.run(rodar())
+    assert metrics.agent_path_total.get("fallback") == antes + 1
+
+
+def test_orcamento_no_stream_manda_fallback_e_depois_tokens(agente_com_llm, cloudflare):
+    cloudflare["atraso"] = 0.2
+    client = TestClient(app)
+    resp = client.post("/agent", json={"query": "nome: Ana Rosa, uf: MS", "stream": True, "budget": 0.05})
+    eventos = _eventos(resp.text)
+    nomes = [nome for nome, _ in eventos]
+    assert nomes[:2] == ["result", "fallback"] and "19051" in eventos[1][1]["response"]
+    assert [corpo["text"] for nome, corpo in eventos if nome == "token"] == TOKENS
+    assert eventos[-1][1]["source"] == "llm"
+
+
+def test_orcamento_sem_melhoria(agente_com_llm, cloudflare, monkeypatch):
+    monkeypatch.setenv("OAB_AGENT_UPGRADE", "0")
+    cloudflare["atraso"] = 0.3
+    client = TestClient(app)
+    resp = client.post("/agent", json={"query": "nome: Ana Rosa, uf: MS", "budget": 0.05})
+    assert resp.json()["source"] == "fallback" and resp.json()["upgrade_id"] is None
+    assert client.get("/agent/upgrade/desconhecido").status_code == 404
+
+    inicio = time.monotonic()
+    assert "19051" in agent_llm.run_agent("nome: Ana Rosa, uf: MS", budget=0.05)
+    assert time.monotonic() - inicio < 0.3
+
+
+@pytest.mark.parametrize("corpo", [b"<html>erro</html>", b'{"result": null, "success": false}', b"[1, 2]"])
+def test_resposta_fora_do_formato_vira_erro_llm(cloudflare, agente_com_llm, corpo):
+    cloudflare["corpo"] = corpo
+    cliente = ClienteLLM("conta", "token", base_url=cloudflare["url"], timeout=5)
+    try:
+        with pytest.raises(ErroLLM):
+            cliente.completar("oi")
+    finally:
+        cliente.close()
+
+    # O /agent cai na resposta formatada em vez de 500
+    resp = TestClient(app).post("/agent", json={"query": "nome: Ana Rosa, uf: MS"})
+    assert resp.status_code == 200
+    assert resp.json()["source"] == "fallback" and "19051" in resp.json()["response"]
+
+
+@pytest.mark.parametrize("budget", [None, 0.1])
+def test_stream_que_quebra_fecha_o_sse(agente_com_llm, monkeypatch, budget):
+    async def stream_quebrado(prompt, timeout=None):
+        await asyncio.sleep(0.2 if budget else 0)
+        yield "Ana "
+        raise RuntimeError("conexão caiu no meio")
+
+    monkeypatch.setattr(agente_com_llm.cliente, "stream", stream_quebrado)
+    corpo = {"query": "nome: Ana Rosa, uf: MS", "stream": True}
+    if budget:
+        # Depois do fallback o erro também tem que encerrar o stream
+        corpo["budget"] = budget
+    resp = TestClient(app).post("/agent", json=corpo)
+    eventos = _eventos(resp.text)
+    assert eventos[-1][0] == "done" and eventos[-1][1]["source"] == "fallback"
+    assert "19051" in eventos[-1][1]["response"]
@@ -0,0 +1,34 @@
+from api.metrics import MetricsRegistry
+
+
+def test_histograma_acumula_buckets():
+    registry = MetricsRegistry()
+    hist = registry.histogram("etapa_seconds", "Duração", ["stage"], buckets=(0.1, 1.0))
+    hist.observe("get", valor=0.05)
+    hist.observe("get", valor=0.5)
+    hist.observe("get", valor=3)
+
+    linhas = registry.render().splitlines()
+    assert 'etapa_seconds_bucket{stage="get",le="0.1"} 1' in linhas
+    assert 'etapa_seconds_bucket{stage="get",le="1"} 2' in linhas
+    assert 'etapa_seconds_bucket{stage="get",le="+Inf"} 3' in linhas
+    assert 'etapa_seconds_sum{stage="get"} 3.55' in linhas
+    assert 'etapa_seconds_count{stage="get"} 3' in linhas
+    assert hist.count("get") == 3
+
+
+def test_counter_e_gauge_com_labels():
+    registry = MetricsRegistry()
+    total = registry.counter("buscas_total", "Buscas", ["uf", "outcome"])
+    total.inc("SP", "success")
+    total.inc("SP", "success")
+    total.inc("RJ", "error")
+    andamento = registry.gauge("em_andamento", "Agora")
+    andamento.inc()
+    andamento.dec()
+
+    texto = registry.render()
+    assert "# TYPE buscas_total counter" in texto
+    assert 'buscas_total{uf="SP",outcome="success"} 2' in texto
+    assert 'buscas_total{uf="RJ",outcome="error"} 1' in texto
+    assert "em_andamento 0" in texto
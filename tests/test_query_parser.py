@@ -0,0 +1,67 @@
+from agent.agent_llm import parse_many, parse_oab_query
+from agent.query_parser import UFS_BRASIL, QueryParser, parser
+from benchmarks.corpus import MODELOS, NOMES
+
+
+def test_todos_os_modelos_do_corpus():
+    for modelo in MODELOS:
+        for nome in NOMES:
+            for sigla, estado in UFS_BRASIL.items():
+                consulta = modelo.format(nome=nome, uf=sigla, estado=estado)
+                assert parser.parse(consulta) == {"name": nome, "uf": sigla}, consulta
+
+
+def test_sigla_dentro_do_nome_nao_vira_uf():
+    # O parser antigo achava "SP"/"MA"/"SE" como substring em qualquer lugar
+    assert parse_oab_query("Busque o advogado Márcio Araújo do Roraima") == {"name": "Márcio Araújo", "uf": "RR"}
+    assert parse_oab_query("Consulte a Dra. Maria Sespedes") == {"name": "Maria Sespedes", "uf": "SP"}
+    assert parse_oab_query("O João Silva em SP") == {"name": "João Silva", "uf": "SP"}
+    # "se" no meio da frase é palavra; no fim, depois de "em", é Sergipe
+    assert parse_oab_query("Veja se Ana Rosa tem OAB em PA")["uf"] == "PA"
+    assert parse_oab_query("ana rosa em se") == {"name": "Ana Rosa", "uf": "SE"}
+
+
+def test_formatos_fora_do_caminho_rapido():
+    assert parse_oab_query("Ana Rosa/MS") == {"name": "Ana Rosa", "uf": "MS"}
+    assert parse_oab_query("Ana Rosa - ms") == {"name": "Ana Rosa", "uf": "MS"}
+    assert parse_oab_query("Quero saber se a Dra. Ana Paula Costa de Pernambuco é regular") == {
+        "name": "Ana Paula Costa", "uf": "PE"}
+    assert parse_oab_query("BuSqUe Ana Rosa em MS") == {"name": "Ana Rosa", "uf": "MS"}
+    assert parse_oab_query("Paulo Sérgio de Almeida, Goiás") == {"name": "Paulo Sérgio de Almeida", "uf": "GO"}
+
+
+def test_padroes_quando_nao_acha():
+    assert parse_oab_query("busque joao silva") == {"name": "Joao Silva", "uf": "SP"}
+    assert parse_oab_query("") == {"name": "NOME_NAO_ENCONTRADO", "uf": "SP"}
+    assert parse_oab_query(None) == {"name": "NOME_NAO_ENCONTRADO", "uf": "SP"}
+
+
+def test_parse_many():
+    consultas = ["Ana Rosa em MS", "Consulte Maria Santos do Rio de Janeiro", "Ana Rosa em MS"]
+    resultado = parse_many(consultas)
+    assert resultado == [parse_oab_query(c) for c in consultas]
+    # Cada item é um dict próprio, mesmo com consulta repetida no lote
+    resultado[0]["uf"] = "XX"
+    assert resultado[2]["uf"] == "MS"
+    assert QueryParser().parse_many([]) == []
+
+
+def test_sigla_no_fim_em_qualquer_caixa():
+    assert parse_oab_query("joao silva rs") == {"name": "Joao Silva", "uf": "RS"}
+    assert parse_oab_query("advogado joão silva mg") == {"name": "João Silva", "uf": "MG"}
+    assert parse_oab_query("busque maria santos ba?") == {"name": "Maria Santos", "uf": "BA"}
+
+
+def test_nome_de_estado_sem_preposicao_e_parte_do_nome():
+    assert parse_oab_query("Busque advogado Tocantins Silva") == {"name": "Tocantins Silva", "uf": "SP"}
+    assert parse_oab_query("Busque a advogada Maria Acre") == {"name": "Maria Acre", "uf": "SP"}
+    assert parse_oab_query("Busque Goiás Silva em SP") == {"name": "Goiás Silva", "uf": "SP"}
+    assert parse_oab_query("Busque a advogada Maria do Acre") == {"name": "Maria", "uf": "AC"}
+
+
+def test_sigla_minuscula_no_nome_nao_vira_uf():
+    # Sobrenome com cara de sigla só vira UF em maiúscula ou marcado ("em se", "uf: ms")
+    assert parse_oab_query("Dados do advogado Carlos Pa") == {"name": "Carlos Pa", "uf": "SP"}
+    assert parse_oab_query("Dados do advogado Carlos PA") == {"name": "Carlos", "uf": "PA"}
+    assert parse_oab_query("Dados do advogado Carlos Pa em MA") == {"name": "Carlos Pa", "uf": "MA"}
+    assert parse_oab_query("nome: Ana Rosa, uf: ms") == {"name": "Ana Rosa", "uf": "MS"}
@@ -0,0 +1,31 @@
+from api.registry import AdvogadoRegistry
+from scraper.scraper_oab import AdvogadoData
+
+
+def test_registry_salva_e_busca(tmp_path):
+    registry = AdvogadoRegistry(str(tmp_path / "advogados.db"))
+    salvos = registry.salvar([
+        AdvogadoData(oab="19051", nome="ANA CAROLINA CURY", uf="MS", categoria="ADVOGADA", situacao="Ativo"),
+        AdvogadoData(),  # sem OAB é ignorado
+    ])
+    assert salvos == 1
+
+    adv, atualizado_em = registry.get("ms", "19051")
+    assert adv.nome == "ANA CAROLINA CURY"
+    assert atualizado_em > 0
+    assert registry.get("SP", "19051") is None
+
+    # Busca pelo nome ignora acento e caixa
+    assert registry.buscar_nome("Ána Carolina  cury", "MS")[0][0].oab == "19051"
+
+
+def test_registry_atualiza_e_persiste(tmp_path):
+    caminho = str(tmp_path / "advogados.db")
+    registry = AdvogadoRegistry(caminho)
+    registry.salvar([AdvogadoData(oab="1", nome="JOSE", uf="SP", situacao="Ativo")])
+    registry.salvar([AdvogadoData(oab="1", nome="JOSE", uf="SP", situacao="Cancelado")])
+    registry.close()
+
+    registry = AdvogadoRegistry(caminho)
+    assert registry.contar() == 1
+    assert registry.get("SP", "1")[0].situacao == "Cancelado"
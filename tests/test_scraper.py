@@ -0,0 +1,319 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+import pytest
+
+from scraper.pool import DriverPool, PoolTimeout
+
+
+class FakeScraper:
+    """Scraper de mentira pra testar o pool sem abrir o Chrome"""
+    def __init__(self):
+        self.fechado = False
+
+    def is_alive(self):
+        return not self.fechado
+
+    def close(self):
+        self.fechado = True
+
+
+def test_pool_reutiliza_driver():
+    pool = DriverPool(factory=FakeScraper, min_size=1, max_size=2)
+    pool.start()
+    assert pool.stats()["idle"] == 1
+
+    with pool.lease() as primeiro:
+        pass
+    with pool.lease() as segundo:
+        pass
+
+    # Deve ser o mesmo navegador, sem criar outro
+    assert primeiro is segundo
+    assert pool.stats()["created"] == 1
+    pool.close()
+    assert primeiro.fechado
+
+
+def test_pool_respeita_max_size_e_timeout():
+    pool = DriverPool(factory=FakeScraper, min_size=0, max_size=1, lease_timeout=0.05)
+    scraper = pool.acquire()
+    with pytest.raises(PoolTimeout):
+        pool.acquire()
+    pool.release(scraper)
+
+    # Depois de devolver, outra thread consegue pegar
+    pegou = []
+    t = threading.Thread(target=lambda: pegou.append(pool.acquire(timeout=1)))
+    t.start()
+    t.join()
+    assert pegou == [scraper]
+
+
+def test_pool_descarta_driver_com_erro():
+    pool = DriverPool(factory=FakeScraper, min_size=0, max_size=1)
+    with pytest.raises(RuntimeError):
+        with pool.lease() as scraper:
+            raise RuntimeError("navegador travou")
+    assert scraper.fechado
+    assert pool.stats()["total"] == 0
+    assert pool.stats()["discarded"] == 1
+
+
+def test_pool_recicla_depois_de_max_uses():
+    pool = DriverPool(factory=FakeScraper, min_size=0, max_size=1, max_uses=2)
+    with pool.lease() as a:
+        pass
+    with pool.lease() as b:
+        pass
+    with pool.lease() as c:
+        pass
+    assert a is b
+    assert c is not a
+    assert a.fechado
+
+
+class FakeDriver:
+    """Driver que devolve textos em sequência a cada execute_script"""
+    def __init__(self, textos):
+        self.textos = list(textos)
+
+    def execute_script(self, script):
+        if len(self.textos) > 1:
+            return self.textos.pop(0)
+        return self.textos[0]
+
+
+def _scraper_sem_chrome(textos, result_timeout=2.0):
+    from scraper.scraper_oab import OABScraper
+    scraper = OABScraper.__new__(OABScraper)
+    scraper.headless = True
+    scraper.result_timeout = result_timeout
+    scraper.last_wait = None
+    scraper.tempos = {}
+    scraper.on_stage = None
+    scraper.block_resources = False
+    scraper.driver = FakeDriver(textos)
+    return scraper
+
+
+def test_espera_retorna_assim_que_resultado_aparece():
+    scraper = _scraper_sem_chrome(["Pesquisar", "Pesquisar", "Nome: JOAO SILVA Tipo: ADVOGADO Inscrição: 123"])
+    assert scraper._esperar_resultado("Pesquisar") == "resultado"
+    assert scraper.last_wait < 1.0
+
+
+def test_espera_detecta_nenhum_resultado():
+    scraper = _scraper_sem_chrome(["Nenhum resultado encontrado"])
+    assert scraper._esperar_resultado("Pesquisar") == "vazio"
+
+
+def test_espera_respeita_limite():
+    scraper = _scraper_sem_chrome(["Pesquisar"], result_timeout=0.3)
+    assert scraper._esperar_resultado("Pesquisar") == "timeout"
+    assert scraper.last_wait >= 0.3
+
+
+# Servidor local que imita o CNA pra testar o caminho HTTP sem internet
+class FakeCNAHandler(BaseHTTPRequestHandler):
+    falhar = False
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        corpo = b'<form><input name="__RequestVerificationToken" type="hidden" value="tok123" /></form>'
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def do_POST(self):
+        tamanho = int(self.headers.get("Content-Length", 0))
+        form = parse_qs(self.rfile.read(tamanho).decode())
+        if self.falhar or form.get("__RequestVerificationToken") != ["tok123"]:
+            self.send_response(500)
+            self.end_headers()
+            return
+        dados = []
+        if form["NomeAdvo"][0].upper() == "ANA ROSA":
+            dados = [{"Nome": "ANA ROSA CURY", "TipoInscOab": "ADVOGADA", "Inscricao": 19051, "UF": form["Uf"][0]}]
+        corpo = json.dumps({"Success": True, "Data": dados}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+
+@pytest.fixture
+def fake_cna():
+    FakeCNAHandler.falhar = False
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeCNAHandler)
+    t = threading.Thread(target=server.serve_forever, daemon=True)
+    t.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_http_scraper_busca_no_cna(fake_cna):
+    from scraper.http_scraper import OABHttpScraper
+    scraper = OABHttpScraper(base_url=fake_cna, timeout=5)
+
+    resultado = scraper.search_advogado("Ana Rosa", "ms")
+    assert resultado.oab == "19051"
+    assert resultado.nome == "ANA ROSA CURY"
+    assert resultado.uf == "MS"
+    assert resultado.categoria == "ADVOGADA"
+
+    # Nome que não existe volta vazio, sem erro
+    assert scraper.search_advogado("Fulano", "SP").oab is None
+    scraper.close()
+
+
+def test_backend_auto_cai_pro_selenium(fake_cna):
+    from scraper.backend import ScraperBackend
+    from scraper.http_scraper import OABHttpScraper
+    from scraper.scraper_oab import AdvogadoData
+
+    class SeleniumFake(FakeScraper):
+        def search_advogados(self, name, uf, insc=None, max_paginas=1):
+            return [AdvogadoData(oab="999", nome="VIA SELENIUM", uf=uf)]
+
+    pool = DriverPool(factory=SeleniumFake, min_size=0, max_size=1)
+    backend = ScraperBackend("auto", pool, OABHttpScraper(base_url=fake_cna, timeout=5))
+
+    assert backend.search_advogado("Ana Rosa", "MS").oab == "19051"
+
+    FakeCNAHandler.falhar = True
+    assert backend.search_advogado("Ana Rosa", "MS").nome == "VIA SELENIUM"
+    assert backend.stats() == {"http_ok": 1, "fallbacks": 1}
+    backend.close()
+
+
+def test_extrai_todos_os_advogados_da_pagina():
+    from scraper.scraper_oab import extrair_advogados
+
+    texto = (
+        "RESULTADO DA PESQUISA\n"
+        "Nome: MARIA DA SILVA Tipo: ADVOGADA Inscrição: 123456 UF: SP\n"
+        "Nome: MARIA SILVA SANTOS Tipo: ESTAGIARIA Inscrição: 654321 UF: SP\n"
+        "Nome: MARIA SILVA Tipo: ADVOGADA Inscrição: 111222 UF: SP\n"
+    )
+    resultados = extrair_advogados(texto, "sp")
+    assert [r.oab for r in resultados] == ["123456", "654321", "111222"]
+    assert resultados[1].nome == "MARIA SILVA SANTOS"
+    assert resultados[1].categoria == "ESTAGIARIA"
+    assert all(r.uf == "SP" and r.situacao == "Ativo" for r in resultados)
+
+    assert extrair_advogados("Nenhum resultado encontrado", "SP") == []
+
+
+def test_http_scraper_devolve_lista(fake_cna):
+    from scraper.http_scraper import OABHttpScraper
+    scraper = OABHttpScraper(base_url=fake_cna, timeout=5)
+    resultados = scraper.search_advogados("Ana Rosa", "MS")
+    assert len(resultados) == 1 and resultados[0].oab == "19051"
+    assert scraper.search_advogados("Fulano", "MS") == []
+    scraper.close()
+
+
+def test_chromedriver_resolvido_uma_vez_sem_rede(monkeypatch, tmp_path):
+    import scraper.scraper_oab as mod
+
+    driver = tmp_path / "chromedriver"
+    driver.write_text("")
+    chamadas = []
+
+    class ManagerQueNaoPodeSerChamado:
+        def install(self):
+            chamadas.append(1)
+            raise AssertionError("não devia ir na rede")
+
+    monkeypatch.setattr(mod, "ChromeDriverManager", ManagerQueNaoPodeSerChamado)
+    monkeypatch.setattr(mod, "_chromedriver_resolvido", False)
+    monkeypatch.setattr(mod, "_chromedriver_path", None)
+    monkeypatch.setenv("OAB_CHROMEDRIVER_PATH", str(driver))
+    assert mod.resolver_chromedriver() == str(driver)
+
+    # Depois de resolvido não olha mais o ambiente
+    monkeypatch.setenv("OAB_CHROMEDRIVER_PATH", "/nao/existe")
+    assert mod.resolver_chromedriver() == str(driver)
+    assert chamadas == []
+
+
+class DriverComDevTools:
+    """Driver que guarda os comandos CDP e devolve um log de rede pronto"""
+    def __init__(self, eventos):
+        self.cdp = []
+        self.eventos = eventos
+
+    def execute_cdp_cmd(self, cmd, params):
+        self.cdp.append((cmd, params))
+
+    def get_log(self, tipo):
+        eventos, self.eventos = self.eventos, []
+        return [{"message": json.dumps({"message": e})} for e in eventos]
+
+
+def test_bloqueio_de_recursos_respeita_allow_list_e_conta_rede():
+    from scraper.scraper_oab import OABScraper
+
+    eventos = [
+        {"method": "Network.loadingFailed", "params": {"blockedReason": "inspector"}},
+        {"method": "Network.loadingFailed", "params": {"blockedReason": "inspector"}},
+        {"method": "Network.loadingFailed", "params": {"errorText": "net::ERR_ABORTED"}},
+        {"method": "Network.loadingFinished", "params": {"encodedDataLength": 1500}},
+        {"method": "Network.loadingFinished", "params": {"encodedDataLength": 500}},
+        {"method": "Network.requestWillBeSent", "params": {}},
+    ]
+    reportado = []
+    scraper = _scraper_sem_chrome([""])
+    scraper.driver = DriverComDevTools(eventos)
+    scraper.block_resources = True
+    scraper.blocked_urls = ("*://*/*.css", "*://*/*.png")
+    scraper.allowed_urls = ("*://cna.oab.org.br/Content/site.css",)
+    scraper.rede = {"requests_blocked": 0, "requests_loaded": 0, "bytes_loaded": 0}
+    scraper.on_network = lambda *args: reportado.append(args)
+
+    scraper._configurar_bloqueio()
+    cmd, params = scraper.driver.cdp[-1]
+    assert cmd == "Network.setBlockedURLs"
+    assert params["urls"] == ["*://*/*.css", "*://*/*.png"]
+    # O permitido vem antes do bloqueio (o primeiro padrão que casa ganha)
+    assert params["urlPatterns"][0] == {"urlPattern": "*://cna.oab.org.br/Content/site.css", "block": False}
+    assert params["urlPatterns"][1:] == [{"urlPattern": "*://*/*.css", "block": True},
+                                         {"urlPattern": "*://*/*.png", "block": True}]
+
+    scraper._coletar_rede()
+    assert scraper.rede_ultima_busca == {"requests_blocked": 2, "requests_loaded": 2, "bytes_loaded": 2000}
+    assert reportado == [(2, 2, 2000)]
+    scraper._coletar_rede()
+    assert scraper.rede["requests_blocked"] == 2
+
+
+def test_backend_informa_desfecho_pro_limitador():
+    from scraper.backend import ScraperBackend
+    from scraper.limiter import UpstreamLimiter
+    from scraper.scraper_oab import AdvogadoData
+
+    class ScraperComTimeout(FakeScraper):
+        def search_advogados(self, name, uf, insc=None, max_paginas=1):
+            self.ultimo_estado = "timeout" if name == "Lento" else "resultado"
+            return [] if name == "Lento" else [AdvogadoData(oab="1", nome=name, uf=uf)]
+
+    etapas = []
+    limiter = UpstreamLimiter(rate=0, max_limit=4, initial_limit=4, cooldown=0)
+    pool = DriverPool(factory=ScraperComTimeout, min_size=0, max_size=1)
+    backend = ScraperBackend("selenium", pool, limiter=limiter,
+                             on_stage=lambda etapa, duracao: etapas.append(etapa))
+
+    assert backend.search_advogado("Ana", "SP").oab == "1"
+    assert backend.search_advogados("Lento", "SP") == []
+    assert limiter.stats()["limit"] == 2 and limiter.stats()["in_flight"] == 0
+    assert etapas.count("upstream_wait") == 2
+    backend.close()
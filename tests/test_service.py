@@ -0,0 +1,105 @@
+import json
+import subprocess
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from api import service
+from api.service import ClienteLocal, ClienteRemoto, ServicoErro
+from scraper.scraper_oab import AdvogadoData
+
+
+@pytest.fixture
+def cliente_local():
+    service.set_cliente(ClienteLocal())
+    yield
+    service.set_cliente(None)
+
+
+def test_agente_usa_cache_da_api_sem_http(cliente_local):
+    from agent.agent_llm import fetch_oab_tool
+
+    service.cache.clear()
+    service.cache.set_resultado("Ana Rosa", "MS", AdvogadoData(oab="19051", nome="ANA ROSA", uf="MS"))
+    try:
+        resultado = fetch_oab_tool("Ana Rosa", "ms")
+        assert resultado["oab"] == "19051"
+        assert resultado["nome"] == "ANA ROSA"
+    finally:
+        service.cache.clear()
+
+
+def test_service_nao_depende_da_api():
+    # O agente importa o service; ele não pode puxar o api.main (nem o FastAPI) junto
+    codigo = "import sys, agent.agent_llm; print('api.main' in sys.modules, 'fastapi' in sys.modules)"
+    saida = subprocess.run([sys.executable, "-c", codigo], capture_output=True, text=True, check=True)
+    assert saida.stdout.split() == ["False", "False"]
+
+
+def test_agente_local_devolve_erro_de_validacao(cliente_local):
+    from agent.agent_llm import fetch_oab_tool
+
+    resultado = fetch_oab_tool("Ana Rosa", "XX")
+    assert resultado["oab"] is None
+    assert "400" in resultado["error"]
+
+
+@pytest.fixture
+def api_remota():
+    conexoes = []
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            conexoes.append(self.client_address)
+            dados = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            if dados["uf"] == "XX":
+                status, corpo = 400, {"detail": "UF 'XX' não é válida"}
+            else:
+                status, corpo = 200, {"oab": "19051", "nome": dados["name"].upper(), "uf": dados["uf"]}
+            resposta = json.dumps(corpo).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(resposta)))
+            self.end_headers()
+            self.wfile.write(resposta)
+
+        def log_message(self, *args):
+            pass
+
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{servidor.server_address[1]}", conexoes
+    servidor.shutdown()
+
+
+def test_cliente_remoto_reaproveita_conexao(api_remota):
+    url, conexoes = api_remota
+    cliente = ClienteRemoto(url, timeout=5)
+    try:
+        assert cliente.fetch_oab("Ana Rosa", "MS")["nome"] == "ANA ROSA"
+        assert cliente.fetch_oab("Joao", "SP")["uf"] == "SP"
+        # Keep-alive: as duas chamadas vieram da mesma porta de origem
+        assert len(conexoes) == 2 and conexoes[0] == conexoes[1]
+
+        with pytest.raises(ServicoErro) as erro:
+            cliente.fetch_oab("Ana Rosa", "XX")
+        assert erro.value.status_code == 400
+        assert "não é válida" in erro.value.detail
+    finally:
+        cliente.close()
+
+
+def test_get_cliente_remoto_pelo_env(monkeypatch, api_remota):
+    url, _ = api_remota
+    monkeypatch.setenv("OAB_API_URL", url)
+    service.set_cliente(None)
+    try:
+        cliente = service.get_cliente()
+        assert isinstance(cliente, ClienteRemoto)
+        assert cliente is service.get_cliente()
+    finally:
+        service.set_cliente(None)
@@ -0,0 +1,84 @@
+import threading
+import time
+
+import pytest
+
+from api.singleflight import SingleFlight
+
+
+def test_singleflight_junta_chamadas_iguais():
+    flight = SingleFlight()
+    chamadas = []
+    liberar = threading.Event()
+
+    def busca():
+        chamadas.append(1)
+        liberar.wait(2)
+        return "resultado"
+
+    resultados = []
+    threads = [threading.Thread(target=lambda: resultados.append(flight.do("k", busca))) for _ in range(5)]
+    for t in threads:
+        t.start()
+    # Espera todas entrarem antes de liberar a busca
+    while flight.stats()["coalesced"] < 4:
+        time.sleep(0.01)
+    liberar.set()
+    for t in threads:
+        t.join()
+
+    assert chamadas == [1]
+    assert resultados == ["resultado"] * 5
+    assert flight.stats() == {"in_flight": 0, "leaders": 1, "coalesced": 4}
+
+
+def test_singleflight_propaga_erro_e_libera_chave():
+    flight = SingleFlight()
+
+    def quebra():
+        raise ValueError("falhou")
+
+    with pytest.raises(ValueError):
+        flight.do("k", quebra)
+    # Depois do erro a próxima chamada roda de novo
+    assert flight.do("k", lambda: 42) == 42
+
+
+def test_singleflight_submit_usa_executor_so_no_lider():
+    from api.executor import ScrapeExecutor
+
+    executor = ScrapeExecutor(max_workers=1, max_queue=0)
+    flight = SingleFlight()
+    liberar = threading.Event()
+
+    primeiro = flight.submit("k", lambda: liberar.wait(2) and "ok", executor.submit)
+    # Mesma chave pega carona sem precisar de vaga no executor
+    segundo = flight.submit("k", lambda: "nunca roda", executor.submit)
+    assert segundo is primeiro
+
+    liberar.set()
+    assert primeiro.result(timeout=2) == "ok"
+    executor.shutdown()
+
+
+def test_singleflight_shutdown_cancela_quem_espera_na_fila():
+    from api.executor import ScrapeExecutor
+    from api.singleflight import ChamadaCancelada
+
+    executor = ScrapeExecutor(max_workers=1, max_queue=1)
+    flight = SingleFlight()
+    liberar = threading.Event()
+
+    rodando = flight.submit("a", lambda: liberar.wait(2) and "ok", executor.submit)
+    na_fila = flight.submit("b", lambda: "nunca roda", executor.submit)
+    carona = flight.submit("b", lambda: "nunca roda", executor.submit)
+    assert carona is na_fila
+
+    executor.shutdown()
+    # Quem esperava a busca cancelada recebe o erro em vez de ficar pendurado
+    with pytest.raises(ChamadaCancelada):
+        na_fila.result(timeout=2)
+    liberar.set()
+    assert rodando.result(timeout=2) == "ok"
+    assert flight.stats()["in_flight"] == 0
+    assert executor.stats()["queued"] == 0 and executor.stats()["running"] == 0
@@ -0,0 +1,168 @@
+import threading
+
+import pytest
+
+from scraper.scraper_oab import OABScraper, JS_TEXTO_PAGINA, JS_PROXIMA_PAGINA
+from scraper.tabs import TabScraper, TabTimeout, JS_NAVEGAR, JS_FORM_PRONTO, JS_PESQUISAR
+
+
+class _SwitchTo:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def new_window(self, tipo):
+        self.driver.contador += 1
+        handle = f"aba{self.driver.contador}"
+        self.driver.abas[handle] = {"fase": "vazia", "polls": 0, "nome": None}
+        self.driver.atual = handle
+        self.driver.max_abas = max(self.driver.max_abas, len(self.driver.abas) - 1)
+
+    def window(self, handle):
+        assert handle in self.driver.abas
+        self.driver.atual = handle
+
+
+class DriverDeAbas:
+    """Chrome de mentira: cada aba carrega o formulário e mostra o resultado depois de uns polls"""
+
+    def __init__(self):
+        self.contador = 0
+        self.abas = {"base": {"fase": "base"}}
+        self.atual = "base"
+        self.max_abas = 0
+        self.switch_to = _SwitchTo(self)
+        self.current_url = "about:blank"
+        self.cdp = []
+
+    @property
+    def current_window_handle(self):
+        return self.atual
+
+    def execute_script(self, script, *args):
+        aba = self.abas[self.atual]
+        if script == JS_NAVEGAR:
+            aba["fase"] = "carregando"
+        elif script == JS_FORM_PRONTO:
+            aba["polls"] += 1
+            return aba["polls"] >= 2
+        elif script == JS_PESQUISAR:
+            aba["nome"], _, aba["uf"] = args
+            aba["fase"] = "pesquisou"
+            aba["polls"] = 0
+            return True
+        elif script == JS_TEXTO_PAGINA:
+            if aba["fase"] != "pesquisou":
+                return "Pesquisar"
+            aba["polls"] += 1
+            if aba["polls"] < 3 or aba["nome"].startswith("Lento"):
+                return "Pesquisar"
+            if aba["nome"].startswith("Ninguem"):
+                return "Nenhum resultado encontrado"
+            return f"Nome: {aba['nome'].upper()} Tipo: ADVOGADO Inscrição: {len(aba['nome'])}00 UF: {aba['uf']}"
+        elif script == JS_PROXIMA_PAGINA:
+            return False
+
+    def execute_cdp_cmd(self, comando, params):
+        self.cdp.append((self.atual, comando))
+
+    @property
+    def page_source(self):
+        aba = self.abas[self.atual]
+        return (f"<html><body><div>Nome: {aba['nome'].upper()}</div><div>Tipo: ADVOGADO</div>"
+                f"<div>Inscrição: {len(aba['nome'])}00</div><div>UF: {aba['uf']}</div></body></html>")
+
+    def close(self):
+        del self.abas[self.atual]
+
+    def quit(self):
+        pass
+
+
+def _fabrica(driver, bloquear=False):
+    def criar():
+        scraper = OABScraper.__new__(OABScraper)
+        scraper.driver = driver
+        scraper.base_url = "https://cna.oab.org.br/"
+        scraper.tempos = {}
+        scraper.on_stage = None
+        scraper.block_resources = bloquear
+        scraper.blocked_urls = ["*.css"]
+        scraper.allowed_urls = []
+        return scraper
+    return criar
+
+
+def test_buscas_em_abas_de_um_navegador_so():
+    driver = DriverDeAbas()
+    tabs = TabScraper(factory=_fabrica(driver), max_tabs=2, tab_timeout=5, poll_interval=0.001)
+    nomes = ["Ana Rosa", "Joao Silva", "Ninguem Aqui", "Maria Souza"]
+    resultados = {}
+
+    def buscar(nome):
+        resultados[nome] = tabs.search_advogados(nome, "ms")
+
+    threads = [threading.Thread(target=buscar, args=(nome,)) for nome in nomes]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(5)
+
+    assert resultados["Ana Rosa"][0].nome == "ANA ROSA"
+    assert resultados["Ana Rosa"][0].uf == "MS"
+    assert resultados["Joao Silva"][0].oab == "1000"
+    assert resultados["Ninguem Aqui"] == []
+    assert resultados["Maria Souza"][0].nome == "MARIA SOUZA"
+    # Nunca mais que max_tabs abertas, e todas fechadas no final (só sobra a aba base)
+    assert driver.max_abas <= 2
+    assert list(driver.abas) == ["base"]
+    assert tabs.stats()["completed"] == 4 and tabs.stats()["browsers_started"] == 1
+    tabs.close()
+
+
+def test_cada_aba_tem_seu_prazo():
+    driver = DriverDeAbas()
+    tabs = TabScraper(factory=_fabrica(driver), max_tabs=2, tab_timeout=0.3, poll_interval=0.001)
+    lenta = tabs.submit("Lento Demais", "SP")
+    rapida = tabs.submit("Ana Rosa", "SP")
+
+    assert rapida.result(timeout=5)[0].nome == "ANA ROSA"
+    with pytest.raises(TabTimeout):
+        lenta.result(timeout=5)
+    assert tabs.stats()["timeouts"] == 1
+    tabs.close()
+
+
+def test_navegador_que_nao_abre_falha_a_fila():
+    def quebrado():
+        raise RuntimeError("chrome não abriu")
+
+    tabs = TabScraper(factory=quebrado, max_tabs=2)
+    with pytest.raises(RuntimeError):
+        tabs.submit("Ana Rosa", "SP").result(timeout=5)
+    tabs.close()
+
+
+def test_bloqueio_de_recursos_em_cada_aba(monkeypatch):
+    driver = DriverDeAbas()
+    monkeypatch.setattr(OABScraper, "_coletar_rede", lambda self: None)
+    tabs = TabScraper(factory=_fabrica(driver, bloquear=True), max_tabs=2, tab_timeout=5, poll_interval=0.001)
+    tabs.search_advogados("Ana Rosa", "MS")
+    tabs.close()
+    # O setBlockedURLs foi mandado pra aba nova, não só pra janela base
+    assert ("aba1", "Network.setBlockedURLs") in driver.cdp
+
+
+def test_aquecer_abre_o_navegador_e_propaga_o_erro():
+    driver = DriverDeAbas()
+    tabs = TabScraper(factory=_fabrica(driver), max_tabs=2)
+    tabs.aquecer()
+    assert tabs.stats()["browsers_started"] == 1
+    tabs.close()
+
+    def quebrado():
+        raise RuntimeError("chrome não abriu")
+
+    tabs = TabScraper(factory=quebrado, max_tabs=2)
+    with pytest.raises(RuntimeError, match="não abriu"):
+        tabs.aquecer()
+    tabs.close()